@@ -24,6 +24,36 @@ interface Quiz {
   has_question_timers?: boolean;
 }
 
+interface ServerClock {
+  index: number;
+  questionDeadline: number;
+  deadline: number;
+}
+
+interface AttemptDeadlines {
+  question_index?: number;
+  question_deadline_at?: string | null;
+  deadline_at?: string | null;
+}
+
+// Seconds the server allows for a question (its own limit, else the quiz's)
+const questionLimit = (quiz: Quiz, index: number) => quiz.questions[index]?.time_limit || quiz.time_limit;
+
+// When the question on screen closes: its own limit from when it was shown, but never
+// later than the server's deadline for it (the server moves past a question whose
+// time ran out, adding the next question's limit)
+const questionDeadline = (quiz: Quiz, index: number, shownAt: number, server: ServerClock | null): number | null => {
+  const limit = quiz.has_question_timers || server ? questionLimit(quiz, index) : undefined;
+  let deadline = limit ? shownAt + limit * 1000 : null;
+  if (server) {
+    let serverDeadline = index < server.index ? 0 : server.questionDeadline;
+    for (let i = server.index + 1; i <= index; i++) serverDeadline += (questionLimit(quiz, i) || 0) * 1000;
+    serverDeadline = Math.min(serverDeadline, server.deadline);
+    deadline = deadline === null ? serverDeadline : Math.min(deadline, serverDeadline);
+  }
+  return deadline;
+};
+
 const TakeQuiz = () => {
   const { id } = useParams<{ id: string }>();
   const navigate = useNavigate();
@@ -38,11 +68,16 @@ const TakeQuiz = () => {
   const [startTime, setStartTime] = useState<number | null>(null);
   const [quizStarted, setQuizStarted] = useState(false);
   const [showResumeModal, setShowResumeModal] = useState(false);
-  const [pauseTimer, setPauseTimer] = useState(false);
+  // Server deadlines (client clock, ms) of the open question and of the attempt,
+  // from /submissions/start and /answers; null for untimed attempts
+  const [serverClock, setServerClock] = useState<ServerClock | null>(null);
+  const clockOffsetRef = useRef(0); // server clock minus client clock
+  const questionShownRef = useRef<{ index: number; at: number } | null>(null);
   const [showFeedbackModal, setShowFeedbackModal] = useState(false);
   const [feedbackText, setFeedbackText] = useState("");
   const [submissionId, setSubmissionId] = useState<number | null>(null);
   const hasSubmittedRef = useRef(false);
+  const latestAnswersRef = useRef<{ [index: string]: number }>({});
   const [violationCount, setViolationCount] = useState(0);
   const lastViolationTimeRef = useRef<number | null>(null);
   const [quizEnded, setQuizEnded] = useState(false);
@@ -103,6 +138,8 @@ const TakeQuiz = () => {
       });
       if (!res.ok) throw new Error("Failed to start quiz");
       const data = await res.json();
+      clockOffsetRef.current = Date.parse(data.started_at) - Date.now();
+      syncServerClock(data);
       setSubmissionId(data.submission_id);
       setStartTime(new Date(data.started_at).getTime());
       setQuizStarted(true);
@@ -111,6 +148,17 @@ const TakeQuiz = () => {
     }
   };
 
+  // The server's deadlines are authoritative; a late response never moves the clock back
+  const syncServerClock = (data: AttemptDeadlines) => {
+    if (!data.question_deadline_at || !data.deadline_at) return;
+    const next: ServerClock = {
+      index: data.question_index ?? 0,
+      questionDeadline: Date.parse(data.question_deadline_at) - clockOffsetRef.current,
+      deadline: Date.parse(data.deadline_at) - clockOffsetRef.current,
+    };
+    setServerClock((prev) => (prev && next.index < prev.index ? prev : next));
+  };
+
   const handleSubmitQuiz = useCallback(async () => {
     if (submitting || !quiz || !startTime || !submissionId || hasSubmittedRef.current) return;
     hasSubmittedRef.current = true;
@@ -148,7 +196,21 @@ const TakeQuiz = () => {
         }),
       });
 
-      if (!res.ok) throw new Error("Submission failed");
+      // 409: time ran out on the server, which already submitted the answers saved before the deadline
+      const timeUp = res.status === 409;
+      if (!res.ok && !timeUp) {
+        hasSubmittedRef.current = false; // allow another try
+        throw new Error("Submission failed");
+      }
+      let result: { score: number; correct_count: number } | null = null;
+      if (timeUp) {
+        const finalRes = await fetch(`${import.meta.env.VITE_API_BASE_URL}/submissions/${submissionId}`, {
+          headers: { Authorization: `Bearer ${localStorage.getItem("quiz_token")}` },
+        });
+        if (finalRes.ok) result = await finalRes.json();
+      } else {
+        result = await res.json();
+      }
       localStorage.setItem(`quiz_attempted_${quiz.id}`, "true");
 
       setQuizEnded(true);
@@ -157,9 +219,13 @@ const TakeQuiz = () => {
       await document.exitFullscreen();
     }
 
+      // The server scores the attempt; show its result
+      const finalScore = result ? `${result.score}% (${result.correct_count}/${quiz.questions.length})` : null;
       toast({
-        title: "Quiz Submitted!",
-        description: `You scored ${score}% (${correctCount}/${quiz.questions.length})`,
+        title: timeUp ? "Time is up" : "Quiz Submitted!",
+        description: timeUp
+          ? `Your saved answers were submitted.${finalScore ? ` You scored ${finalScore}` : ""}`
+          : `You scored ${finalScore ?? `${score}% (${correctCount}/${quiz.questions.length})`}`,
          className: "bg-green-600 text-white border border-green-700 shadow-md font-semibold",
       });
       setShowFeedbackModal(true);
@@ -206,7 +272,6 @@ const TakeQuiz = () => {
           variant: "destructive",
         });
         setShowResumeModal(true);
-        setPauseTimer(true);
       }
       return next;
     });
@@ -234,29 +299,73 @@ const TakeQuiz = () => {
     };
   }, [quizStarted, quizEnded]);
 
+  // Counts down to the question's deadline (not paused by the resume modal: the server's clock keeps running)
   useEffect(() => {
-    if (!quizStarted || !quiz?.has_question_timers || questionTimeRemaining <= 0 || pauseTimer) return;
-    const timer = setInterval(() => {
-      setQuestionTimeRemaining((prev) => {
-        if (prev <= 1) {
-          if (currentQuestionIndex === quiz.questions.length - 1) handleSubmitQuiz();
-          else handleNextQuestion(true);
-          return 0;
-        }
-        return prev - 1;
-      });
-    }, 1000);
+    if (!quizStarted || quizEnded || !quiz) return;
+    let shown = questionShownRef.current;
+    if (!shown || shown.index !== currentQuestionIndex) {
+      shown = { index: currentQuestionIndex, at: Date.now() };
+      questionShownRef.current = shown;
+    }
+    const deadline = questionDeadline(quiz, currentQuestionIndex, shown.at, serverClock);
+    if (deadline === null) return;
+    const tick = () => {
+      const remaining = Math.max(0, Math.ceil((deadline - Date.now()) / 1000));
+      setQuestionTimeRemaining(remaining);
+      if (remaining > 0) return;
+      clearInterval(timer);
+      const attemptOver = serverClock !== null && Date.now() >= serverClock.deadline;
+      if (attemptOver || currentQuestionIndex === quiz.questions.length - 1) handleSubmitQuiz();
+      else handleNextQuestion(true);
+    };
+    const timer = setInterval(tick, 250);
+    tick();
     return () => clearInterval(timer);
-  }, [quizStarted, questionTimeRemaining, currentQuestionIndex, quiz, handleSubmitQuiz, pauseTimer]);
+  }, [quizStarted, quizEnded, currentQuestionIndex, quiz, serverClock, handleSubmitQuiz]);
 
-  useEffect(() => {
-    if (quizStarted && quiz?.has_question_timers && quiz.questions[currentQuestionIndex]?.time_limit) {
-      setQuestionTimeRemaining(quiz.questions[currentQuestionIndex].time_limit);
+  // Save an answer server-side: if time runs out, the attempt is scored with the saved answers.
+  // Retries on network errors, 429 (honouring Retry-After) and 5xx; 409 means the question's time is up.
+  const saveAnswer = async (index: string, answer: number, attempt = 1): Promise<void> => {
+    let retryAfterMs = 1000 * attempt;
+    try {
+      const res = await fetch(`${import.meta.env.VITE_API_BASE_URL}/submissions/${submissionId}/answers`, {
+        method: "POST",
+        headers: {
+          "Content-Type": "application/json",
+          Authorization: `Bearer ${localStorage.getItem("quiz_token")}`,
+        },
+        body: JSON.stringify({ question_index: parseInt(index), answer: answer + 1 }),
+      });
+      if (res.ok) {
+        syncServerClock(await res.json());
+        return;
+      }
+      if (res.status === 409) {
+        toast({ title: "Answer not saved", description: "Time is up for this question.", variant: "destructive" });
+        return;
+      }
+      if (res.status !== 429 && res.status < 500) throw new Error("Answer save rejected");
+      retryAfterMs = Math.max(retryAfterMs, Number(res.headers.get("Retry-After") || 0) * 1000);
+    } catch (err) {
+      if (!(err instanceof TypeError)) {
+        toast({ title: "Answer not saved", description: "Please select your answer again.", variant: "destructive" });
+        return;
+      }
     }
-  }, [quizStarted, currentQuestionIndex, quiz]);
+    if (attempt >= 3) {
+      toast({ title: "Answer not saved", description: "Check your connection and select your answer again.", variant: "destructive" });
+      return;
+    }
+    await new Promise((resolve) => setTimeout(resolve, retryAfterMs));
+    // A newer choice for this question has its own save
+    if (latestAnswersRef.current[index] !== answer) return;
+    return saveAnswer(index, answer, attempt + 1);
+  };
 
   const handleAnswerChange = (index: string, answer: number) => {
     setAnswers((prev) => ({ ...prev, [index]: answer }));
+    latestAnswersRef.current[index] = answer;
+    if (submissionId) saveAnswer(index, answer);
   };
 
   const handleNextQuestion = (_autoAdvance?: boolean) => {
@@ -311,7 +420,7 @@ const TakeQuiz = () => {
             <p>Question {currentQuestionIndex + 1} of {quiz.questions.length}</p>
           </div>
           <div className="text-xl font-bold text-blue-600">
-            {quiz.has_question_timers && <>{formatTime(questionTimeRemaining)}</>}
+            {(quiz.has_question_timers || serverClock) && <>{formatTime(questionTimeRemaining)}</>}
           </div>
         </div>
         <Progress value={progress} className="h-2" />
@@ -348,11 +457,10 @@ const TakeQuiz = () => {
         <div className="fixed inset-0 bg-black/80 flex justify-center items-center z-50">
           <div className="bg-white p-6 rounded shadow max-w-md text-center">
             <h2 className="text-xl font-bold mb-4">Fullscreen Required</h2>
-            <p className="mb-4">You must remain in fullscreen during the quiz. Click below to resume.</p>
+            <p className="mb-4">You must remain in fullscreen during the quiz. The timer keeps running. Click below to resume.</p>
             <Button onClick={() => {
               document.documentElement.requestFullscreen();
               setShowResumeModal(false);
-              setPauseTimer(false);
             }}>
               Resume Quiz
             </Button>
@@ -0,0 +1,185 @@
+# quiz_backend/app/analytics/item_analysis.py
+#
+# Per-question (item) analysis for a quiz:
+# - p-value (difficulty): share of attempts answering the question correctly
+# - point-biserial discrimination: correlation of the item with the rest score
+# - distractor frequencies: how often each option was picked
+# - KR-20 reliability of the whole quiz
+#
+# Submission.answers is stored as {"<question index>": <option number>} with
+# 0-based question indexes and 1-based option numbers (the same convention as
+# Question.correct). Unanswered questions are simply missing from the map.
+
+import hashlib
+import json
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.quiz import Quiz
+from ..models.submission import Submission
+
+# NumPy is imported on first use: it is only needed once an admin asks for
+# item stats, and loading it at import slows down every worker start
+if TYPE_CHECKING:
+    import numpy as np
+
+# 0 in the response matrix means "not answered"
+NOT_ANSWERED = 0
+
+STREAM_BATCH_SIZE = 5000
+CACHE_MAX_ENTRIES = 256
+
+# (quiz_id, questions hash, finalized submission count) -> computed stats
+_stats_cache: "OrderedDict[Tuple[int, str, int], Dict[str, Any]]" = OrderedDict()
+cache_hits = 0
+cache_misses = 0
+
+
+def questions_fingerprint(questions: List[Dict[str, Any]]) -> str:
+    payload = json.dumps(questions, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def fill_response_matrix(
+    matrix: "np.ndarray",
+    answer_maps: Iterable[Optional[Dict[str, Any]]],
+    row_offset: int = 0,
+) -> int:
+    """
+    Writes answer maps into `matrix` starting at `row_offset`.
+    Returns the number of rows written. Invalid or out-of-range entries are ignored.
+    """
+    n_questions = matrix.shape[1]
+    rows: List[int] = []
+    cols: List[int] = []
+    values: List[int] = []
+    row = row_offset
+    for answers in answer_maps:
+        if row >= matrix.shape[0]:
+            break
+        for key, value in (answers or {}).items():
+            try:
+                col = int(key)
+                option = int(value)
+            except (TypeError, ValueError):
+                continue
+            if 0 <= col < n_questions and 0 < option < 1000:
+                rows.append(row)
+                cols.append(col)
+                values.append(option)
+        row += 1
+    if rows:
+        matrix[rows, cols] = values
+    return row - row_offset
+
+
+def compute_item_stats(responses: "np.ndarray", correct: "np.ndarray", n_options: "np.ndarray") -> Dict[str, Any]:
+    """
+    Vectorized item analysis over a response matrix.
+
+    responses: (attempts, questions) int array of chosen options, 0 = not answered
+    correct:   (questions,) int array of the correct option number per question
+    n_options: (questions,) int array of the option count per question
+    """
+    import numpy as np
+
+    n_attempts, n_questions = responses.shape
+    if n_attempts == 0 or n_questions == 0:
+        return {"attempts": int(n_attempts), "kr20": None, "questions": []}
+
+    scored = (responses == correct[np.newaxis, :]).astype(np.float64)
+    totals = scored.sum(axis=1)
+
+    # Difficulty
+    p = scored.mean(axis=0)
+    q = 1.0 - p
+
+    # Discrimination: point-biserial of the item against the rest score (total minus the item)
+    rest = totals[:, np.newaxis] - scored
+    item_centered = scored - p
+    rest_centered = rest - rest.mean(axis=0)
+    cov = (item_centered * rest_centered).mean(axis=0)
+    denom = np.sqrt(p * q) * rest_centered.std(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        discrimination = np.where(denom > 0, cov / denom, np.nan)
+
+    # Distractor frequencies: one bincount over (question, option) cells
+    width = int(max(n_options.max(initial=0), responses.max(initial=0))) + 1
+    cells = (np.arange(n_questions, dtype=np.int64)[np.newaxis, :] * width + responses).ravel()
+    counts = np.bincount(cells, minlength=n_questions * width).reshape(n_questions, width)
+
+    # KR-20 reliability
+    kr20 = None
+    total_variance = totals.var()
+    if n_questions > 1 and total_variance > 0:
+        kr20 = float((n_questions / (n_questions - 1)) * (1.0 - (p * q).sum() / total_variance))
+
+    questions = []
+    for i in range(n_questions):
+        option_count = int(n_options[i])
+        questions.append({
+            "index": i,
+            "correct": int(correct[i]),
+            "p_value": round(float(p[i]), 4),
+            "discrimination": None if np.isnan(discrimination[i]) else round(float(discrimination[i]), 4),
+            "not_answered": int(counts[i, NOT_ANSWERED]),
+            "option_counts": {str(opt): int(counts[i, opt]) for opt in range(1, max(option_count, 1) + 1)},
+        })
+
+    return {"attempts": int(n_attempts), "kr20": kr20, "questions": questions}
+
+
+async def get_quiz_item_stats(db: AsyncSession, quiz: Quiz) -> Dict[str, Any]:
+    """
+    Item statistics for a quiz, cached per quiz content and finalized submission count.
+    Answers are streamed from the database in batches straight into the response matrix.
+    """
+    questions = quiz.questions_json or []
+    if isinstance(questions, str):
+        questions = json.loads(questions)
+
+    finalized = (Submission.quiz_id == quiz.id, Submission.answers.isnot(None))
+    count_result = await db.execute(select(func.count(Submission.id)).where(*finalized))
+    n_submissions = count_result.scalar_one()
+
+    cache_key = (quiz.id, questions_fingerprint(questions), n_submissions)
+    global cache_hits, cache_misses
+    cached = _stats_cache.get(cache_key)
+    if cached is not None:
+        cache_hits += 1
+        _stats_cache.move_to_end(cache_key)
+        return cached
+    cache_misses += 1
+
+    import numpy as np
+
+    n_questions = len(questions)
+    correct = np.array([int(q.get("correct") or 0) for q in questions], dtype=np.int16)
+    n_options = np.array([len(q.get("options") or []) for q in questions], dtype=np.int16)
+    responses = np.zeros((n_submissions, n_questions), dtype=np.int16)
+
+    filled = 0
+    if n_submissions and n_questions:
+        stream = await db.stream(
+            select(Submission.answers)
+            .where(*finalized)
+            .order_by(Submission.id)
+            .execution_options(yield_per=STREAM_BATCH_SIZE)
+        )
+        async for batch in stream.scalars().partitions():
+            filled += fill_response_matrix(responses, batch, row_offset=filled)
+            if filled >= n_submissions:
+                break
+
+    stats = compute_item_stats(responses[:filled], correct, n_options)
+    for item, question in zip(stats["questions"], questions):
+        item["question"] = question.get("question")
+    stats["quiz_id"] = quiz.id
+
+    _stats_cache[cache_key] = stats
+    while len(_stats_cache) > CACHE_MAX_ENTRIES:
+        _stats_cache.popitem(last=False)
+    return stats
@@ -0,0 +1,251 @@
+# quiz_backend/app/analytics/score_stats.py
+#
+# Incrementally maintained score / time_taken statistics per quiz.
+#
+# Each quiz keeps, per metric, running moments (Welford) and a mergeable
+# relative-error quantile sketch (DDSketch-style log buckets). Both are updated
+# in O(1) when a submission is finalized and can be merged across quizzes, so
+# reads never scan the submissions table. The state lives in-process and is
+# rebuilt from the table on first use, after a re-submission, or once it is
+# older than STATS_MAX_AGE_SECONDS (so other workers' submissions are picked up).
+
+import math
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.submission import Submission
+
+SKETCH_RELATIVE_ACCURACY = 0.01
+SKETCH_MAX_BUCKETS = 2048
+STATS_MAX_AGE_SECONDS = 300
+STREAM_BATCH_SIZE = 5000
+
+PERCENTILES = (10, 25, 50, 75, 90, 95, 99)
+HISTOGRAM_BINS = 10
+
+METRICS = ("score", "time_taken")
+
+
+class RunningMoments:
+    """Count, mean, variance (Welford), min and max; mergeable with Chan's formula."""
+
+    __slots__ = ("count", "mean", "m2", "min", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other: "RunningMoments"):
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def stddev(self) -> Optional[float]:
+        if self.count < 2:
+            return None
+        return math.sqrt(self.m2 / (self.count - 1))
+
+
+class QuantileSketch:
+    """
+    Log-bucket quantile sketch with bounded relative error.
+    Values <= 0 are counted in a dedicated zero bucket. Sketches built with the
+    same relative accuracy merge by adding bucket counts.
+    """
+
+    __slots__ = ("relative_accuracy", "gamma", "_log_gamma", "buckets", "zero_count", "count")
+
+    def __init__(self, relative_accuracy: float = SKETCH_RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def _key(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value(self, key: int) -> float:
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def add(self, value: float):
+        self.count += 1
+        if value <= 0:
+            self.zero_count += 1
+            return
+        key = self._key(value)
+        self.buckets[key] = self.buckets.get(key, 0) + 1
+        if len(self.buckets) > SKETCH_MAX_BUCKETS:
+            self._collapse()
+
+    def merge(self, other: "QuantileSketch"):
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for key, n in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + n
+        self.zero_count += other.zero_count
+        self.count += other.count
+        if len(self.buckets) > SKETCH_MAX_BUCKETS:
+            self._collapse()
+
+    def _collapse(self):
+        # Fold the lowest buckets together; accuracy is kept for the upper tail
+        keys = sorted(self.buckets)
+        excess = len(keys) - SKETCH_MAX_BUCKETS + 1
+        folded = sum(self.buckets.pop(k) for k in keys[:excess])
+        target = keys[excess]
+        self.buckets[target] += folded
+
+    def quantile(self, q: float) -> Optional[float]:
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if rank < seen:
+                return self._value(key)
+        return self._value(max(self.buckets))
+
+    def weighted_values(self) -> Iterable:
+        if self.zero_count:
+            yield 0.0, self.zero_count
+        for key in sorted(self.buckets):
+            yield self._value(key), self.buckets[key]
+
+
+class MetricStats:
+    __slots__ = ("moments", "sketch")
+
+    def __init__(self):
+        self.moments = RunningMoments()
+        self.sketch = QuantileSketch()
+
+    def add(self, value: Optional[float]):
+        if value is None:
+            return
+        value = float(value)
+        self.moments.add(value)
+        self.sketch.add(value)
+
+    def merge(self, other: "MetricStats"):
+        self.moments.merge(other.moments)
+        self.sketch.merge(other.sketch)
+
+    def histogram(self, bins: int = HISTOGRAM_BINS) -> List[Dict[str, Any]]:
+        low, high = self.moments.min, self.moments.max
+        if low is None:
+            return []
+        width = (high - low) / bins if high > low else 1.0
+        counts = [0] * bins
+        for value, n in self.sketch.weighted_values():
+            index = int((min(max(value, low), high) - low) / width)
+            counts[min(index, bins - 1)] += n
+        return [
+            {"from": round(low + i * width, 2), "to": round(low + (i + 1) * width, 2), "count": counts[i]}
+            for i in range(bins)
+        ]
+
+    def to_dict(self) -> Dict[str, Any]:
+        m = self.moments
+        return {
+            "count": m.count,
+            "mean": round(m.mean, 4) if m.count else None,
+            "stddev": round(m.stddev, 4) if m.stddev is not None else None,
+            "min": m.min,
+            "max": m.max,
+            "median": self.sketch.quantile(0.5),
+            "percentiles": {f"p{p}": self.sketch.quantile(p / 100) for p in PERCENTILES},
+            "histogram": self.histogram(),
+        }
+
+
+class QuizStats:
+    __slots__ = ("metrics", "built_at")
+
+    def __init__(self):
+        self.metrics = {name: MetricStats() for name in METRICS}
+        self.built_at = time.monotonic()
+
+    def add(self, score: Optional[float], time_taken: Optional[float]):
+        self.metrics["score"].add(score)
+        self.metrics["time_taken"].add(time_taken)
+
+    def merge(self, other: "QuizStats"):
+        for name in METRICS:
+            self.metrics[name].merge(other.metrics[name])
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: stats.to_dict() for name, stats in self.metrics.items()}
+
+
+# quiz_id -> live statistics for this process
+_registry: Dict[int, QuizStats] = {}
+
+
+def record_submission(quiz_id: int, score: Optional[float], time_taken: Optional[float]):
+    """Fold a newly finalized submission into the quiz's statistics (if loaded)."""
+    stats = _registry.get(quiz_id)
+    if stats is not None:
+        stats.add(score, time_taken)
+
+
+def invalidate_quiz_stats(quiz_id: int):
+    """Drop a quiz's statistics so they are rebuilt from the table on next read."""
+    _registry.pop(quiz_id, None)
+
+
+async def rebuild_quiz_stats(db: AsyncSession, quiz_id: int) -> QuizStats:
+    stats = QuizStats()
+    stream = await db.stream(
+        select(Submission.score, Submission.time_taken)
+        .where(Submission.quiz_id == quiz_id, Submission.score.isnot(None))
+        .execution_options(yield_per=STREAM_BATCH_SIZE)
+    )
+    async for batch in stream.partitions():
+        for score, time_taken in batch:
+            stats.add(score, time_taken)
+    _registry[quiz_id] = stats
+    return stats
+
+
+async def get_quiz_stats(db: AsyncSession, quiz_id: int) -> QuizStats:
+    stats = _registry.get(quiz_id)
+    if stats is None or time.monotonic() - stats.built_at > STATS_MAX_AGE_SECONDS:
+        stats = await rebuild_quiz_stats(db, quiz_id)
+    return stats
+
+
+async def get_merged_stats(db: AsyncSession, quiz_ids: Iterable[int]) -> QuizStats:
+    merged = QuizStats()
+    for quiz_id in dict.fromkeys(quiz_ids):
+        merged.merge(await get_quiz_stats(db, quiz_id))
+    return merged
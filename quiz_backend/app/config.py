@@ -8,3 +8,18 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 SECRET_KEY = os.getenv("SECRET_KEY", "supersecretkey")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 60))
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 7))
+
+# Database engine profile
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 20))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 10))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("true", "1", "yes")
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", 500))
+DB_SQL_LOG_SAMPLE_RATE = float(os.getenv("DB_SQL_LOG_SAMPLE_RATE", 0))
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", 500))
+
+# Bearer token Prometheus must send to scrape /metrics; unset = endpoint disabled
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
@@ -1 +1,111 @@
 # submission.py
+#
+# Server-side finalization of timed attempts:
+# - score_answers() scores saved answers the way the quiz page does (answers
+#   and `correct` are 1-based option numbers; the score is a rounded percentage)
+# - accepted_answers() is the answer set a final submit is scored on: for a timed
+#   attempt, client answers only count for questions that are still open
+# - finalize_attempts() scores overdue running attempts with the answers saved
+#   so far, in one transaction for a batch of ids (rows locked by a concurrent
+#   submit are skipped and picked up again later)
+
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.quiz import Quiz
+from ..models.submission import Submission
+from ..utils.attempt_clock import attempt_clock, open_question
+from ..utils.response_cache import invalidate_on_commit
+
+
+def score_answers(questions: Sequence[dict], answers: Optional[Dict[str, int]]) -> Tuple[int, int, int, int]:
+    """(score, correct_count, incorrect_count, not_attempted_count) for saved answers."""
+    answers = answers or {}
+    correct = incorrect = 0
+    for index, question in enumerate(questions):
+        answer = answers.get(str(index))
+        if answer is None:
+            continue
+        if answer == question.get("correct"):
+            correct += 1
+        else:
+            incorrect += 1
+    total = len(questions)
+    score = int(correct * 100 / total + 0.5) if total else 0
+    return score, correct, incorrect, total - correct - incorrect
+
+
+def accepted_answers(sub: Submission, client_answers: Dict[str, Any], n_questions: int, now: datetime) -> Dict[str, int]:
+    """
+    Answers a final submit is scored on. Untimed attempts take the client's
+    answers; timed ones keep the saved answers for closed questions and take the
+    client's only for the open question and the ones after it.
+    """
+    answers = {
+        key: value for key, value in (client_answers or {}).items()
+        if key.isdigit() and int(key) < n_questions and isinstance(value, int) and not isinstance(value, bool)
+    }
+    if not sub.time_limits:
+        return answers
+    open_index, _ = open_question(sub.time_limits, sub.question_index, sub.question_deadline_at, now - attempt_clock.grace)
+    accepted = {key: value for key, value in (sub.answers or {}).items() if int(key) < open_index}
+    accepted.update({key: value for key, value in answers.items() if int(key) >= open_index})
+    return accepted
+
+
+async def load_questions(db: AsyncSession, quiz_ids) -> Dict[int, list]:
+    result = await db.execute(select(Quiz.id, Quiz.questions_json).where(Quiz.id.in_(quiz_ids)))
+    return {
+        quiz_id: json.loads(questions) if isinstance(questions, str) else (questions or [])
+        for quiz_id, questions in result.all()
+    }
+
+
+async def finalize_attempts(db: AsyncSession, submission_ids: Sequence[int], now: Optional[datetime] = None) -> List[Submission]:
+    """
+    Scores the given attempts whose deadline has passed and returns them.
+    The caller commits; finished attempts are closed on the attempt clock.
+    """
+    now = now or datetime.now(timezone.utc)
+    result = await db.execute(
+        select(Submission)
+        .where(Submission.id.in_(submission_ids), Submission.score.is_(None), Submission.deadline_at.is_not(None))
+        .with_for_update(skip_locked=True)
+    )
+    subs = result.scalars().all()
+    missing = set(submission_ids) - {sub.id for sub in subs}
+    if missing:
+        # Still running but locked by a concurrent submit: left for the next try
+        locked = await db.execute(
+            select(Submission.id).where(
+                Submission.id.in_(missing), Submission.score.is_(None), Submission.deadline_at.is_not(None)
+            )
+        )
+        # The rest were already scored (or deleted): nothing left to time
+        for submission_id in missing - set(locked.scalars().all()):
+            attempt_clock.close(submission_id)
+
+    overdue = [sub for sub in subs if attempt_clock.is_overdue(sub.deadline_at, now)]
+    for sub in subs:
+        if sub not in overdue:
+            # Deadline is later than this worker thought: re-arm with the stored one
+            attempt_clock.track(sub.id, sub.time_limits, sub.question_index, sub.question_deadline_at, sub.deadline_at)
+    if not overdue:
+        return []
+
+    questions_by_quiz = await load_questions(db, {sub.quiz_id for sub in overdue})
+
+    for sub in overdue:
+        sub.score, sub.correct_count, sub.incorrect_count, sub.not_attempted_count = score_answers(
+            questions_by_quiz.get(sub.quiz_id, []), sub.answers
+        )
+        sub.submitted_at = sub.deadline_at
+        sub.time_taken = (sub.deadline_at - sub.started_at).total_seconds()
+        sub.auto_finalized = True
+        invalidate_on_commit(db, f"leaderboard:{sub.quiz_id}", f"user:{sub.user_id}")
+        attempt_clock.close(sub.id)
+    return overdue
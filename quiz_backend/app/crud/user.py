@@ -1 +1,129 @@
 # user.py
+#
+# Bulk user import:
+# - parse a CSV (header row) or JSON (list of objects) upload
+# - validate rows in batches, reporting errors per row
+# - hash passwords in a process pool
+# - insert with multi-row INSERT ... ON CONFLICT (employee_id) DO NOTHING
+
+import csv
+import io
+import json
+from typing import Any, Dict, List
+
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.user import User
+from ..schemas.user import UserImportRow
+from ..utils.auth import hash_passwords_parallel
+
+IMPORT_BATCH_SIZE = 1000
+IMPORT_FIELDS = ("employee_id", "full_name", "email", "password")
+
+
+def parse_user_import(content: bytes, filename: str = "") -> List[Dict[str, Any]]:
+    """Parses an uploaded CSV or JSON file into a list of raw row dicts."""
+    text = content.decode("utf-8-sig")
+    if filename.lower().endswith(".json") or text.lstrip().startswith("["):
+        rows = json.loads(text)
+        if not isinstance(rows, list):
+            raise ValueError("JSON import must be a list of user objects")
+        return rows
+
+    reader = csv.DictReader(io.StringIO(text))
+    missing = {"employee_id", "full_name", "email"} - set(reader.fieldnames or [])
+    if missing:
+        raise ValueError(f"CSV is missing columns: {', '.join(sorted(missing))}")
+    return [
+        {key: (value.strip() if isinstance(value, str) else value) for key, value in row.items() if key in IMPORT_FIELDS}
+        for row in reader
+    ]
+
+
+async def _import_batch(db: AsyncSession, batch: List[tuple], report: Dict[str, Any]):
+    """Inserts one batch of (row number, UserImportRow) pairs."""
+    # Rows whose email already belongs to someone else would abort the whole insert
+    emails = [row.email for _, row in batch]
+    result = await db.execute(select(User.email).where(User.email.in_(emails)))
+    taken = {email for (email,) in result.all()}
+
+    pending = []
+    for row_number, row in batch:
+        if row.email in taken:
+            report["errors"].append({"row": row_number, "employee_id": row.employee_id, "error": "Email already registered"})
+        else:
+            pending.append((row_number, row))
+    if not pending:
+        return
+
+    # Hash only the rows that carry a password; the rest are SSO-only users
+    with_password = [row for _, row in pending if row.password]
+    hashes = iter(await hash_passwords_parallel([row.password for row in with_password]))
+    values = [
+        {
+            "employee_id": row.employee_id,
+            "full_name": row.full_name,
+            "email": row.email,
+            "password_hash": next(hashes) if row.password else None,
+            "is_admin": False,
+        }
+        for _, row in pending
+    ]
+
+    stmt = (
+        insert(User)
+        .values(values)
+        .on_conflict_do_nothing(index_elements=[User.employee_id])
+        .returning(User.employee_id)
+    )
+    result = await db.execute(stmt)
+    created = {employee_id for (employee_id,) in result.all()}
+    await db.commit()
+
+    report["created"] += len(created)
+    for row_number, row in pending:
+        if row.employee_id not in created:
+            report["skipped"] += 1
+            report["errors"].append({"row": row_number, "employee_id": row.employee_id, "error": "Employee ID already registered"})
+
+
+async def bulk_import_users(db: AsyncSession, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Imports users in batches and returns a per-row report.
+    Row numbers are 1-based positions in the uploaded data.
+    """
+    report: Dict[str, Any] = {"total_rows": len(rows), "created": 0, "skipped": 0, "failed": 0, "errors": []}
+    seen_employee_ids = set()
+    seen_emails = set()
+
+    for start in range(0, len(rows), IMPORT_BATCH_SIZE):
+        batch = []
+        for offset, raw in enumerate(rows[start:start + IMPORT_BATCH_SIZE]):
+            row_number = start + offset + 1
+            try:
+                row = UserImportRow.model_validate(raw)
+            except ValidationError as e:
+                message = "; ".join(
+                    f"{'.'.join(map(str, err['loc']))}: {err['msg']}" if err["loc"] else err["msg"]
+                    for err in e.errors()
+                )
+                employee_id = raw.get("employee_id") if isinstance(raw, dict) else None
+                report["errors"].append({"row": row_number, "employee_id": employee_id, "error": message})
+                continue
+
+            if row.employee_id in seen_employee_ids or row.email in seen_emails:
+                report["errors"].append({"row": row_number, "employee_id": row.employee_id, "error": "Duplicate row in upload"})
+                continue
+            seen_employee_ids.add(row.employee_id)
+            seen_emails.add(row.email)
+            batch.append((row_number, row))
+
+        if batch:
+            await _import_batch(db, batch, report)
+
+    report["failed"] = len(report["errors"]) - report["skipped"]
+    report["errors"].sort(key=lambda err: err["row"])
+    return report
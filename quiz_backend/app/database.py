@@ -1,12 +1,92 @@
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+import logging
+import random
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession, AsyncEngine
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from collections.abc import AsyncGenerator
-from .config import DATABASE_URL
+from .utils.sql_instrumentation import install_query_instrumentation
+from .utils.metrics import db_pool_checkout_wait
+from .config import (
+    DATABASE_URL,
+    DATABASE_REPLICA_URL,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING,
+    DB_STATEMENT_CACHE_SIZE,
+    DB_SQL_LOG_SAMPLE_RATE,
+    DB_SLOW_QUERY_MS,
+)
 
 SQLALCHEMY_DATABASE_URL = DATABASE_URL
 
-# define engine
-engine = create_async_engine(SQLALCHEMY_DATABASE_URL, echo=True)
+sql_logger = logging.getLogger("app.sql")
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waits for a connection."""
+
+    role = "primary"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_checkout_wait.observe(time.perf_counter() - started, self.role)
+
+
+def _engine_options(url: str, role: str) -> dict:
+    options = {
+        "poolclass": type(f"TimedQueuePool_{role}", (TimedQueuePool,), {"role": role}),
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+    if make_url(url).get_driver_name() == "asyncpg":
+        # SQLAlchemy's per-connection cache of prepared statements (asyncpg dialect)
+        options["connect_args"] = {"prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE}
+    return options
+
+
+def _install_sql_logging(engine: AsyncEngine, role: str):
+    # Replaces echo=True: logs a sample of statements plus every slow one
+    if DB_SQL_LOG_SAMPLE_RATE <= 0 and DB_SLOW_QUERY_MS <= 0:
+        return
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        context._query_started = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - context._query_started) * 1000
+        if DB_SLOW_QUERY_MS > 0 and elapsed_ms >= DB_SLOW_QUERY_MS:
+            sql_logger.warning("[%s] slow query %.1fms: %s", role, elapsed_ms, statement)
+        elif DB_SQL_LOG_SAMPLE_RATE > 0 and random.random() < DB_SQL_LOG_SAMPLE_RATE:
+            sql_logger.info("[%s] %.1fms: %s", role, elapsed_ms, statement)
+
+
+def build_engine(url: str, role: str = "primary") -> AsyncEngine:
+    engine = create_async_engine(url, **_engine_options(url, role))
+    _install_sql_logging(engine, role)
+    install_query_instrumentation(engine)
+    return engine
+
+
+# define engine (writes and read-your-writes paths)
+engine = build_engine(SQLALCHEMY_DATABASE_URL)
+
+# read replica; falls back to the primary when DATABASE_REPLICA_URL is not set
+read_engine = build_engine(DATABASE_REPLICA_URL, "replica") if DATABASE_REPLICA_URL else engine
 
 async_session = async_sessionmaker(
     bind=engine,
@@ -14,8 +94,19 @@ async_session = async_sessionmaker(
     expire_on_commit=False,
 )
 
+async_read_session = async_sessionmaker(
+    bind=read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
+
 Base = declarative_base()
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with async_session() as session:
         yield session
 
+# Read-only session for routes that tolerate replica lag (leaderboards, listings, exports)
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    async with async_read_session() as session:
+        yield session
+
@@ -6,6 +6,9 @@ from jose import JWTError, jwt
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from . import database, models, config
+from .utils.auth import ACCESS_TOKEN_TYPE
+from .utils.principal_cache import Principal, principal_cache
+from .utils.structured_logging import bind_log_context
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
@@ -21,22 +24,28 @@ async def get_current_user(
     try:
         payload = jwt.decode(token, config.SECRET_KEY, algorithms=[config.ALGORITHM])
         email: str = payload.get("sub")
-        if email is None:
+        # Only access tokens: refresh and profile tokens are signed with the same key
+        if email is None or payload.get("type") != ACCESS_TOKEN_TYPE:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
 
+    # Serve the principal from cache; only a miss touches the database
+    principal = principal_cache.get(email)
+    if principal is not None:
+        bind_log_context(user_id=principal.id)
+        return principal
+
     result = await db.execute(select(models.User).where(models.User.email == email))
     user = result.scalars().first()
     if user is None:
         raise credentials_exception
-    return user
+    principal = Principal.from_user(user)
+    principal_cache.set(email, principal)
+    bind_log_context(user_id=principal.id)
+    return principal
 
-async def get_current_admin(
-    token: str = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(database.get_db)
-):
-    user = await get_current_user(token, db)
+async def get_current_admin(user: Principal = Depends(get_current_user)):
     if not user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -1,32 +1,35 @@
 import os
+from functools import lru_cache
 from dotenv import load_dotenv
 from pathlib import Path
-from fastapi_mail import FastMail, ConnectionConfig
-
-load_dotenv(load_dotenv(dotenv_path=Path(__file__).resolve().parent.parent / ".env"))
-
-print("📧 Email config:", {
-    "MAIL_USERNAME": os.getenv("MAIL_USERNAME"),
-    "MAIL_PASSWORD": os.getenv("MAIL_PASSWORD"),
-    "MAIL_FROM": os.getenv("MAIL_FROM"),
-    "MAIL_PORT": os.getenv("MAIL_PORT"),
-    "MAIL_STARTTLS": os.getenv("MAIL_STARTTLS"),
-    "MAIL_SSL_TLS": os.getenv("MAIL_SSL_TLS")
-})
-
-
-conf = ConnectionConfig(
-    MAIL_USERNAME=os.getenv("MAIL_USERNAME"),
-    MAIL_PASSWORD=os.getenv("MAIL_PASSWORD"),
-    MAIL_FROM=os.getenv("MAIL_FROM"),
-    MAIL_FROM_NAME=os.getenv("MAIL_FROM_NAME"),
-    MAIL_PORT=int(os.getenv("MAIL_PORT")),
-    MAIL_SERVER=os.getenv("MAIL_SERVER"),
-    MAIL_STARTTLS=os.getenv("MAIL_STARTTLS", "True").lower() in ("true", "1", "yes"),
-    MAIL_SSL_TLS=os.getenv("MAIL_SSL_TLS", "False").lower() in ("true", "1", "yes"),
-
-    USE_CREDENTIALS=True,
-    VALIDATE_CERTS=True
-)
-
-fast_mail = FastMail(conf)
+
+load_dotenv(dotenv_path=Path(__file__).resolve().parent.parent / ".env")
+
+# fastapi_mail and the SMTP config are loaded on first use (password reset,
+# reminder emails) instead of at import, so worker start doesn't pay for them
+
+
+@lru_cache(maxsize=1)
+def get_mail_config():
+    from fastapi_mail import ConnectionConfig
+
+    return ConnectionConfig(
+        MAIL_USERNAME=os.getenv("MAIL_USERNAME"),
+        MAIL_PASSWORD=os.getenv("MAIL_PASSWORD"),
+        MAIL_FROM=os.getenv("MAIL_FROM"),
+        MAIL_FROM_NAME=os.getenv("MAIL_FROM_NAME"),
+        MAIL_PORT=int(os.getenv("MAIL_PORT")),
+        MAIL_SERVER=os.getenv("MAIL_SERVER"),
+        MAIL_STARTTLS=os.getenv("MAIL_STARTTLS", "True").lower() in ("true", "1", "yes"),
+        MAIL_SSL_TLS=os.getenv("MAIL_SSL_TLS", "False").lower() in ("true", "1", "yes"),
+
+        USE_CREDENTIALS=True,
+        VALIDATE_CERTS=True
+    )
+
+
+@lru_cache(maxsize=1)
+def get_fast_mail():
+    from fastapi_mail import FastMail
+
+    return FastMail(get_mail_config())
@@ -1,15 +1,24 @@
-from fastapi import FastAPI
+import hmac
+
+from fastapi import FastAPI, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.requests import Request
 from fastapi import status
 from fastapi.exceptions import RequestValidationError
 from fastapi.exception_handlers import http_exception_handler
 from app.models.user import User
 from app.models.quiz import Quiz
-from app.routers import leaderboard, oauth
-from app.routers import quiz_attempt
-from app.email import fast_mail  # correct name
+from app.config import METRICS_TOKEN
+from app.utils.oidc import oidc_provider
+from app.utils.admission import AdmissionControlMiddleware
+from app.utils.sql_instrumentation import QueryInstrumentationMiddleware
+from app.utils.metrics import MetricsMiddleware, registry as metrics_registry
+from app.utils.profiling import ProfilingMiddleware
+from app.utils.loop_watchdog import loop_watchdog
+from app.utils.scheduler import scheduler
+from app.utils.attempt_clock import attempt_clock
+from app.utils.structured_logging import LogContextMiddleware, configure_logging, log_event, stop_logging
 from starlette.middleware.sessions import SessionMiddleware
 
 from dotenv import load_dotenv 
@@ -29,10 +38,12 @@ from .routers import (
 import logging
 import os
 
-logger = logging.getLogger("uvicorn")
-logger.setLevel(logging.DEBUG)
-
 load_dotenv()
+
+# Queue-based structured logging (LOG_LEVEL / LOG_LEVELS / LOG_FORMAT / LOG_SAMPLE_RATES)
+configure_logging()
+logger = logging.getLogger("app")
+
 app = FastAPI(
     title="Quiz Application Backend",
     description="FastAPI backend for role-based quiz application",
@@ -45,8 +56,8 @@ if not SESSION_SECRET:
     raise RuntimeError("SESSION_SECRET_KEY is not set in your environment")
 
 
-print(f"[DEBUG] SESSION_SECRET = {SESSION_SECRET}")
-
+# Admission control: per-user/IP rate limits and route-class concurrency (429 + Retry-After)
+app.add_middleware(AdmissionControlMiddleware)
 
 app.add_middleware(
     SessionMiddleware,
@@ -56,6 +67,19 @@ app.add_middleware(
     session_cookie="session"
 )
 
+# Per-request query count / DB time (Server-Timing header, request log, N+1 flagging)
+app.add_middleware(QueryInstrumentationMiddleware)
+
+# Per-route latency histograms and in-flight requests for /metrics
+app.add_middleware(MetricsMiddleware)
+
+# On-demand sampling profiles (X-Profile-Token header or PROFILE_SAMPLE_RATE)
+app.add_middleware(ProfilingMiddleware)
+
+
+# Request id + per-request log context for every log line (X-Request-ID)
+app.add_middleware(LogContextMiddleware)
+
 
 # CORS setup
 origins = [
@@ -83,16 +107,48 @@ app.include_router(leaderboard.router)
 app.include_router(quiz.router)
 app.include_router(question.router)
 app.include_router(submission.router)
-app.include_router(leaderboard.router)
 app.include_router(oauth.router)
 
+@app.on_event("startup")
+async def start_background_tasks():
+    # Warm and keep refreshing the OIDC discovery/JWKS cache for Google login
+    oidc_provider.start()
+    # Event-loop lag heartbeat + blocking-call attribution (GET /admin/loop-lag)
+    loop_watchdog.start()
+    # Jobs from the scheduled_jobs table (quiz expiry, reminders, token cleanup)
+    scheduler.start()
+    # Attempt deadline timers (auto-finalize timed quiz attempts)
+    attempt_clock.start()
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    await oidc_provider.stop()
+    await loop_watchdog.stop()
+    await scheduler.stop()
+    await attempt_clock.stop()
+    stop_logging()
+
 @app.get("/")
 async def root():
     return {"message": "Quiz App Backend is running 🚀"}
 
+# Prometheus scrape endpoint: needs "Authorization: Bearer $METRICS_TOKEN" (the
+# scrape config's `authorization` block); without METRICS_TOKEN it is not served
+@app.get("/metrics", include_in_schema=False)
+async def metrics(authorization: str = Header("")):
+    if not METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not hmac.compare_digest(authorization.encode(), f"Bearer {METRICS_TOKEN}".encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
-    print(f"🔥 Unhandled Exception: {repr(exc)}")
+    log_event(logger, "unhandled_exception", logging.ERROR, exc_info=exc, method=request.method, path=request.url.path)
     return JSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={"detail": str(exc)},
@@ -100,7 +156,7 @@ async def global_exception_handler(request: Request, exc: Exception):
 
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
-    print(f"🔥 Validation Error: {exc.errors()}")
+    log_event(logger, "validation_error", method=request.method, path=request.url.path, errors=len(exc.errors()))
     return JSONResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
         content={"detail": exc.errors()},
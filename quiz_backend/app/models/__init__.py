@@ -9,4 +9,6 @@ from .feedback import Feedback
 # from .quiz_attempt import QuizAttempt
 from .quiz_auto import AutoQuiz
 from .quiz_group import QuizGroup
-from .submission import Submission
\ No newline at end of file
+from .submission import Submission
+from .revoked_token import RevokedToken
+from .scheduled_job import ScheduledJob
\ No newline at end of file
@@ -1,6 +1,6 @@
 
 
-from sqlalchemy import Column, Integer, ForeignKey
+from sqlalchemy import Column, Integer, ForeignKey, Index
 from ..database import Base
 
 class QuizAccess(Base):
@@ -9,3 +9,7 @@ class QuizAccess(Base):
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("user.id", ondelete="CASCADE"))
     quiz_id = Column(Integer, ForeignKey("quiz.id", ondelete="CASCADE"))
+
+# One assignment per user and quiz; the second index serves per-quiz status queries
+Index("uq_quiz_access_user_quiz", QuizAccess.user_id, QuizAccess.quiz_id, unique=True)
+Index("ix_quiz_access_quiz_user", QuizAccess.quiz_id, QuizAccess.user_id)
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, String, Integer, ForeignKey, DateTime
+from sqlalchemy.sql import func
+from ..database import Base
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+
+    # Refresh token jti, or "family:<id>" when a whole rotation family is revoked
+    jti = Column(String, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    revoked_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, Text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from ..database import Base
+
+class ScheduledJob(Base):
+    __tablename__ = "scheduled_jobs"
+
+    # Unique job name, e.g. "purge_expired_tokens" or "quiz_reminder:12"
+    name = Column(String, primary_key=True)
+    handler = Column(String, nullable=False)                 # registered handler name (app.utils.scheduler)
+    payload = Column(JSONB, nullable=False, default=dict)
+    interval_seconds = Column(Integer, nullable=True)        # recurring every N seconds; NULL = one-shot
+    next_run_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    enabled = Column(Boolean, nullable=False, default=True)  # one-shot jobs are disabled after they succeed
+    run_count = Column(Integer, nullable=False, default=0)
+    last_run_at = Column(DateTime(timezone=True), nullable=True)
+    last_status = Column(String, nullable=True)              # "ok" / "error"
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
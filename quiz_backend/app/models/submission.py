@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, Float, JSON
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Float, JSON, Index, Boolean
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..database import Base
@@ -9,7 +9,7 @@ class Submission(Base):
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     quiz_id = Column(Integer, ForeignKey("quizzes.id"), nullable=False)
-    score = Column(Integer, nullable=False)
+    score = Column(Integer, nullable=True)  # NULL while a timed attempt is running
     correct_count = Column(Integer)
     incorrect_count = Column(Integer)
     not_attempted_count = Column(Integer)
@@ -17,3 +17,15 @@ class Submission(Base):
     submitted_at = Column(DateTime(timezone=True), server_default=func.now())
     started_at = Column(DateTime(timezone=True))
     answers = Column(JSON)
+    # Server-side deadlines of a timed attempt (app.utils.attempt_clock); NULL for untimed quizzes
+    time_limits = Column(JSON, nullable=True)                          # seconds per question, fixed at start
+    question_index = Column(Integer, nullable=True)                    # open question
+    question_deadline_at = Column(DateTime(timezone=True), nullable=True)
+    deadline_at = Column(DateTime(timezone=True), nullable=True)
+    auto_finalized = Column(Boolean, nullable=False, default=False, server_default="false")  # scored when time ran out
+
+# Leaderboard order within a quiz, and per-user attempt lookups
+Index("ix_submissions_quiz_leaderboard", Submission.quiz_id, Submission.score.desc(), Submission.time_taken.asc())
+Index("ix_submissions_user_quiz", Submission.user_id, Submission.quiz_id)
+# Overdue-attempt sweep: running attempts by deadline
+Index("ix_submissions_open_deadline", Submission.deadline_at, postgresql_where=Submission.score.is_(None))
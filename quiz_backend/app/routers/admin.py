@@ -1,15 +1,15 @@
 
 # Import FastAPI modules for routing, dependency injection, and error handling
-from fastapi import APIRouter, Depends, HTTPException, Body, Query
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Body, Query, UploadFile, File
+from fastapi.responses import FileResponse, StreamingResponse
 
 # Import SQLAlchemy modules for async database interaction
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, text, delete, insert
+from sqlalchemy import select, text, delete, insert, func, exists, or_
 
 
 # Import database session dependency
-from ..database import get_db
+from ..database import get_db, get_read_db
 
 # Import models for Quiz, User, Submission, etc.
 from ..models.quiz import Quiz
@@ -25,22 +25,44 @@ from .. import models # For accessing other models dynamically
 from ..schemas.quiz import QuizCreate
 from ..schemas.assignment import UserAssignment
 
+# Import CRUD helpers
+from ..crud.user import parse_user_import, bulk_import_users
+
+# Import analytics helpers
+from ..analytics.item_analysis import get_quiz_item_stats
+from ..analytics.score_stats import get_merged_stats, rebuild_quiz_stats
+
 # Import dependency for checking if user is an admin
 from ..dependencies import get_current_admin
+from ..utils.principal_cache import principal_cache
+from ..utils.auth import hashing_metrics
+from ..utils.admission import admission_controller
+from ..utils.sql_instrumentation import n_plus_one
+from ..utils.profiling import issue_profile_token, list_profiles, profile_path
+from ..utils.structured_logging import log_event
+from ..utils.response_cache import cached, invalidate_on_commit, response_cache
+from ..utils.loop_watchdog import loop_watchdog
+from ..utils.scheduler import scheduler
+from ..utils.attempt_clock import attempt_clock
 
 # Import email sending utility
-from ..email import fast_mail
-from fastapi_mail import MessageSchema, MessageType
+from ..utils.mail_dispatcher import dispatcher, html_message
 
 # Import standard modules
-from typing import List
-from datetime import datetime, timezone
+from typing import List, Literal, Optional
+from datetime import datetime, timedelta, timezone
 import urllib.parse
+import html
 import io
-import pandas as pd
+import logging
+import os
 
 # Define router for admin operations with /admin prefix and "admin" tag
 router = APIRouter(prefix="/admin", tags=["admin"])
+logger = logging.getLogger("app.admin")
+
+# How long before a quiz's active_till the pending users get a reminder
+QUIZ_REMINDER_LEAD_HOURS = float(os.getenv("QUIZ_REMINDER_LEAD_HOURS", 24))
 
 
 # Create a new group and add existing users by their email
@@ -66,11 +88,13 @@ async def create_group(
     for user in users:
         db.add(models.GroupMember(group_id=group.id, user_id=user.id))
 
+    invalidate_on_commit(db, "groups", f"group:{group.id}")
     await db.commit()
     return {"message": "Group created", "group_id": group.id}
 
 # List all groups with their ID and name
 @router.get("/groups")
+@cached(ttl=300, tags=("groups",))
 async def get_groups(db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(models.Group))
     groups = result.scalars().all()
@@ -78,6 +102,7 @@ async def get_groups(db: AsyncSession = Depends(get_db)):
 
 # Get list of member emails in a specific group
 @router.get("/groups/{group_id}/members")
+@cached(ttl=300, tags=("group:{group_id}",))
 async def get_group_members(group_id: int, db: AsyncSession = Depends(get_db)):
     result = await db.execute(
         select(User.email)
@@ -98,6 +123,7 @@ async def update_group_members(group_id: int, emails: List[str] = Body(...), db:
     for user in users:
         db.add(GroupMember(group_id=group_id, user_id=user.id))
 
+    invalidate_on_commit(db, f"group:{group_id}")
     await db.commit()
     return {"message": "Group updated"}
 
@@ -126,6 +152,7 @@ async def assign_quiz_to_group(
             {"user_id": user_id, "quiz_id": quiz_id}
         )
 
+    invalidate_on_commit(db, f"quiz:{quiz_id}", *(f"user:{user_id}" for user_id in user_ids))
     await db.commit()
     return {"message": f"Quiz {quiz_id} assigned to group {group_id}."}
 
@@ -145,6 +172,9 @@ async def create_quiz(
         active_till=payload.active_till
     )
     db.add(quiz)
+    invalidate_on_commit(db, "quizzes")
+    await db.flush()
+    await _schedule_deadline_reminder(db, quiz)
     await db.commit()
     await db.refresh(quiz)
     return {"message": "Quiz created successfully", "quiz_id": quiz.id}
@@ -152,6 +182,7 @@ async def create_quiz(
  
 # Get all quiz templates with ID and question count
 @router.get("/quiz-templates")
+@cached(ttl=300, tags=("templates",))
 async def get_quiz_templates(db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(AutoQuiz))
     quizzes = result.scalars().all()
@@ -166,6 +197,7 @@ async def get_quiz_templates(db: AsyncSession = Depends(get_db)):
 
 # Get specific quiz template with full question details
 @router.get("/quiz-template/{quiz_id}")
+@cached(ttl=300, tags=("templates",))
 async def get_quiz_template(quiz_id: int, db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(AutoQuiz).where(AutoQuiz.id == quiz_id))
     quiz = result.scalars().first()
@@ -177,8 +209,9 @@ async def get_quiz_template(quiz_id: int, db: AsyncSession = Depends(get_db)):
         "questions": quiz.questions or []
     }
 
-# List all quizzes (active & inactive) and auto-deactivate expired ones
+# List all quizzes (active & inactive); expired ones are deactivated by the quiz_expiry job
 @router.get("/quizzes")
+@cached(ttl=30, tags=("quizzes",))
 async def list_quizzes(
     db: AsyncSession = Depends(get_db),
     admin=Depends(get_current_admin)
@@ -186,21 +219,14 @@ async def list_quizzes(
     result = await db.execute(select(Quiz))
     quizzes = result.scalars().all()
 
-    now = datetime.now(timezone.utc)
-    updated = False
-    for quiz in quizzes:
-        # Only auto-deactivate quizzes that were not manually reactivated after expiry
-        if quiz.active_till and quiz.active_till < now and quiz.is_active and not quiz.manual_override_quiz_active:
-            quiz.is_active = False
-
-            db.add(quiz)
-            updated = True
+    # Only quizzes that were not manually reactivated after expiry count as expired
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    def is_active(q):
+        expired = q.active_till and q.active_till < now and not q.manual_override_quiz_active
+        return bool(q.is_active and not expired)
 
-    if updated:
-        await db.commit()  # Save any status change
-
-    active = [q for q in quizzes if q.is_active]
-    inactive = [q for q in quizzes if not q.is_active]
+    active = [q for q in quizzes if is_active(q)]
+    inactive = [q for q in quizzes if not is_active(q)]
 
     return {
         "active_quizzes": [
@@ -209,7 +235,7 @@ async def list_quizzes(
                 "title": q.title,
                 "description": q.description,
                 "created_at": q.created_at,
-                "is_active": q.is_active,
+                "is_active": True,
                 "total_questions": len(q.questions_json or []),
                 "active_till": q.active_till
             }
@@ -221,7 +247,7 @@ async def list_quizzes(
                 "title": q.title,
                 "description": q.description,
                 "created_at": q.created_at,
-                "is_active": q.is_active,
+                "is_active": False,
                 "total_questions": len(q.questions_json or []),
                 "active_till": q.active_till
             }
@@ -244,6 +270,7 @@ async def assign_quiz(
             ),
             {"user_id": int(user_id), "quiz_id": quiz_id}  # force int
         )
+    invalidate_on_commit(db, f"quiz:{quiz_id}", *(f"user:{int(user_id)}" for user_id in assignment.user_ids))
     await db.commit()
     return {"message": f"Quiz {quiz_id} assigned to selected users."}
 
@@ -261,11 +288,13 @@ async def toggle_quiz(
         raise HTTPException(status_code=404, detail="Quiz not found")
     quiz.is_active = not quiz.is_active
     quiz.manual_override_quiz_active = True
+    invalidate_on_commit(db, "quizzes", f"quiz:{quiz_id}")
     await db.commit()
     return {"message": f"Quiz {quiz_id} is now {'active' if quiz.is_active else 'inactive'}."}
 
 # List all non-admin users with basic info
 @router.get("/users")
+@cached(ttl=60, tags=("users",))
 async def list_users(
     db: AsyncSession = Depends(get_db),
     admin=Depends(get_current_admin)
@@ -277,6 +306,22 @@ async def list_users(
         for u in users
     ]
 
+# Bulk import users from a CSV (header row) or JSON (list of objects) upload
+# - Columns: employee_id, full_name, email, password (optional, for SSO-only users)
+# - Existing employee IDs are skipped; returns a per-row error report
+@router.post("/import-users")
+async def import_users(
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_db),
+    admin=Depends(get_current_admin)
+):
+    try:
+        rows = parse_user_import(await file.read(), file.filename or "")
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid import file: {e}")
+    invalidate_on_commit(db, "users")
+    return await bulk_import_users(db, rows)
+
 # List latest quiz submissions (limit defaults to 5)
 @router.get("/submissions")
 async def list_submissions(
@@ -310,94 +355,305 @@ async def list_submissions(
     ]
 
 
+# Build the assigned-users query for a quiz, filtered to attempted or pending users.
+# Pending users are resolved with NOT EXISTS so Postgres plans it as an anti-join.
+def _quiz_status_users_query(quiz_id: int, attempted: bool, search: Optional[str] = None):
+    has_submission = (
+        exists()
+        .where(Submission.quiz_id == quiz_id)
+        .where(Submission.user_id == User.id)
+    )
+    query = (
+        select(User.id, User.full_name, User.email)
+        .join(QuizAccess, QuizAccess.user_id == User.id)
+        .where(QuizAccess.quiz_id == quiz_id)
+        .where(has_submission if attempted else ~has_submission)
+    )
+    if search:
+        query = query.where(or_(
+            User.full_name.icontains(search, autoescape=True),
+            User.email.icontains(search, autoescape=True),
+        ))
+    return query
+
+
 # Show quiz attempt status: total assigned, attempted, and pending users
+# - Counts are computed in a single aggregate query
+# - counts_only=true skips the user lists (use /quiz-status/{quiz_id}/{status} to page them)
 @router.get("/quiz-status/{quiz_id}")
-async def get_quiz_status(quiz_id: int, db: AsyncSession = Depends(get_db)):
+async def get_quiz_status(
+    quiz_id: int,
+    counts_only: bool = Query(False),
+    db: AsyncSession = Depends(get_db)
+):
     try:
-        # Fetch quiz title
-        quiz_result = await db.execute(select(Quiz.title).where(Quiz.id == quiz_id))
-        quiz_title_row = quiz_result.first()
-        quiz_title = quiz_title_row[0] if quiz_title_row else "Untitled Quiz"
-
-        # Assigned users
-        assigned_users_result = await db.execute(
-            select(User.id, User.full_name, User.email)
-            .join(QuizAccess, QuizAccess.user_id == User.id)
-            .where(QuizAccess.quiz_id == quiz_id)
+        has_submission = (
+            exists()
+            .where(Submission.quiz_id == QuizAccess.quiz_id)
+            .where(Submission.user_id == QuizAccess.user_id)
         )
-        assigned_users = assigned_users_result.all()
-
-        # Attempted user IDs
-        submitted_user_ids_result = await db.execute(
-            select(Submission.user_id)
-            .where(Submission.quiz_id == quiz_id)
-            .distinct()
+        quiz_title = select(Quiz.title).where(Quiz.id == quiz_id).scalar_subquery()
+        counts_result = await db.execute(
+            select(
+                quiz_title.label("quiz_title"),
+                func.count(QuizAccess.id).label("total_assigned"),
+                func.count(QuizAccess.id).filter(has_submission).label("attempted_count"),
+            )
+            .select_from(QuizAccess)
+            .join(User, QuizAccess.user_id == User.id)
+            .where(QuizAccess.quiz_id == quiz_id)
         )
-        submitted_user_ids = {uid for (uid,) in submitted_user_ids_result.all()}
-
-        attempted = []
-        pending = []
+        counts = counts_result.one()
 
-        for user in assigned_users:
-            user_data = {
-                "id": user.id,
-                "full_name": user.full_name,
-                "email": user.email
-            }
-            if user.id in submitted_user_ids:
-                attempted.append(user_data)
-            else:
-                pending.append(user_data)
-
-        return {
-            "quiz_title": quiz_title,
-            "total_assigned": len(assigned_users),
-            "attempted": attempted,
-            "pending": pending
+        response = {
+            "quiz_title": counts.quiz_title or "Untitled Quiz",
+            "total_assigned": counts.total_assigned,
+            "attempted_count": counts.attempted_count,
+            "pending_count": counts.total_assigned - counts.attempted_count,
         }
+        if counts_only:
+            return response
+
+        attempted_result = await db.execute(_quiz_status_users_query(quiz_id, attempted=True))
+        pending_result = await db.execute(_quiz_status_users_query(quiz_id, attempted=False))
+        response["attempted"] = [dict(row) for row in attempted_result.mappings().all()]
+        response["pending"] = [dict(row) for row in pending_result.mappings().all()]
+        return response
 
     except Exception as e:
-        print("🔥 Error in get_quiz_status:", repr(e))
+        log_event(logger, "quiz_status.failed", logging.ERROR, exc_info=e, quiz_id=quiz_id)
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
 
-# Send follow-up reminder emails to users who haven't attempted the quiz
-@router.post("/send-followup-email/{quiz_id}")
-async def send_followup_email(
+# Paginated, searchable list of attempted or pending users for a quiz
+@router.get("/quiz-status/{quiz_id}/{status}")
+async def get_quiz_status_users(
     quiz_id: int,
-    payload: dict = Body(...),
+    status: Literal["attempted", "pending"],
+    page: int = Query(1, ge=1),
+    page_size: int = Query(50, ge=1, le=500),
+    search: Optional[str] = Query(None),
     db: AsyncSession = Depends(get_db),
     admin=Depends(get_current_admin)
 ):
-    try:
-        emails: List[str] = payload.get("emails", [])
-        quiz_title: str = payload.get("quiz_title", "a quiz")
-
-        if not emails:
-            raise HTTPException(status_code=400, detail="No emails provided.")
-
-        message = MessageSchema(
-            subject=f"Reminder: Complete your quiz - {quiz_title}",
-            recipients=emails,
-            body=f"""
-            <p>Dear User,</p>
-            <p>This is a reminder to complete the quiz titled <strong>{quiz_title}</strong>.</p>
+    query = _quiz_status_users_query(quiz_id, attempted=(status == "attempted"), search=search)
+    total_result = await db.execute(select(func.count()).select_from(query.subquery()))
+    total = total_result.scalar_one()
+
+    result = await db.execute(
+        query
+        .order_by(User.full_name, User.id)
+        .offset((page - 1) * page_size)
+        .limit(page_size)
+    )
+    return {
+        "status": status,
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "users": [dict(row) for row in result.mappings().all()]
+    }
+
+
+# Per-question item analysis (difficulty, discrimination, distractors, KR-20) for a quiz
+@router.get("/quiz-analytics/{quiz_id}")
+async def get_quiz_analytics(
+    quiz_id: int,
+    db: AsyncSession = Depends(get_db),
+    admin=Depends(get_current_admin)
+):
+    result = await db.execute(select(Quiz).where(Quiz.id == quiz_id))
+    quiz = result.scalars().first()
+    if not quiz:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+    return await get_quiz_item_stats(db, quiz)
+
+
+# Score and time_taken distribution (mean, median, percentiles, histogram)
+# - Pass several quiz_ids to get statistics merged across quizzes
+# - refresh=true rebuilds the statistics from the submissions table first
+@router.get("/stats")
+async def get_score_stats(
+    quiz_ids: List[int] = Query(...),
+    refresh: bool = Query(False),
+    db: AsyncSession = Depends(get_db),
+    admin=Depends(get_current_admin)
+):
+    if refresh:
+        for quiz_id in set(quiz_ids):
+            await rebuild_quiz_stats(db, quiz_id)
+    stats = await get_merged_stats(db, quiz_ids)
+    return {"quiz_ids": quiz_ids, **stats.to_dict()}
+
+
+def _reminder_messages(quiz_title: str, users) -> list:
+    return [
+        html_message(
+            f"Reminder: Complete your quiz - {quiz_title}",
+            user.email,
+            f"""
+            <p>Dear {html.escape(user.full_name or "User")},</p>
+            <p>This is a reminder to complete the quiz titled <strong>{html.escape(quiz_title)}</strong>.</p>
             <p>Please complete it as soon as possible.</p>
             <p>Regards,<br>Forsys Quiz Team</p>
             """,
-            subtype=MessageType.html,
         )
+        for user in users
+    ]
 
-        await fast_mail.send_message(message)
-        return {"message": "Follow-up emails sent to pending users."}
 
-    except Exception as e:
-        print("🔥 Error sending follow-up emails:", repr(e))
-        raise HTTPException(status_code=500, detail="Failed to send emails.")
+# Scheduled reminder before a quiz's active_till, sent to users who haven't attempted it yet
+@scheduler.handler("quiz_deadline_reminder")
+async def send_deadline_reminder(db: AsyncSession, payload: dict):
+    quiz_id = payload["quiz_id"]
+    quiz_result = await db.execute(select(Quiz.title, Quiz.is_active).where(Quiz.id == quiz_id))
+    quiz_row = quiz_result.first()
+    if not quiz_row or not quiz_row.is_active:
+        return {"quiz_id": quiz_id, "recipients": 0}
+
+    pending_result = await db.execute(_quiz_status_users_query(quiz_id, attempted=False))
+    pending_users = pending_result.all()
+    if not pending_users:
+        return {"quiz_id": quiz_id, "recipients": 0}
+    job = dispatcher.submit(
+        _reminder_messages(quiz_row.title, pending_users),
+        description=f"Deadline reminders for quiz {quiz_id}",
+    )
+    return {"quiz_id": quiz_id, "recipients": job.total, "mail_job": job.id}
+
+
+async def _schedule_deadline_reminder(db: AsyncSession, quiz: Quiz):
+    if not quiz.active_till:
+        return
+    # active_till is stored as naive UTC; the create payload sends a date (midnight)
+    active_till = quiz.active_till
+    if not isinstance(active_till, datetime):
+        active_till = datetime.combine(active_till, datetime.min.time())
+    if active_till.tzinfo is None:
+        active_till = active_till.replace(tzinfo=timezone.utc)
+    run_at = active_till - timedelta(hours=QUIZ_REMINDER_LEAD_HOURS)
+    if run_at > datetime.now(timezone.utc):
+        await scheduler.schedule_once(db, f"quiz_reminder:{quiz.id}", "quiz_deadline_reminder", run_at, {"quiz_id": quiz.id})
+
+
+# Queue personalized follow-up reminder emails to users who haven't attempted the quiz
+# - Pending users are computed server-side (quiz_access minus submissions)
+# - Returns immediately with a job id; poll /admin/mail-jobs/{job_id} for progress
+@router.post("/send-followup-email/{quiz_id}", status_code=202)
+async def send_followup_email(
+    quiz_id: int,
+    db: AsyncSession = Depends(get_db),
+    admin=Depends(get_current_admin)
+):
+    quiz_result = await db.execute(select(Quiz.title).where(Quiz.id == quiz_id))
+    quiz_row = quiz_result.first()
+    if not quiz_row:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+    quiz_title = quiz_row[0]
+
+    pending_result = await db.execute(_quiz_status_users_query(quiz_id, attempted=False))
+    pending_users = pending_result.all()
+    if not pending_users:
+        raise HTTPException(status_code=400, detail="No pending users for this quiz.")
+
+    messages = _reminder_messages(quiz_title, pending_users)
+    job = dispatcher.submit(messages, description=f"Follow-up reminders for quiz {quiz_id}")
+    return {
+        "message": "Follow-up emails queued for pending users.",
+        "job_id": job.id,
+        "recipients": job.total
+    }
+
+# In-process cache statistics (sizes, hit ratios)
+@router.get("/cache-stats")
+async def get_cache_stats(admin=Depends(get_current_admin)):
+    return {
+        "principal": principal_cache.stats(),
+        "response": response_cache.stats(),
+    }
+
+# Drop cached responses by tag (e.g. ["quizzes", "leaderboard:12"]) or all of them
+@router.post("/cache/invalidate")
+async def invalidate_response_cache(tags: Optional[List[str]] = Body(None, embed=True), admin=Depends(get_current_admin)):
+    if tags:
+        response_cache.invalidate(*tags)
+    else:
+        response_cache.clear()
+    return response_cache.stats()
+
+# Password hashing pool statistics (concurrency, queue time, rehash-on-login count)
+@router.get("/hashing-stats")
+async def get_hashing_stats(admin=Depends(get_current_admin)):
+    return hashing_metrics.stats()
+
+# Admission control statistics (in-flight per route class, admitted and shed counts)
+@router.get("/admission-stats")
+async def get_admission_stats(admin=Depends(get_current_admin)):
+    return admission_controller.stats()
+
+# Routes flagged for repeated identical statements (N+1), with the worst offending statement
+@router.get("/query-stats")
+async def get_query_stats(admin=Depends(get_current_admin)):
+    return n_plus_one.stats()
+
+# Event-loop lag percentiles and the code that blocked the loop longest (top offenders)
+@router.get("/loop-lag")
+async def get_loop_lag(top: int = Query(20, ge=1, le=200), admin=Depends(get_current_admin)):
+    return loop_watchdog.stats(top)
+
+# Start a fresh measurement window (e.g. after moving a hotspot off the loop)
+@router.post("/loop-lag/reset")
+async def reset_loop_lag(admin=Depends(get_current_admin)):
+    loop_watchdog.reset()
+    return loop_watchdog.stats(0)
+
+# Scheduled jobs with their next run and last outcome, plus this worker's scheduler state
+@router.get("/jobs")
+async def list_scheduled_jobs(db: AsyncSession = Depends(get_db), admin=Depends(get_current_admin)):
+    return {"scheduler": scheduler.stats(), "jobs": await scheduler.list_jobs(db)}
+
+# Make a job due immediately (it runs on whichever worker picks it up first)
+@router.post("/jobs/{name}/run-now")
+async def run_scheduled_job_now(name: str, db: AsyncSession = Depends(get_db), admin=Depends(get_current_admin)):
+    if not await scheduler.run_now(db, name):
+        raise HTTPException(status_code=404, detail="Job not found")
+    await db.commit()
+    return {"message": f"Job {name} queued."}
+
+# This worker's attempt deadline timers (tracked attempts, auto-finalized, late answers rejected)
+@router.get("/attempt-clock")
+async def get_attempt_clock_stats(admin=Depends(get_current_admin)):
+    return attempt_clock.stats()
+
+# Short-lived token for profiling requests: send it as the X-Profile-Token header
+@router.post("/profiles/token")
+async def create_profile_token(admin=Depends(get_current_admin)):
+    return {"header": "X-Profile-Token", "token": issue_profile_token(admin.email), "expires_in_minutes": 10}
+
+# Captured request profiles, newest first
+@router.get("/profiles")
+async def get_profiles(admin=Depends(get_current_admin)):
+    return list_profiles()
+
+# Download a profile as folded stacks (flamegraph.pl / speedscope / inferno)
+@router.get("/profiles/{profile_id}")
+async def download_profile(profile_id: str, admin=Depends(get_current_admin)):
+    path = profile_path(profile_id)
+    if not path:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain", filename=f"{profile_id}.folded")
+
+# Progress of a queued email job
+@router.get("/mail-jobs/{job_id}")
+async def get_mail_job(job_id: str, admin=Depends(get_current_admin)):
+    job = dispatcher.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Mail job not found")
+    return job.to_dict()
 
 # Export quiz user data (attempted + pending) to Excel with scores & GPA
 @router.get("/export-users")
-async def export_users_to_excel(quiz_id: int, session: AsyncSession = Depends(get_db)):
+async def export_users_to_excel(quiz_id: int, session: AsyncSession = Depends(get_read_db)):
     # Fetch quiz title
     quiz_result = await session.execute(select(Quiz).where(Quiz.id == quiz_id))
     quiz = quiz_result.scalars().first()
@@ -450,6 +706,7 @@ async def export_users_to_excel(quiz_id: int, session: AsyncSession = Depends(ge
     # Sort and combine
     attempted_data.sort(key=lambda x: x["Score"] if isinstance(x["Score"], int) else 0, reverse=True)
     data = attempted_data + pending_data
+    import pandas as pd  # imported on first export: pandas + NumPy add ~0.4s to worker start
     df = pd.DataFrame(data)
 
     # Excel output
@@ -492,7 +749,7 @@ async def export_users_to_excel(quiz_id: int, session: AsyncSession = Depends(ge
 
 # Export leaderboard data for a quiz to Excel (sorted by score)
 @router.get("/export-leaderboard")
-async def export_leaderboard_to_excel(quiz_id: int, session: AsyncSession = Depends(get_db)):
+async def export_leaderboard_to_excel(quiz_id: int, session: AsyncSession = Depends(get_read_db)):
     # Get quiz title
     quiz_result = await session.execute(select(Quiz.title).where(Quiz.id == quiz_id))
     quiz_row = quiz_result.first()
@@ -525,6 +782,7 @@ async def export_leaderboard_to_excel(quiz_id: int, session: AsyncSession = Depe
 
     leaderboard_data.sort(key=lambda x: x["Score"], reverse=True)
 
+    import pandas as pd  # imported on first export: pandas + NumPy add ~0.4s to worker start
     df = pd.DataFrame(leaderboard_data)
 
     output = io.BytesIO()
@@ -561,6 +819,7 @@ async def export_leaderboard_to_excel(quiz_id: int, session: AsyncSession = Depe
 
 # Get feedback submitted by users for quizzes (optional filter by quiz_id)
 @router.get("/feedbacks")
+@cached(ttl=60, tags=("feedback",))
 async def get_feedbacks(
     quiz_id: int = Query(None),  # Optional query parameter
     db: AsyncSession = Depends(get_db),
@@ -1,5 +1,5 @@
 # FastAPI and dependency tools
-from fastapi import APIRouter, Depends, HTTPException, status, APIRouter, Depends, HTTPException, Form, Request
+from fastapi import APIRouter, Depends, HTTPException, status, APIRouter, Depends, HTTPException, Form, Request, Body
 
 # Auth & JWT-related
 from fastapi.security import OAuth2PasswordRequestForm
@@ -9,9 +9,6 @@ from jose import jwt
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
-# Email sending
-from fastapi_mail import MessageSchema
-
 # Utilities & Config
 from datetime import timedelta, datetime, timezone
 import uuid
@@ -19,10 +16,21 @@ from app import models
 from app.schemas.user import UserCreate, UserOut
 from app.config import SECRET_KEY, ALGORITHM
 from app.utils import auth
+from app.utils.principal_cache import Principal, principal_cache
+from app.utils.refresh_tokens import (
+    InvalidRefreshToken,
+    issue_refresh_token,
+    revoke_refresh_token_family,
+    rotate_refresh_token,
+    revocation_store,
+)
 from app.database import get_db
-from app.email import fast_mail
+from app.email import get_fast_mail
+from app.utils.response_cache import invalidate_on_commit
 from app.models.user import User
 from app.models.password_reset_token import PasswordResetToken
+from app.utils.scheduler import scheduler
+from sqlalchemy import delete
 import os
 
 
@@ -44,7 +52,7 @@ async def signup(user: UserCreate, db: AsyncSession = Depends(get_db)):
     if existing_user:
         raise HTTPException(status_code=400, detail="Employee ID already registered")
 
-    hashed_password = auth.hash_password(user.password)
+    hashed_password = await auth.hash_password_async(user.password)
     new_user = models.User(
         employee_id=user.employee_id,
         full_name=user.full_name,
@@ -53,6 +61,7 @@ async def signup(user: UserCreate, db: AsyncSession = Depends(get_db)):
         is_admin=False
     )
     db.add(new_user)
+    invalidate_on_commit(db, "users")
     await db.commit()
     await db.refresh(new_user)
     return new_user
@@ -69,22 +78,25 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSessi
     if not user:
         raise HTTPException(status_code=400, detail="Invalid credentials")
 
-    if not auth.verify_password(form_data.password, user.password_hash):
+    # SSO-only users have no password hash
+    if not user.password_hash:
         raise HTTPException(status_code=400, detail="Invalid credentials")
 
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode = {
-        "sub": user.email,
-        "is_admin": user.is_admin,
-        "employee_id": user.employee_id,
-    }
-    expire = auth.get_utcnow() + access_token_expires
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    valid, new_hash = await auth.verify_and_update_password_async(form_data.password, user.password_hash)
+    if not valid:
+        raise HTTPException(status_code=400, detail="Invalid credentials")
+
+    # Transparently upgrade hashes made with an outdated bcrypt cost
+    if new_hash:
+        user.password_hash = new_hash
+        await db.commit()
+
+    encoded_jwt = auth.create_access_token(user, timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
 
     return {
         "id": user.id,
         "access_token": encoded_jwt,
+        "refresh_token": issue_refresh_token(user.email, user.id),
         "token_type": "bearer",
         "is_admin": user.is_admin,
         "employee_id": user.employee_id,
@@ -92,6 +104,43 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSessi
     }
 
 
+# - Exchanges a refresh token for a new access token and a rotated refresh token
+# - No password hashing: signature check plus a revocation lookup
+# - Each refresh token is single use; reusing one revokes its whole family
+@router.post("/refresh")
+async def refresh(refresh_token: str = Body(..., embed=True), db: AsyncSession = Depends(get_db)):
+    try:
+        claims, new_refresh_token = await rotate_refresh_token(db, refresh_token)
+    except InvalidRefreshToken as e:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
+
+    # Identity comes from the principal cache; only a miss hits the database
+    principal = principal_cache.get(claims["sub"])
+    if principal is None:
+        result = await db.execute(select(models.User).where(models.User.email == claims["sub"]))
+        user = result.scalars().first()
+        if not user:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+        principal = Principal.from_user(user)
+        principal_cache.set(principal.email, principal)
+
+    return {
+        "access_token": auth.create_access_token(principal, timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)),
+        "refresh_token": new_refresh_token,
+        "token_type": "bearer"
+    }
+
+
+# - Revokes the refresh token (and every token rotated from it)
+@router.post("/logout")
+async def logout(refresh_token: str = Body(..., embed=True), db: AsyncSession = Depends(get_db)):
+    try:
+        await revoke_refresh_token_family(db, refresh_token)
+    except InvalidRefreshToken:
+        pass
+    return {"message": "Logged out"}
+
+
 # - Sends a password reset link to user's email
 # - Generates unique token (UUID)
 # - Saves it to DB with 30-min expiration
@@ -116,7 +165,8 @@ async def forgot_password(request: Request, email: str = Form(...), db: AsyncSes
     # Create reset link
     reset_link = f"{FRONTEND_URL}/reset-password/{token}"
 
-    # Compose email
+    # Compose email (fastapi_mail is loaded on first use)
+    from fastapi_mail import MessageSchema
     message = MessageSchema(
         subject="Reset Your Quiz App Password",
         recipients=[email],
@@ -124,7 +174,7 @@ async def forgot_password(request: Request, email: str = Form(...), db: AsyncSes
         subtype="plain"
     )
 
-    await fast_mail.send_message(message)
+    await get_fast_mail().send_message(message)
 
     return {"message": "Password reset link sent to your email"}
 
@@ -151,8 +201,7 @@ async def reset_password(token: str = Form(...), new_password: str = Form(...),
         raise HTTPException(status_code=404, detail="User not found")
 
     # Hash new password and update
-    from app.utils.auth import hash_password
-    user.password_hash = hash_password(new_password)
+    user.password_hash = await auth.hash_password_async(new_password)
     await db.commit()
 
     # Optionally delete token
@@ -160,3 +209,13 @@ async def reset_password(token: str = Form(...), new_password: str = Form(...),
     await db.commit()
 
     return {"message": "Password reset successful"}
+
+
+# Hourly cleanup of expired password reset tokens and refresh-token revocations
+@scheduler.recurring("purge_expired_tokens", every=3600)
+async def purge_expired_tokens(db: AsyncSession, payload: dict):
+    result = await db.execute(
+        delete(PasswordResetToken).where(PasswordResetToken.expires_at < datetime.now(timezone.utc))
+    )
+    revocations = await revocation_store.purge_expired(db)
+    return {"reset_tokens": result.rowcount or 0, "revocations": revocations}
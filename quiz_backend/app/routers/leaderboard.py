@@ -1,17 +1,38 @@
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
-from sqlalchemy.orm import joinedload
+from pydantic import TypeAdapter
+from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
-from ..database import get_db
+from typing import List
+from ..database import get_read_db
 from ..models.submission import Submission
 from ..models.user import User
 from ..models.quiz import Quiz
 from ..dependencies import get_current_user
+from ..schemas.leaderboard import LeaderboardOut, FullLeaderboardEntry
+from ..utils.fast_json import FastJSONResponse
+from ..utils.response_cache import cached
 
 # Create a router with a prefix specific to leaderboard operations for quizzes
 router = APIRouter(prefix="/quizzes/{quiz_id}/leaderboard", tags=["leaderboard"])
 
+# Serializers compiled once at import; rows are validated straight from the SQL projections
+leaderboard_adapter = TypeAdapter(LeaderboardOut)
+full_leaderboard_adapter = TypeAdapter(List[FullLeaderboardEntry])
+
+# Leaderboard order: best score first, faster time breaks ties
+LEADERBOARD_ORDER = (Submission.score.desc(), Submission.time_taken.asc())
+
+# Columns shared by both leaderboard projections; time_taken is always a float
+SCORE_COLUMNS = (
+    Submission.score,
+    Submission.correct_count,
+    Submission.incorrect_count,
+    Submission.not_attempted_count,
+    func.coalesce(Submission.time_taken, 0.0).label("time_taken"),
+    Submission.submitted_at,
+)
+
 # Helper function to format time (in seconds) into "Xm Ys" string format
 def format_time(seconds: float | None) -> str:
     if seconds is None:
@@ -21,78 +42,53 @@ def format_time(seconds: float | None) -> str:
     return f"{minutes}m {remaining_seconds}s"
 
 # Endpoint: Get the top 3 leaderboard entries for a specific quiz
-@router.get("")
-async def get_leaderboard(quiz_id: int, db: AsyncSession = Depends(get_db)):
+@router.get("", response_model=LeaderboardOut)
+@cached(ttl=30, tags=("leaderboard:{quiz_id}",))
+async def get_leaderboard(quiz_id: int, db: AsyncSession = Depends(get_read_db)):
      # Verify if the quiz with the given ID exists
-    quiz = await db.execute(select(Quiz).where(Quiz.id == quiz_id))
-    quiz = quiz.scalar_one_or_none()
-    if not quiz:
+    quiz = await db.execute(select(Quiz.id).where(Quiz.id == quiz_id))
+    if quiz.scalar_one_or_none() is None:
         raise HTTPException(status_code=404, detail="Quiz not found")
 
-    # Select submissions for this quiz, joining user details, and order by score and time
+    # Select submissions for this quiz with the user's name and email, ordered by score and time
     stmt = (
-        select(Submission, User)
+        select(User.full_name.label("username"), User.email, *SCORE_COLUMNS)
         .join(User, Submission.user_id == User.id)
         .where(Submission.quiz_id == quiz_id)
-        .order_by(Submission.score.desc(), Submission.time_taken.asc())
+        .order_by(*LEADERBOARD_ORDER)
     )
     result = await db.execute(stmt)
-    results = result.all() # List of tuples: (Submission, User)
-
-    # Build a leaderboard response
-    leaderboard = []
-    for sub, user in results:
-        leaderboard.append({
-            "username": user.full_name,
-            "email": user.email,
-            "score": sub.score,
-            "correct_count": sub.correct_count,
-            "incorrect_count": sub.incorrect_count,
-            "not_attempted_count": sub.not_attempted_count,
-            "time_taken": sub.time_taken if sub.time_taken is not None else 0.0,  # always a float
-            "submitted_at": sub.submitted_at.isoformat() if sub.submitted_at else None,
-        })
+    rows = result.all()
 
     # Return top 3 users and others separately
-    return {
+    return FastJSONResponse.from_adapter(leaderboard_adapter, {
         "quiz_id": quiz_id,
-        "top_3": leaderboard[:3],
-        "others": leaderboard[3:],
-    }
+        "top_3": rows[:3],
+        "others": rows[3:],
+    })
 
 #Endpoint: Get full leaderboard with ranks and identify current user
-@router.get("/full")
-async def get_full_leaderboard(quiz_id: int, current_user=Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+@router.get("/full", response_model=List[FullLeaderboardEntry])
+@cached(ttl=30, tags=("leaderboard:{quiz_id}",), vary_on=("current_user",))
+async def get_full_leaderboard(quiz_id: int, current_user=Depends(get_current_user), db: AsyncSession = Depends(get_read_db)):
 
     # Verify if the quiz with the given ID exists
-    quiz = await db.execute(select(Quiz).where(Quiz.id == quiz_id))
-    quiz = quiz.scalar_one_or_none()
-    if not quiz:
+    quiz = await db.execute(select(Quiz.id).where(Quiz.id == quiz_id))
+    if quiz.scalar_one_or_none() is None:
         raise HTTPException(status_code=404, detail="Quiz not found")
 
-    # Load all submissions with associated user details, ordered by score and time
+    # Rank and current-user flag are computed in SQL
     stmt = (
-        select(Submission)
-        .options(joinedload(Submission.user))
+        select(
+            func.row_number().over(order_by=LEADERBOARD_ORDER).label("rank"),
+            User.full_name,
+            *SCORE_COLUMNS,
+            (Submission.user_id == current_user.id).label("is_current_user"),
+        )
+        .join(User, Submission.user_id == User.id)
         .where(Submission.quiz_id == quiz_id)
-        .order_by(Submission.score.desc(), Submission.time_taken.asc())
+        .order_by(*LEADERBOARD_ORDER)
     )
     result = await db.execute(stmt)
-    submissions = result.scalars().all()
-
-    # Build full leaderboard with rank and highlight current user
-    leaderboard = []
-    for idx, sub in enumerate(submissions):
-        leaderboard.append({
-            "rank": idx + 1,
-            "full_name": sub.user.full_name,
-            "score": sub.score,
-            "correct_count": sub.correct_count,
-            "incorrect_count": sub.incorrect_count,
-            "not_attempted_count": sub.not_attempted_count,
-            "time_taken": sub.time_taken if sub.time_taken is not None else 0.0,
-            "submitted_at": sub.submitted_at.isoformat() if sub.submitted_at else None,
-            "is_current_user": sub.user_id == current_user.id, # True if logged-in user
-        })
 
-    return leaderboard
+    return FastJSONResponse.from_adapter(full_leaderboard_adapter, result.all())
@@ -5,9 +5,8 @@ from starlette.config import Config
 from starlette.responses import RedirectResponse, JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from datetime import datetime, timedelta, timezone
+from datetime import timedelta
 import os
-import jwt
 from fastapi.responses import RedirectResponse
 from fastapi import Response
 from urllib.parse import urlencode
@@ -16,11 +15,16 @@ from urllib.parse import urlencode
 from app.database import get_db
 from app import models
 from app.utils import auth
-from app.config import ACCESS_TOKEN_EXPIRE_MINUTES, SECRET_KEY, ALGORITHM
+from app.utils.refresh_tokens import issue_refresh_token
+from app.utils.oidc import oidc_provider, IDTokenError
+from app.config import ACCESS_TOKEN_EXPIRE_MINUTES
+from app.utils.structured_logging import log_event
+import logging
 
 
 # Create API router instance
 router = APIRouter()
+logger = logging.getLogger("app.oauth")
 
 # Load Google OAuth client credentials from environment variables
 GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
@@ -40,7 +44,7 @@ oauth.register(
     name='google',
     client_id=GOOGLE_CLIENT_ID,
     client_secret=GOOGLE_CLIENT_SECRET,
-    server_metadata_url='https://accounts.google.com/.well-known/openid-configuration',
+    server_metadata_url=oidc_provider.discovery_url,
     client_kwargs={'scope': 'openid email profile'}
 )
 
@@ -49,7 +53,9 @@ oauth.register(
 async def login(request: Request):
     # Define the redirect URI after Google authentication
     redirect_uri = f"{VITE_API_BASE_URL}/auth/google/callback"
-    print(">>> [LOGIN] Before redirect. Session state:", request.session.get("state"))
+    log_event(logger, "oauth.login", logging.DEBUG, has_session_state=bool(request.session.get("state")))
+    # Serve discovery metadata from the local cache instead of a lazy fetch
+    await oidc_provider.sync_client(oauth.google)
      # Redirect user to Google login page
     return await oauth.google.authorize_redirect(request, redirect_uri)
 
@@ -57,15 +63,28 @@ async def login(request: Request):
 # OAuth callback endpoint after Google authentication
 @router.get("/auth/google/callback")
 async def auth_callback(request: Request, db: AsyncSession = Depends(get_db)):
-    print(">>> [CALLBACK] Session state:", request.session.get("state"))
-    print(">>> [CALLBACK] URL param state:", request.query_params.get("state"))
+    log_event(logger, "oauth.callback", logging.DEBUG, has_session_state=bool(request.session.get("state")),
+              has_url_state=bool(request.query_params.get("state")))
 
-    # Fetch token and user info from Google
+    # Exchange the code for tokens; metadata and JWKS come from the local cache
+    await oidc_provider.sync_client(oauth.google)
     token = await oauth.google.authorize_access_token(request)
-    user_info = await oauth.google.userinfo(token=token)
 
-    # Extract email from user info
+    # Identity comes from the ID token verified locally (no userinfo round trip).
+    # Authlib already verified it when a nonce was issued; otherwise verify it here.
+    user_info = token.get("userinfo")
+    if user_info is None:
+        if "id_token" not in token:
+            raise HTTPException(status_code=400, detail="No ID token returned by provider")
+        try:
+            user_info = await oidc_provider.verify_id_token(token["id_token"], GOOGLE_CLIENT_ID)
+        except IDTokenError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    # Extract email from the verified claims
     email = user_info.get("email")
+    if user_info.get("email_verified") is False:
+        raise HTTPException(status_code=403, detail="Email not verified")
     if not email:
         raise HTTPException(status_code=400, detail="No email found in token")
 
@@ -76,18 +95,12 @@ async def auth_callback(request: Request, db: AsyncSession = Depends(get_db)):
         raise HTTPException(status_code=403, detail="Unauthorized")
 
     # Generate JWT token for the authenticated user
-    expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    token_data = {
-        "sub": user.email,
-        "is_admin": user.is_admin,
-        "employee_id": user.employee_id,
-        "exp": expire,
-    }
-    jwt_token = jwt.encode(token_data, SECRET_KEY, algorithm=ALGORITHM)
+    jwt_token = auth.create_access_token(user, timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
 
      # Encode user data in query parameters for redirect
     query = urlencode({
         "token": jwt_token,
+        "refresh_token": issue_refresh_token(user.email, user.id),
         "email": user.email,
         "name": user.full_name,
         "is_admin": str(user.is_admin).lower(),
@@ -5,11 +5,13 @@ from sqlalchemy.future import select
 from ..database import get_db    # For getting the database session
 from ..models.quiz import Quiz
 from ..dependencies import get_current_admin
+from ..utils.response_cache import cached, invalidate_on_commit
 
 # Creating a router for question-related operations
 router = APIRouter(prefix="/questions", tags=["questions"])
 
 @router.get("/{quiz_id}")
+@cached(ttl=60, tags=("quiz:{quiz_id}",))
 async def get_questions(
     quiz_id: int,
     db: AsyncSession = Depends(get_db)
@@ -56,5 +58,6 @@ async def update_questions(
 
     # Update the questions_json field of the quiz
     quiz.questions_json = payload
+    invalidate_on_commit(db, "quizzes", f"quiz:{quiz_id}")
     await db.commit()
     return {"message": "Questions updated successfully."}
@@ -1,13 +1,15 @@
 # FastAPI and SQLAlchemy imports
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update, exists, case, func
+from pydantic import TypeAdapter
+from typing import List
 from uuid import UUID
 from datetime import datetime, timezone
-import traceback
+import json
 
 # Internal imports
-from ..database import get_db    # Dependency to get DB session
+from ..database import get_db, get_read_db    # Dependencies to get DB sessions (primary / read replica)
 from ..models.quiz import Quiz
 from ..schemas.quiz import QuizCreate, QuizOut, QuizAssignedOut
 from ..dependencies import get_current_user     # Auth dependency
@@ -18,10 +20,38 @@ from ..schemas.feedback import FeedbackCreate
 from ..models.feedback import Feedback
 from ..models.user import User
 from ..schemas.submission import SubmissionCreate, SubmissionUpdate
+from ..analytics.score_stats import record_submission, invalidate_quiz_stats
+from ..utils.fast_json import FastJSONResponse
+from ..utils.structured_logging import bind_log_context, log_event
+from ..utils.response_cache import cached, invalidate_on_commit
+from ..utils.scheduler import scheduler
+from ..utils.attempt_clock import attempt_clock
+from .submission import reject_if_time_is_up, score_final_submit
+import logging
+import os
 
 
 # Router definition
 router = APIRouter(prefix="/quizzes", tags=["quizzes"])
+logger = logging.getLogger("app.quizzes")
+
+QUIZ_EXPIRY_INTERVAL_SECONDS = int(os.getenv("QUIZ_EXPIRY_INTERVAL_SECONDS", 60))
+
+# Serializers compiled once at import; read endpoints validate SQL projection rows directly
+quiz_adapter = TypeAdapter(QuizOut)
+quiz_list_adapter = TypeAdapter(List[QuizOut])
+assigned_list_adapter = TypeAdapter(List[QuizAssignedOut])
+
+# Quiz columns shaped like QuizOut (questions_json is exposed as "questions")
+QUIZ_COLUMNS = (
+    Quiz.id,
+    Quiz.title,
+    Quiz.description,
+    Quiz.is_active,
+    Quiz.time_limit,
+    Quiz.created_at,
+    Quiz.questions_json.label("questions"),
+)
 
 #for manually created quiz(not automated)
 @router.post("/", response_model=QuizOut)
@@ -33,6 +63,7 @@ async def create_quiz(quiz: QuizCreate, db: AsyncSession = Depends(get_db)):
         is_active=True
     )
     db.add(db_quiz)
+    invalidate_on_commit(db, "quizzes")
     await db.commit()
     await db.refresh(db_quiz)
     return QuizOut(
@@ -49,41 +80,50 @@ async def create_quiz(quiz: QuizCreate, db: AsyncSession = Depends(get_db)):
 
 #public list of all quizes
 @router.get("/", response_model=list[QuizOut])
-async def list_quizzes(db: AsyncSession = Depends(get_db)):
-    now = datetime.now(timezone.utc)
-    result = await db.execute(select(Quiz))
-    quizzes = result.scalars().all()
+@cached(ttl=30, tags=("quizzes",))
+async def list_quizzes(db: AsyncSession = Depends(get_read_db)):
+    # active_till is stored as naive UTC; the quiz_expiry job persists the deactivation
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    result = await db.execute(select(*QUIZ_COLUMNS, Quiz.active_till, Quiz.manual_override_quiz_active))
     quiz_out_list = []
-    for quiz in quizzes:
-
-        # Deactivate expired quizzes
-        if quiz.active_till and quiz.active_till < now and quiz.is_active:
-            quiz.is_active = False
-            db.add(quiz)
-
+    for row in result.all():
+        # Quizzes manually reactivated after expiry stay active (as in the admin list and the job)
+        expired = bool(
+            row.active_till and row.active_till < now and row.is_active and not row.manual_override_quiz_active
+        )
+        legacy_questions = isinstance(row.questions, str)  # legacy rows stored a JSON string
+        if not (expired or legacy_questions):
+            quiz_out_list.append(row)
+            continue
+
+        quiz = dict(row._mapping)
+        # Shown as inactive until the next expiry run
+        if expired:
+            quiz["is_active"] = False
         # Ensure questions are deserialized
-        questions_data = quiz.questions_json
-        if isinstance(questions_data, str):
-            import json
-            questions_data = json.loads(questions_data)
-        
-        # Build response list
-        quiz_out_list.append(
-            QuizOut(
-                id=quiz.id,
-                title=quiz.title,
-                description=quiz.description,
-                is_active=quiz.is_active,
-                time_limit=quiz.time_limit,
-                created_at=quiz.created_at,
-                active_till=quiz.active_till,
-                questions=[
-                    Question(**q) for q in questions_data
-                ]
-            )
+        if legacy_questions:
+            quiz["questions"] = json.loads(row.questions)
+        quiz_out_list.append(quiz)
+    return FastJSONResponse.from_adapter(quiz_list_adapter, quiz_out_list)
+
+
+# Deactivates quizzes past their active_till (unless manually overridden)
+@scheduler.recurring("quiz_expiry", every=QUIZ_EXPIRY_INTERVAL_SECONDS)
+async def expire_quizzes(db: AsyncSession, payload: dict):
+    result = await db.execute(
+        update(Quiz)
+        .where(
+            Quiz.is_active == True,
+            Quiz.active_till < func.timezone("UTC", func.now()),
+            func.coalesce(Quiz.manual_override_quiz_active, False) == False,
         )
-    await db.commit()
-    return quiz_out_list
+        .values(is_active=False)
+        .returning(Quiz.id)
+    )
+    expired_ids = result.scalars().all()
+    if expired_ids:
+        invalidate_on_commit(db, "quizzes", *(f"quiz:{quiz_id}" for quiz_id in expired_ids))
+    return {"expired": len(expired_ids)}
 
 
 #toggle functionality before adding active date functionality
@@ -94,71 +134,57 @@ async def toggle_quiz(quiz_id: UUID, db: AsyncSession = Depends(get_db)):
     if not quiz:
         raise HTTPException(status_code=404, detail="Quiz not found")
     quiz.is_active = not quiz.is_active
+    invalidate_on_commit(db, "quizzes", f"quiz:{quiz_id}")
     await db.commit()
     return {"status": "success", "is_active": quiz.is_active}
 
 
 #showing assigned quizzes with status
 @router.get("/assigned", response_model=list[QuizAssignedOut])
+@cached(ttl=30, tags=("quizzes", "user:{user.id}"), vary_on=("user",))
 async def assigned_quizzes(user=Depends(get_current_user), db: AsyncSession = Depends(get_db)):
-    #Get quizzes assigned to user
+    # Assigned active quizzes with question count and attempt status, in one query
+    has_attempted = exists().where(Submission.quiz_id == Quiz.id, Submission.user_id == user.id)
+    total_questions = case(
+        (func.jsonb_typeof(Quiz.questions_json) == "array", func.jsonb_array_length(Quiz.questions_json)),
+        else_=0,
+    )
     stmt = (
-        select(Quiz)
+        select(
+            Quiz.id,
+            Quiz.title,
+            Quiz.description,
+            Quiz.time_limit,
+            Quiz.is_active,
+            Quiz.active_till,
+            total_questions.label("total_questions"),
+            has_attempted.label("has_attempted"),
+        )
         .join(QuizAccess, QuizAccess.quiz_id == Quiz.id)
         .where(Quiz.is_active == True)
         .where(QuizAccess.user_id == user.id)
     )
     result = await db.execute(stmt)
-    quizzes = result.scalars().all()
-
-    # Get previously attempted quizzes
-    attempted = await db.execute(
-        select(Submission.quiz_id).where(Submission.user_id == user.id)
-    )
-    attempted_ids = {row[0] for row in attempted.all()}
-
-    # Build response list with attempt status
-    result_list = []
-    for quiz in quizzes:
-        result_list.append({
-            "id": quiz.id,
-            "title": quiz.title,
-            "description": quiz.description,
-            "time_limit": quiz.time_limit,
-            "is_active": quiz.is_active,
-            "active_till": quiz.active_till,
-            "total_questions": len(quiz.questions_json or []),
-            "has_attempted": quiz.id in attempted_ids,
-            
-        })
-    return result_list
+    return FastJSONResponse.from_adapter(assigned_list_adapter, result.all())
 
 @router.get("/{quiz_id}", response_model=QuizOut)
-async def get_quiz(quiz_id: int, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Quiz).where(Quiz.id == quiz_id))
-    quiz = result.scalar_one_or_none()
+@cached(ttl=60, tags=("quiz:{quiz_id}",))
+async def get_quiz(quiz_id: int, db: AsyncSession = Depends(get_read_db)):
+    result = await db.execute(select(*QUIZ_COLUMNS).where(Quiz.id == quiz_id))
+    quiz = result.first()
     if not quiz:
         raise HTTPException(status_code=404, detail="Quiz not found")
-    return QuizOut(
-        id=quiz.id,
-        title=quiz.title,
-        description=quiz.description,
-        is_active=quiz.is_active,
-        time_limit=quiz.time_limit,
-        created_at=quiz.created_at,
-        has_question_timers=True,
-        questions=[
-            Question(**q) for q in quiz.questions_json
-        ]
-    )
+    return FastJSONResponse.from_adapter(quiz_adapter, quiz)
 
 
 #for submission update
 @router.post("/{quiz_id}/submit")
 async def submit_quiz(quiz_id: int, submission: SubmissionUpdate, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    bind_log_context(quiz_id=quiz_id)
     try:
-        # Log the incoming data
-        print("Incoming submission payload:", submission)
+        # Log the incoming submission (counts only, not the answers themselves)
+        log_event(logger, "submission.received", submission_id=submission.submission_id,
+                  answered=len(submission.answers), score=submission.score)
 
         # Fetch the existing submission
         result = await db.execute(
@@ -171,24 +197,41 @@ async def submit_quiz(quiz_id: int, submission: SubmissionUpdate, db: AsyncSessi
         sub = result.scalars().first()
         if not sub:
             raise HTTPException(status_code=404, detail="Submission not found")
+        await reject_if_time_is_up(db, sub)
 
-        #Update submission fields
-        sub.answers = submission.answers
-        sub.score = submission.score
-        sub.correct_count = submission.correct_count
-        sub.incorrect_count = submission.incorrect_count
-        sub.not_attempted_count = submission.not_attempted_count
-        sub.time_taken = submission.time_taken
-        sub.started_at = submission.started_at
-        sub.submitted_at = datetime.now(timezone.utc)
+        already_scored = sub.score is not None
+
+        #Update submission fields; answers are checked against the deadlines and scored here,
+        #and timing comes from the server's clock, not the client's
+        submitted_at = datetime.now(timezone.utc)
+        await score_final_submit(db, sub, submission.answers, submitted_at)
+        if not sub.started_at:
+            sub.started_at = submission.started_at
+        sub.time_taken = (submitted_at - sub.started_at).total_seconds()
+        sub.submitted_at = submitted_at
 
         db.add(sub)  
+        invalidate_on_commit(db, f"leaderboard:{quiz_id}", f"user:{current_user.id}")
         await db.commit()
-        return {"message": "Submission recorded successfully."}
-
+        attempt_clock.close(sub.id)
+
+        # Keep score statistics in sync (a re-submission forces a rebuild)
+        if already_scored:
+            invalidate_quiz_stats(quiz_id)
+        else:
+            record_submission(quiz_id, sub.score, sub.time_taken)
+        return {
+            "message": "Submission recorded successfully.",
+            "score": sub.score,
+            "correct_count": sub.correct_count,
+            "incorrect_count": sub.incorrect_count,
+            "not_attempted_count": sub.not_attempted_count,
+        }
+
+    except HTTPException:
+        raise
     except Exception as e:
-        print("❌ Exception during quiz submission:")
-        traceback.print_exc()  # Logs full stack trace
+        log_event(logger, "submission.failed", logging.ERROR, exc_info=e, submission_id=submission.submission_id)
         raise HTTPException(status_code=400, detail="Failed to submit quiz.")
 
 
@@ -198,12 +241,14 @@ async def submit_feedback(
     session: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    print(f"💬 Feedback from {current_user.id} on quiz {feedback.quiz_id}: {feedback.feedback_text}")
+    bind_log_context(quiz_id=feedback.quiz_id)
+    log_event(logger, "feedback.received", length=len(feedback.feedback_text or ""))
     new_feedback = Feedback(
         quiz_id=feedback.quiz_id,
         user_id=current_user.id,
         feedback_text=feedback.feedback_text
     )
     session.add(new_feedback)
+    invalidate_on_commit(session, "feedback")
     await session.commit()
     return {"message": "Feedback received"}
@@ -5,21 +5,96 @@ from sqlalchemy.ext.asyncio import AsyncSession, session
 from sqlalchemy.future import select
 from sqlalchemy import select
 from sqlalchemy import cast, Integer
+from pydantic import TypeAdapter
+from typing import List
 from uuid import UUID
 from dateutil.parser import parse as parse_datetime
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+import json
 
 # Local module imports
-from ..database import get_db
+from ..database import get_db, async_session
 from ..models.submission import Submission
-from ..schemas.submission import SubmissionCreate, SubmissionOut
+from ..schemas.submission import SubmissionCreate, SubmissionOut, AnswerSave
+from ..crud.submission import accepted_answers, finalize_attempts, load_questions, score_answers
 from ..models.quiz import Quiz
 from ..models.user import User
 from ..dependencies import get_current_user
 from ..utils.websocket_manager import manager
+from ..analytics.score_stats import record_submission, invalidate_quiz_stats
+from ..utils.structured_logging import bind_log_context, log_event
+from ..utils.response_cache import invalidate_on_commit
+from ..utils.attempt_clock import (
+    ATTEMPT_OVER,
+    QUESTION_CLOSED,
+    attempt_clock,
+    attempt_deadline,
+    open_question,
+    question_time_limits,
+)
+from ..utils.scheduler import scheduler
+import logging
+from ..utils.fast_json import FastJSONResponse
 
 # Create a FastAPI router for submission-related endpoints
 router = APIRouter(prefix="/submissions", tags=["submissions"])
+logger = logging.getLogger("app.submissions")
+
+# Listing serializer compiled once at import; rows are validated straight from the projection
+submission_list_adapter = TypeAdapter(List[SubmissionOut])
+
+LATE_ANSWER_DETAIL = {
+    ATTEMPT_OVER: "Time is up for this attempt.",
+    QUESTION_CLOSED: "Time is up for this question.",
+}
+TIME_UP_DETAIL = "Time is up: the attempt was finalized with the answers saved before the deadline."
+
+
+async def reject_if_time_is_up(session: AsyncSession, sub: Submission):
+    """Refuses a final submit after the attempt's deadline, finalizing it with the saved answers instead."""
+    if sub.auto_finalized:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=TIME_UP_DETAIL)
+    if sub.score is None and attempt_clock.is_overdue(sub.deadline_at, datetime.now(timezone.utc)):
+        finalized = await finalize_attempts(session, [sub.id])
+        await session.commit()
+        for done in finalized:
+            record_submission(done.quiz_id, done.score, done.time_taken)
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=TIME_UP_DETAIL)
+
+
+async def score_final_submit(session: AsyncSession, sub: Submission, client_answers: dict, submitted_at: datetime):
+    """Stores the accepted answers of a final submit and scores them on the server (the client's score is ignored)."""
+    questions = (await load_questions(session, [sub.quiz_id])).get(sub.quiz_id, [])
+    sub.answers = accepted_answers(sub, client_answers, len(questions), submitted_at)
+    sub.score, sub.correct_count, sub.incorrect_count, sub.not_attempted_count = score_answers(questions, sub.answers)
+
+
+# Attempts whose deadline passed on this worker's timer wheel
+@attempt_clock.on_expiry
+async def finalize_expired_attempts(submission_ids: List[int]) -> int:
+    async with async_session() as session:
+        finalized = await finalize_attempts(session, submission_ids)
+        await session.commit()
+    for sub in finalized:
+        record_submission(sub.quiz_id, sub.score, sub.time_taken)
+    if finalized:
+        log_event(logger, "submission.auto_finalized", count=len(finalized))
+    return len(finalized)
+
+
+# Safety net for attempts whose worker restarted before their deadline
+@scheduler.recurring("finalize_overdue_attempts", every=60)
+async def finalize_overdue_attempts(db: AsyncSession, payload: dict):
+    cutoff = datetime.now(timezone.utc) - attempt_clock.grace
+    result = await db.execute(
+        select(Submission.id)
+        .where(Submission.score.is_(None), Submission.deadline_at < cutoff)
+        .limit(attempt_clock.batch_size)
+    )
+    finalized = await finalize_attempts(db, result.scalars().all())
+    for sub in finalized:
+        record_submission(sub.quiz_id, sub.score, sub.time_taken)
+    return {"finalized": len(finalized)}
 
 
 #for submission create, finalize a started quiz, Calculates time_taken from started_at, return full submission details with metadata
@@ -29,6 +104,7 @@ async def submit_quiz(
     session: AsyncSession = Depends(get_db),
     user=Depends(get_current_user)
 ):
+    bind_log_context(quiz_id=submission.quiz_id)
      # Fetch the started submission for the user and quiz
     submission_query = await session.execute(
         select(Submission).where(
@@ -40,11 +116,13 @@ async def submit_quiz(
 
     if not sub:
         raise HTTPException(status_code=404, detail="No started submission found for this quiz")
+    await reject_if_time_is_up(session, sub)
+
+    already_scored = sub.score is not None
 
      # Parse or reuse the started_at timestamp, calculate time_taken
     submitted_at = datetime.now(timezone.utc)
     sub.submitted_at = submitted_at
-    print(f"🧪 submission.started_at received: {submission.started_at} ({type(submission.started_at)})")
     try:
         if not sub.started_at:
             sub.started_at = (
@@ -58,17 +136,23 @@ async def submit_quiz(
     sub.time_taken = time_taken
 
     # Update scoring-related fields
-    sub.score = submission.score
-    sub.correct_count = submission.correct_count
-    sub.incorrect_count = submission.incorrect_count
-    sub.not_attempted_count = submission.not_attempted_count
+    await score_final_submit(session, sub, submission.answers, submitted_at)
 
     # Commit changes to DB
     session.add(sub)
-    print("Setting started_at to:", sub.started_at)
+    invalidate_on_commit(session, f"leaderboard:{sub.quiz_id}", f"user:{user.id}")
     await session.commit()
+    attempt_clock.close(sub.id)
+    log_event(logger, "submission.finalized", submission_id=sub.id, score=sub.score,
+              time_taken=round(time_taken, 1), resubmission=already_scored)
     await session.refresh(sub)
 
+    # Keep score statistics in sync (a re-submission forces a rebuild)
+    if already_scored:
+        invalidate_quiz_stats(sub.quiz_id)
+    else:
+        record_submission(sub.quiz_id, sub.score, sub.time_taken)
+
     # Fetch related user and quiz for response metadata
     user_query = await session.execute(select(User).where(User.id == sub.user_id))
     user_obj = user_query.scalar_one_or_none()
@@ -133,23 +217,7 @@ async def list_submissions(
         res = await session.execute(query)
         rows = res.all()
 
-        return [
-            SubmissionOut(
-                id=row.id,
-                user_id=row.user_id,
-                quiz_id=row.quiz_id,
-                score=row.score,
-                correct_count=row.correct_count,
-                incorrect_count=row.incorrect_count,
-                not_attempted_count=row.not_attempted_count,
-                time_taken=row.time_taken,
-                submitted_at=row.submitted_at,
-                started_at=row.started_at,
-                user_name=row.user_name,
-                quiz_title=row.quiz_title,
-            )
-            for row in rows
-        ]
+        return FastJSONResponse.from_adapter(submission_list_adapter, rows)
 
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -205,18 +273,90 @@ async def start_quiz(
     if not quiz:
         raise HTTPException(status_code=404, detail="Quiz not found")
 
+    started_at = datetime.now(timezone.utc)
     sub = Submission(
         user_id=user.id,
         quiz_id=quiz_id,
-        started_at=datetime.now(timezone.utc),
+        started_at=started_at,
         time_taken=0.0,
     )
+    # Timed quiz: the server keeps the question and attempt deadlines
+    questions = json.loads(quiz.questions_json) if isinstance(quiz.questions_json, str) else (quiz.questions_json or [])
+    limits = question_time_limits(questions, quiz.time_limit)
+    if limits:
+        sub.time_limits = limits
+        sub.question_index = 0
+        sub.question_deadline_at = started_at + timedelta(seconds=limits[0])
+        sub.deadline_at = attempt_deadline(limits, 0, sub.question_deadline_at)
     session.add(sub)
+    invalidate_on_commit(session, f"leaderboard:{quiz_id}", f"user:{user.id}")
     await session.commit()
     await session.refresh(sub)
+    if limits:
+        attempt_clock.track(sub.id, limits, 0, sub.question_deadline_at, sub.deadline_at)
 
     return {
         "status": "success",
         "submission_id": sub.id,
-        "started_at": sub.started_at
+        "started_at": sub.started_at,
+        "question_deadline_at": sub.question_deadline_at,
+        "deadline_at": sub.deadline_at,
+    }
+
+
+# Save one answer while the attempt runs (answers can be changed until the question's time is up)
+# - Late answers this worker already knows about are refused before touching the database
+# - Answering a later question closes the ones before it
+@router.post("/{submission_id}/answers")
+async def save_answer(
+    submission_id: int,
+    payload: AnswerSave,
+    user=Depends(get_current_user),
+    session: AsyncSession = Depends(get_db)
+):
+    now = datetime.now(timezone.utc)
+    reason = attempt_clock.reject_reason(submission_id, payload.question_index, now)
+    if reason:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=LATE_ANSWER_DETAIL[reason])
+
+    result = await session.execute(
+        select(Submission)
+        .where(Submission.id == submission_id, Submission.user_id == user.id)
+        .with_for_update()
+    )
+    sub = result.scalar_one_or_none()
+    if not sub:
+        raise HTTPException(status_code=404, detail="Submission not found")
+    if sub.score is not None:
+        attempt_clock.close(sub.id)
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=LATE_ANSWER_DETAIL[ATTEMPT_OVER])
+
+    limits = sub.time_limits
+    if limits:
+        if not 0 <= payload.question_index < len(limits):
+            raise HTTPException(status_code=400, detail="Invalid question index")
+        index, question_deadline = open_question(
+            limits, sub.question_index, sub.question_deadline_at, now - attempt_clock.grace
+        )
+        if index >= len(limits):
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=LATE_ANSWER_DETAIL[ATTEMPT_OVER])
+        if payload.question_index < index:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=LATE_ANSWER_DETAIL[QUESTION_CLOSED])
+        if payload.question_index > index:
+            index = payload.question_index
+            question_deadline = now + timedelta(seconds=limits[index])
+        sub.question_index = index
+        sub.question_deadline_at = question_deadline
+        sub.deadline_at = attempt_deadline(limits, index, question_deadline)
+
+    sub.answers = {**(sub.answers or {}), str(payload.question_index): payload.answer}
+    await session.commit()
+    if limits:
+        attempt_clock.track(sub.id, limits, sub.question_index, sub.question_deadline_at, sub.deadline_at)
+
+    return {
+        "status": "saved",
+        "question_index": sub.question_index,
+        "question_deadline_at": sub.question_deadline_at,
+        "deadline_at": sub.deadline_at,
     }
@@ -7,6 +7,7 @@ from ..models.user import User
 from ..models.quiz import Quiz
 from ..models.submission import Submission
 from ..dependencies import get_current_user
+from ..utils.response_cache import cached
 
 router = APIRouter(prefix="/user", tags=["user"])
 
@@ -26,6 +27,7 @@ async def get_user_profile(user=Depends(get_current_user)):
 
 # list of assigned quizzes
 @router.get("/quizzes")
+@cached(ttl=30, tags=("quizzes", "user:{user.id}"), vary_on=("user",))
 async def get_user_quizzes(
     user=Depends(get_current_user),
     session: AsyncSession = Depends(get_db)
@@ -0,0 +1,33 @@
+from pydantic import BaseModel, ConfigDict
+from typing import List, Optional
+from datetime import datetime
+
+class LeaderboardEntry(BaseModel):
+    username: str
+    email: str
+    score: Optional[int]
+    correct_count: Optional[int]
+    incorrect_count: Optional[int]
+    not_attempted_count: Optional[int]
+    time_taken: float
+    submitted_at: Optional[datetime]
+
+    model_config = ConfigDict(from_attributes=True)
+
+class LeaderboardOut(BaseModel):
+    quiz_id: int
+    top_3: List[LeaderboardEntry]
+    others: List[LeaderboardEntry]
+
+class FullLeaderboardEntry(BaseModel):
+    rank: int
+    full_name: str
+    score: Optional[int]
+    correct_count: Optional[int]
+    incorrect_count: Optional[int]
+    not_attempted_count: Optional[int]
+    time_taken: float
+    submitted_at: Optional[datetime]
+    is_current_user: bool
+
+    model_config = ConfigDict(from_attributes=True)
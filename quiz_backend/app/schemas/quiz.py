@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from ..models.question import Question  # Import the Question schema
@@ -22,8 +22,7 @@ class QuizOut(QuizBase):
     questions: List[Question]
     has_question_timers: bool = True  # Questions will be automatically parsed
 
-    class Config:
-        orm_mode = True  # Ensure SQLAlchemy models are parsed correctly
+    model_config = ConfigDict(from_attributes=True)  # Ensure SQLAlchemy models / rows are parsed correctly
 
 class QuizAssignedOut(BaseModel):
     id: int
@@ -35,7 +34,6 @@ class QuizAssignedOut(BaseModel):
     has_attempted: bool
     active_till: Optional[datetime]
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
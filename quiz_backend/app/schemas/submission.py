@@ -1,5 +1,5 @@
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Dict, Any
 from datetime import datetime
 from typing import Optional
@@ -27,9 +27,8 @@ class SubmissionOut(BaseModel):
     submitted_at: datetime
     user_name: str
     quiz_title: str
-    
-    class Config:
-        orm_mode = True
+
+    model_config = ConfigDict(from_attributes=True)
 
 from pydantic import BaseModel
 from typing import Dict
@@ -44,3 +43,7 @@ class SubmissionUpdate(BaseModel):
     time_taken: float
     started_at: datetime
 
+
+class AnswerSave(BaseModel):
+    question_index: int
+    answer: int
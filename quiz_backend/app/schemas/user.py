@@ -1,4 +1,5 @@
 from pydantic import BaseModel, EmailStr
+from typing import Optional
 from uuid import UUID
 
 class UserBase(BaseModel):
@@ -19,3 +20,6 @@ class UserOut(UserBase):
 class UserLogin(BaseModel):
     email: EmailStr
     password: str
+
+class UserImportRow(UserBase):
+    password: Optional[str] = None
@@ -0,0 +1,213 @@
+# quiz_backend/app/utils/admission.py
+#
+# Admission control for expensive routes.
+#
+# Requests are classified into route classes (submit, attempt_start, login,
+# export, default). Before a request runs it must pass:
+# - per-user and per-IP token buckets for its class, and
+# - a shared in-flight pool where each class may only start while total
+#   in-flight work is below its share of the pool, plus a per-class cap.
+#
+# Submissions may use the whole pool; logins and admin exports are shed first
+# when it fills up. Rejected requests get 429 with Retry-After immediately
+# instead of queueing behind work that is already running.
+
+import math
+import os
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from jose import JWTError, jwt
+
+from ..config import ALGORITHM, SECRET_KEY
+
+ADMISSION_CONTROL_ENABLED = os.getenv("ADMISSION_CONTROL_ENABLED", "true").lower() in ("true", "1", "yes")
+ADMISSION_MAX_IN_FLIGHT = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", 256))
+ADMISSION_TRUST_FORWARDED = os.getenv("ADMISSION_TRUST_FORWARDED", "false").lower() in ("true", "1", "yes")
+BUCKETS_MAX_ENTRIES = 50_000
+
+
+@dataclass(frozen=True)
+class RouteClass:
+    name: str
+    pool_share: float                    # may start while in-flight < share * ADMISSION_MAX_IN_FLIGHT
+    max_concurrency: Optional[int]       # hard cap on this class's in-flight requests
+    user_rate: Optional[Tuple[float, float]] = None   # (tokens per second, burst)
+    ip_rate: Optional[Tuple[float, float]] = None
+
+
+ROUTE_CLASSES: Dict[str, RouteClass] = {
+    "submit": RouteClass("submit", 1.0, None, user_rate=(2, 10)),
+    "attempt_start": RouteClass("attempt_start", 0.8, 64, user_rate=(1, 5), ip_rate=(50, 300)),
+    "default": RouteClass("default", 0.8, None),
+    "login": RouteClass("login", 0.6, 32, ip_rate=(20, 200)),
+    "export": RouteClass("export", 0.3, 2, user_rate=(0.1, 3)),
+}
+
+# (method, path pattern, route class); first match wins
+ROUTE_RULES = [
+    ("POST", re.compile(r"^/submissions/?$"), "submit"),
+    ("POST", re.compile(r"^/quizzes/\d+/submit$"), "submit"),
+    # answer autosave: a shed save is an answer lost if the attempt is auto-finalized
+    ("POST", re.compile(r"^/submissions/\d+/answers$"), "submit"),
+    ("POST", re.compile(r"^/submissions/start/\d+$"), "attempt_start"),
+    ("POST", re.compile(r"^/auth/(login|signup|refresh)$"), "login"),
+    ("GET", re.compile(r"^/auth/google/callback$"), "login"),
+    ("GET", re.compile(r"^/admin/export-"), "export"),
+]
+
+
+def classify(method: str, path: str) -> RouteClass:
+    for rule_method, pattern, name in ROUTE_RULES:
+        if method == rule_method and pattern.match(path):
+            return ROUTE_CLASSES[name]
+    return ROUTE_CLASSES["default"]
+
+
+class TokenBuckets:
+    """Lazily refilled token buckets, bounded with LRU eviction of idle keys."""
+
+    def __init__(self, max_entries: int = BUCKETS_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._buckets: "OrderedDict[tuple, list]" = OrderedDict()
+
+    def take(self, key: tuple, rate: float, burst: float) -> float:
+        """Takes one token. Returns 0 if admitted, else seconds until a token is available."""
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = [burst, now]
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.max_entries:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            tokens, updated = bucket
+            bucket[0] = min(burst, tokens + (now - updated) * rate)
+            bucket[1] = now
+
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0.0
+        return (1 - bucket[0]) / rate
+
+
+class AdmissionController:
+    def __init__(self, max_in_flight: int = ADMISSION_MAX_IN_FLIGHT):
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self.in_flight_by_class: Dict[str, int] = {name: 0 for name in ROUTE_CLASSES}
+        self.admitted: Dict[str, int] = {name: 0 for name in ROUTE_CLASSES}
+        self.shed: Dict[str, int] = {}
+        self.buckets = TokenBuckets()
+
+    def _shed(self, route_class: RouteClass, reason: str, retry_after: float) -> float:
+        key = f"{route_class.name}:{reason}"
+        self.shed[key] = self.shed.get(key, 0) + 1
+        return max(retry_after, 1.0)
+
+    def try_acquire(self, route_class: RouteClass, user_key: Optional[str], ip: Optional[str]) -> float:
+        """Returns 0 if the request may start (caller must release()), else a Retry-After in seconds."""
+        if route_class.user_rate and user_key:
+            wait = self.buckets.take((route_class.name, "user", user_key), *route_class.user_rate)
+            if wait:
+                return self._shed(route_class, "user_rate", wait)
+        if route_class.ip_rate and ip:
+            wait = self.buckets.take((route_class.name, "ip", ip), *route_class.ip_rate)
+            if wait:
+                return self._shed(route_class, "ip_rate", wait)
+
+        if self.in_flight >= route_class.pool_share * self.max_in_flight:
+            return self._shed(route_class, "pool_saturated", 1.0)
+        if route_class.max_concurrency is not None and self.in_flight_by_class[route_class.name] >= route_class.max_concurrency:
+            return self._shed(route_class, "class_concurrency", 1.0)
+
+        self.in_flight += 1
+        self.in_flight_by_class[route_class.name] += 1
+        self.admitted[route_class.name] += 1
+        return 0.0
+
+    def release(self, route_class: RouteClass):
+        self.in_flight -= 1
+        self.in_flight_by_class[route_class.name] -= 1
+
+    def stats(self) -> dict:
+        return {
+            "enabled": ADMISSION_CONTROL_ENABLED,
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self.in_flight,
+            "in_flight_by_class": dict(self.in_flight_by_class),
+            "admitted": dict(self.admitted),
+            "shed": dict(self.shed),
+        }
+
+
+admission_controller = AdmissionController()
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope.get("headers", ()):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _client_ip(scope) -> Optional[str]:
+    if ADMISSION_TRUST_FORWARDED:
+        forwarded = _header(scope, b"x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    client = scope.get("client")
+    return client[0] if client else None
+
+
+def _user_key(scope) -> Optional[str]:
+    authorization = _header(scope, b"authorization")
+    if not authorization or not authorization.lower().startswith("bearer "):
+        return None
+    try:
+        return jwt.decode(authorization[7:], SECRET_KEY, algorithms=[ALGORITHM]).get("sub")
+    except JWTError:
+        return None
+
+
+class AdmissionControlMiddleware:
+    """Pure ASGI middleware applying AdmissionController to HTTP requests."""
+
+    def __init__(self, app, controller: AdmissionController = admission_controller):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not ADMISSION_CONTROL_ENABLED or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        route_class = classify(scope["method"], scope["path"])
+        user_key = _user_key(scope) if route_class.user_rate else None
+        retry_after = self.controller.try_acquire(route_class, user_key, _client_ip(scope))
+        if retry_after:
+            await self._reject(send, retry_after)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(route_class)
+
+    @staticmethod
+    async def _reject(send, retry_after: float):
+        body = b'{"detail":"Too many requests, please retry shortly."}'
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(math.ceil(retry_after)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,187 @@
+# quiz_backend/app/utils/attempt_clock.py
+#
+# Server-side deadlines for running quiz attempts.
+#
+# - A timed attempt has one time limit per question (submissions.time_limits).
+#   Questions run one after another: the open question closes at its
+#   question_deadline_at, or earlier when an answer to a later question is saved.
+#   The attempt's deadline_at is the open question's deadline plus the limits of
+#   the questions after it, so it only ever moves earlier.
+# - The database row is authoritative; open_question() derives the open
+#   question at any moment from it, so question expiry needs no timer of its own.
+# - Each worker keeps the attempts it started or saved answers for in a
+#   TimerWheel keyed by submission id. When an attempt's deadline (plus
+#   ATTEMPT_GRACE_SECONDS for network latency) passes, the id is handed to the
+#   registered finalizer in batches, which scores it with the answers saved so far.
+#   The finalize_overdue_attempts job catches attempts whose worker went away.
+# - reject_reason() answers "is this answer late?" from memory, so late answers
+#   for attempts this worker knows are turned away without a database round trip.
+
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .structured_logging import log_event
+from .timer_wheel import TimerWheel
+
+ATTEMPT_TICK_MS = float(os.getenv("ATTEMPT_TICK_MS", 100))
+ATTEMPT_GRACE_SECONDS = float(os.getenv("ATTEMPT_GRACE_SECONDS", 5))
+ATTEMPT_FINALIZE_BATCH = int(os.getenv("ATTEMPT_FINALIZE_BATCH", 500))
+ATTEMPT_RETRY_SECONDS = float(os.getenv("ATTEMPT_RETRY_SECONDS", 10))
+CLOSED_ATTEMPTS_KEPT = 50000  # recently finished ids remembered for cheap rejection
+
+ATTEMPT_OVER = "attempt_over"
+QUESTION_CLOSED = "question_closed"
+
+Finalizer = Callable[[List[int]], Awaitable[int]]
+
+logger = logging.getLogger("app.attempts")
+
+
+def question_time_limits(questions: Sequence[dict], quiz_time_limit: Optional[int]) -> Optional[List[int]]:
+    """Per-question limits in seconds (question's own, else the quiz's); None when any is missing."""
+    limits = []
+    for question in questions:
+        limit = question.get("time_limit") or quiz_time_limit
+        if not limit or limit <= 0:
+            return None
+        limits.append(int(limit))
+    return limits or None
+
+
+def open_question(limits: Sequence[int], index: int, question_deadline: datetime, now: datetime) -> Tuple[int, datetime]:
+    """The question open at `now`, moving past questions whose time ran out (len(limits) = all closed)."""
+    while index < len(limits) and now > question_deadline:
+        index += 1
+        if index < len(limits):
+            question_deadline += timedelta(seconds=limits[index])
+    return index, question_deadline
+
+
+def attempt_deadline(limits: Sequence[int], index: int, question_deadline: datetime) -> datetime:
+    return question_deadline + timedelta(seconds=sum(limits[index + 1:]))
+
+
+class AttemptState:
+    __slots__ = ("limits", "question_index", "question_deadline", "deadline")
+
+    def __init__(self, limits: Sequence[int], question_index: int, question_deadline: datetime, deadline: datetime):
+        self.limits = limits
+        self.question_index = question_index
+        self.question_deadline = question_deadline
+        self.deadline = deadline
+
+
+class AttemptClock:
+    def __init__(self, tick: float, grace: float, batch_size: int):
+        self.grace = timedelta(seconds=grace)
+        self.batch_size = batch_size
+        self._wheel = TimerWheel(tick, time.monotonic())
+        self._attempts: Dict[int, AttemptState] = {}
+        self._closed: "OrderedDict[int, None]" = OrderedDict()
+        self._due: List[int] = []
+        self._finalizer: Optional[Finalizer] = None
+        self._task: Optional[asyncio.Task] = None
+        self.rejected = 0
+        self.expired = 0
+        self.finalized = 0
+        self.failures = 0
+
+    def on_expiry(self, fn: Finalizer) -> Finalizer:
+        """Registers the coroutine that finalizes a batch of expired submission ids."""
+        self._finalizer = fn
+        return fn
+
+    def track(self, submission_id: int, limits: Sequence[int], question_index: int,
+              question_deadline: datetime, deadline: datetime):
+        """Starts (or updates) the deadline timer for an attempt after its row was written."""
+        self._attempts[submission_id] = AttemptState(tuple(limits), question_index, question_deadline, deadline)
+        remaining = (deadline + self.grace - datetime.now(timezone.utc)).total_seconds()
+        self._wheel.schedule(submission_id, time.monotonic() + remaining)
+
+    def close(self, submission_id: int):
+        """Forgets a finished attempt; later answers for it are rejected from memory."""
+        self._wheel.cancel(submission_id)
+        self._attempts.pop(submission_id, None)
+        self._closed[submission_id] = None
+        if len(self._closed) > CLOSED_ATTEMPTS_KEPT:
+            self._closed.popitem(last=False)
+
+    def is_overdue(self, deadline: Optional[datetime], now: datetime) -> bool:
+        return deadline is not None and now > deadline + self.grace
+
+    def reject_reason(self, submission_id: int, question_index: int, now: datetime) -> Optional[str]:
+        """ATTEMPT_OVER / QUESTION_CLOSED when this worker already knows the answer is late, else None."""
+        reason = None
+        if submission_id in self._closed:
+            reason = ATTEMPT_OVER
+        else:
+            state = self._attempts.get(submission_id)
+            if state is not None:
+                index, _ = open_question(state.limits, state.question_index, state.question_deadline, now - self.grace)
+                if index >= len(state.limits):
+                    reason = ATTEMPT_OVER
+                elif question_index < index:
+                    reason = QUESTION_CLOSED
+        if reason is not None:
+            self.rejected += 1
+        return reason
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        tick = self._wheel.tick
+        while True:
+            await asyncio.sleep(tick)
+            expired = self._wheel.advance(time.monotonic())
+            if expired:
+                self.expired += len(expired)
+                self._due.extend(expired)
+            while self._due and self._finalizer is not None:
+                batch, self._due = self._due[:self.batch_size], self._due[self.batch_size:]
+                await self._finalize(batch)
+
+    async def _finalize(self, batch: List[int]):
+        try:
+            self.finalized += await self._finalizer(batch)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.failures += 1
+            log_event(logger, "attempts.finalize_failed", logging.ERROR, exc_info=e, count=len(batch))
+        # The finalizer closes what it finished; try the rest (row locked, error) again shortly
+        retry_at = time.monotonic() + ATTEMPT_RETRY_SECONDS
+        for submission_id in batch:
+            if submission_id in self._attempts and submission_id not in self._wheel:
+                self._wheel.schedule(submission_id, retry_at)
+
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None,
+            "tracked": len(self._attempts),
+            "timers": len(self._wheel),
+            "pending_finalize": len(self._due),
+            "expired": self.expired,
+            "finalized": self.finalized,
+            "rejected_late": self.rejected,
+            "failures": self.failures,
+        }
+
+
+attempt_clock = AttemptClock(ATTEMPT_TICK_MS / 1000, ATTEMPT_GRACE_SECONDS, ATTEMPT_FINALIZE_BATCH)
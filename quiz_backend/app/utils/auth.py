@@ -1,10 +1,19 @@
 # quiz_backend/app/utils/auth.py
 
 from passlib.context import CryptContext
-from datetime import datetime, timezone
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from jose import jwt
+from typing import List, Optional, Tuple
+import asyncio
+import os
+import time
 
-# bcrypt hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from ..config import SECRET_KEY, ALGORITHM
+
+# bcrypt hashing; changing BCRYPT_ROUNDS makes existing hashes get upgraded on next login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
@@ -12,5 +21,112 @@ def hash_password(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+# Off-loop hashing for request handlers: bcrypt releases the GIL, so a small
+# thread pool runs hashes in parallel while the event loop keeps serving requests.
+# The semaphore caps concurrent hashes; time spent waiting for it is the queue time.
+HASH_MAX_CONCURRENCY = int(os.getenv("HASH_MAX_CONCURRENCY", os.cpu_count() or 1))
+_hash_executor: Optional[ThreadPoolExecutor] = None
+_hash_semaphore: Optional[asyncio.Semaphore] = None
+
+
+class HashingMetrics:
+    def __init__(self):
+        self.completed = 0
+        self.in_flight = 0
+        self.waiting = 0
+        self.rehashed = 0
+        self.queue_seconds_total = 0.0
+        self.queue_seconds_max = 0.0
+        self.hash_seconds_total = 0.0
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": HASH_MAX_CONCURRENCY,
+            "bcrypt_rounds": BCRYPT_ROUNDS,
+            "completed": self.completed,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "rehashed_on_login": self.rehashed,
+            "avg_queue_ms": round(1000 * self.queue_seconds_total / self.completed, 3) if self.completed else None,
+            "max_queue_ms": round(1000 * self.queue_seconds_max, 3),
+            "avg_hash_ms": round(1000 * self.hash_seconds_total / self.completed, 3) if self.completed else None,
+        }
+
+
+hashing_metrics = HashingMetrics()
+
+
+async def _run_hashing(fn, *args):
+    global _hash_executor, _hash_semaphore
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(max_workers=HASH_MAX_CONCURRENCY, thread_name_prefix="bcrypt")
+        _hash_semaphore = asyncio.Semaphore(HASH_MAX_CONCURRENCY)
+
+    queued_at = time.perf_counter()
+    hashing_metrics.waiting += 1
+    async with _hash_semaphore:
+        started_at = time.perf_counter()
+        hashing_metrics.waiting -= 1
+        hashing_metrics.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(_hash_executor, fn, *args)
+        finally:
+            finished_at = time.perf_counter()
+            queue_seconds = started_at - queued_at
+            hashing_metrics.in_flight -= 1
+            hashing_metrics.completed += 1
+            hashing_metrics.queue_seconds_total += queue_seconds
+            hashing_metrics.queue_seconds_max = max(hashing_metrics.queue_seconds_max, queue_seconds)
+            hashing_metrics.hash_seconds_total += finished_at - started_at
+
+async def hash_password_async(password: str) -> str:
+    return await _run_hashing(pwd_context.hash, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_hashing(pwd_context.verify, plain_password, hashed_password)
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verifies a password off the event loop. When the stored hash uses outdated
+    settings (e.g. BCRYPT_ROUNDS changed), also returns a fresh hash to store.
+    """
+    valid, new_hash = await _run_hashing(pwd_context.verify_and_update, plain_password, hashed_password)
+    if valid and new_hash:
+        hashing_metrics.rehashed += 1
+    return valid, new_hash
+
+# Process pool for bulk hashing (bcrypt is CPU-bound; processes sidestep the GIL)
+BULK_HASH_WORKERS = int(os.getenv("BULK_HASH_WORKERS", os.cpu_count() or 1))
+BULK_HASH_CHUNK_SIZE = 50
+_bulk_hash_pool: Optional[ProcessPoolExecutor] = None
+
+def _hash_chunk(passwords: List[str]) -> List[str]:
+    return [pwd_context.hash(p) for p in passwords]
+
+async def hash_passwords_parallel(passwords: List[str]) -> List[str]:
+    """Hashes many passwords across a process pool without blocking the event loop."""
+    global _bulk_hash_pool
+    if not passwords:
+        return []
+    if _bulk_hash_pool is None:
+        _bulk_hash_pool = ProcessPoolExecutor(max_workers=BULK_HASH_WORKERS)
+    loop = asyncio.get_running_loop()
+    chunks = [passwords[i:i + BULK_HASH_CHUNK_SIZE] for i in range(0, len(passwords), BULK_HASH_CHUNK_SIZE)]
+    results = await asyncio.gather(*(loop.run_in_executor(_bulk_hash_pool, _hash_chunk, c) for c in chunks))
+    return [h for chunk in results for h in chunk]
+
 def get_utcnow():
     return datetime.now(timezone.utc)
+
+# Every token signed with SECRET_KEY carries a "type"; only access tokens authenticate API calls
+ACCESS_TOKEN_TYPE = "access"
+
+def create_access_token(user, expires_delta: timedelta) -> str:
+    to_encode = {
+        "sub": user.email,
+        "type": ACCESS_TOKEN_TYPE,
+        "is_admin": user.is_admin,
+        "employee_id": user.employee_id,
+        "exp": get_utcnow() + expires_delta,
+    }
+    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
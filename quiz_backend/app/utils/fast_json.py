@@ -0,0 +1,33 @@
+# quiz_backend/app/utils/fast_json.py
+#
+# Opt-in fast JSON responses.
+#
+# FastAPI's default path for a returned value is response_model validation,
+# then jsonable_encoder (a recursive pure-Python walk), then json.dumps. Hot
+# routes can instead return FastJSONResponse:
+# - FastJSONResponse(content) encodes plain dicts/lists with orjson;
+# - FastJSONResponse.from_adapter(adapter, data) validates ORM objects or SQL
+#   projection rows with a precompiled pydantic TypeAdapter (from_attributes)
+#   and serializes them in pydantic-core, without building intermediate dicts.
+# The route keeps its response_model for the OpenAPI schema; FastAPI does not
+# re-validate a returned Response.
+
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+
+class FastJSONResponse(JSONResponse):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+    @classmethod
+    def from_adapter(cls, adapter: TypeAdapter, data: Any, status_code: int = 200) -> "FastJSONResponse":
+        response = cls(content=None, status_code=status_code)
+        response.body = adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+        response.init_headers()
+        return response
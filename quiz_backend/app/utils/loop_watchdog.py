@@ -0,0 +1,222 @@
+# quiz_backend/app/utils/loop_watchdog.py
+#
+# Event-loop lag watchdog.
+#
+# - A heartbeat task sleeps LOOP_WATCHDOG_INTERVAL_MS at a time and records how
+#   late it wakes up (event_loop_lag_seconds in /metrics, percentiles in the
+#   debug endpoint).
+# - A watchdog thread checks that the heartbeat keeps ticking. Once it is
+#   LOOP_LAG_THRESHOLD_MS overdue, something is holding the loop: the thread
+#   reads the loop thread's stack right then, i.e. the stack of the blocking call.
+# - When the heartbeat resumes, the stall's duration is attributed to that stack,
+#   grouped by the innermost app frame and the leaf frame, with the routes it
+#   happened on. GET /admin/loop-lag lists the top offenders by blocked time.
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Dict, List, Optional, Tuple
+
+from .metrics import event_loop_lag
+from .profiling import _frame_label, _is_idle
+from .sql_instrumentation import route_template
+from .structured_logging import log_event
+
+LOOP_WATCHDOG_ENABLED = os.getenv("LOOP_WATCHDOG_ENABLED", "true").lower() in ("true", "1", "yes")
+LOOP_WATCHDOG_INTERVAL_MS = float(os.getenv("LOOP_WATCHDOG_INTERVAL_MS", 50))
+LOOP_LAG_THRESHOLD_MS = float(os.getenv("LOOP_LAG_THRESHOLD_MS", 100))
+LOOP_WATCHDOG_MAX_OFFENDERS = int(os.getenv("LOOP_WATCHDOG_MAX_OFFENDERS", 200))
+LAG_WINDOW = 1200  # recent heartbeats kept for percentiles (one minute at 50ms)
+MAX_STACK_DEPTH = 40
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+UNATTRIBUTED = "<not captured>"
+OUTSIDE_APP = "<no app frame>"
+_HANDLE_RUN_CODE = asyncio.Handle._run.__code__
+
+logger = logging.getLogger("app.loop")
+
+
+def _request_route(frames) -> Optional[str]:
+    # The ASGI scope of the request being served is a local of the middleware frames
+    for frame in reversed(frames):
+        try:
+            scope = frame.f_locals.get("scope")
+        except Exception:
+            continue
+        if isinstance(scope, dict) and scope.get("type") in ("http", "websocket"):
+            return f"{scope.get('method', 'WS')} {route_template(scope)}"
+    return None
+
+
+class StallCapture:
+    __slots__ = ("app_frame", "leaf_frame", "stack", "route")
+
+    def __init__(self, frames: List):
+        self.route = _request_route(frames)
+        # Keep the stack of the callback the loop is running (below Handle._run)
+        for index in range(len(frames) - 1, -1, -1):
+            if frames[index].f_code is _HANDLE_RUN_CODE:
+                frames = frames[index + 1:]
+                break
+        labels = [_frame_label(frame.f_code) for frame in frames]
+        app_frames = [label for frame, label in zip(frames, labels) if frame.f_code.co_filename.startswith(APP_DIR)]
+        self.app_frame = app_frames[-1] if app_frames else (OUTSIDE_APP if labels else UNATTRIBUTED)
+        self.leaf_frame = labels[-1] if labels else UNATTRIBUTED
+        self.stack = labels[-MAX_STACK_DEPTH:]
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        return self.app_frame, self.leaf_frame
+
+
+class Offender:
+    def __init__(self, capture: StallCapture):
+        self.app_frame = capture.app_frame
+        self.leaf_frame = capture.leaf_frame
+        self.stack = capture.stack
+        self.stalls = 0
+        self.blocked_ms = 0.0
+        self.max_ms = 0.0
+        self.routes: Counter = Counter()
+        self.last_seen = 0.0
+
+    def add(self, capture: StallCapture, stall_ms: float):
+        self.stalls += 1
+        self.blocked_ms += stall_ms
+        self.max_ms = max(self.max_ms, stall_ms)
+        self.stack = capture.stack
+        self.last_seen = time.time()
+        if capture.route:
+            self.routes[capture.route] += 1
+
+    def as_dict(self) -> dict:
+        return {
+            "app_frame": self.app_frame,
+            "leaf_frame": self.leaf_frame,
+            "stalls": self.stalls,
+            "blocked_ms": round(self.blocked_ms, 1),
+            "max_ms": round(self.max_ms, 1),
+            "avg_ms": round(self.blocked_ms / self.stalls, 1) if self.stalls else None,
+            "routes": dict(self.routes.most_common(5)),
+            "last_seen": self.last_seen,
+            "stack": self.stack,
+        }
+
+
+class LoopWatchdog:
+    def __init__(self, interval: float, threshold: float, max_offenders: int):
+        self.interval = interval
+        self.threshold = threshold
+        self.max_offenders = max_offenders
+        self.loop_thread_id: Optional[int] = None
+        self.last_tick = time.perf_counter()
+        self.lags: deque = deque(maxlen=LAG_WINDOW)
+        self.stalls = 0
+        self.offenders: Dict[Tuple[str, str], Offender] = {}
+        self._capture: Optional[StallCapture] = None
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    def start(self):
+        if self._task is not None or not LOOP_WATCHDOG_ENABLED:
+            return
+        self.loop_thread_id = threading.get_ident()
+        self.last_tick = time.perf_counter()
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        self._stopping.set()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        await asyncio.to_thread(self._thread.join, 1)
+        self._task = self._thread = None
+
+    async def _heartbeat(self):
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.perf_counter()
+            lag = max(0.0, now - expected)
+            with self._lock:
+                self.last_tick = now
+                capture, self._capture = self._capture, None
+            self.lags.append(lag)
+            event_loop_lag.observe(lag)
+            if lag >= self.threshold:
+                self._record(capture, lag * 1000)
+
+    def _watch(self):
+        check_every = max(self.threshold / 4, 0.005)
+        captured_tick = None
+        while not self._stopping.wait(check_every):
+            tick = self.last_tick
+            if tick == captured_tick or time.perf_counter() - tick - self.interval < self.threshold:
+                continue
+            frame = sys._current_frames().get(self.loop_thread_id)
+            if frame is None or _is_idle(frame):
+                continue
+            frames = []
+            while frame is not None:
+                frames.append(frame)
+                frame = frame.f_back
+            frames.reverse()  # root first
+            capture = StallCapture(frames)
+            del frames
+            with self._lock:
+                # Only keep it if the loop is still stuck in the same stall
+                if self.last_tick == tick:
+                    self._capture = capture
+                    captured_tick = tick
+
+    def _record(self, capture: Optional[StallCapture], stall_ms: float):
+        self.stalls += 1
+        if capture is None:
+            capture = StallCapture([])
+        offender = self.offenders.get(capture.key)
+        if offender is None:
+            if len(self.offenders) >= self.max_offenders:
+                smallest = min(self.offenders, key=lambda key: self.offenders[key].blocked_ms)
+                del self.offenders[smallest]
+            offender = self.offenders[capture.key] = Offender(capture)
+        offender.add(capture, stall_ms)
+        log_event(logger, "loop.stall", logging.WARNING, stall_ms=round(stall_ms, 1),
+                  app_frame=capture.app_frame, leaf_frame=capture.leaf_frame, route=capture.route)
+
+    def reset(self):
+        self.lags.clear()
+        self.stalls = 0
+        self.offenders.clear()
+
+    def stats(self, top: int = 20) -> dict:
+        lags = sorted(self.lags)
+
+        def percentile(q: float) -> Optional[float]:
+            return round(lags[min(len(lags) - 1, int(q * len(lags)))] * 1000, 2) if lags else None
+
+        offenders = sorted(self.offenders.values(), key=lambda o: o.blocked_ms, reverse=True)
+        return {
+            "running": self._task is not None,
+            "interval_ms": self.interval * 1000,
+            "threshold_ms": self.threshold * 1000,
+            "lag_ms": {"p50": percentile(0.5), "p99": percentile(0.99), "max": percentile(1.0), "samples": len(lags)},
+            "stalls": self.stalls,
+            "offenders": [o.as_dict() for o in offenders[:top]],
+        }
+
+
+loop_watchdog = LoopWatchdog(LOOP_WATCHDOG_INTERVAL_MS / 1000, LOOP_LAG_THRESHOLD_MS / 1000, LOOP_WATCHDOG_MAX_OFFENDERS)
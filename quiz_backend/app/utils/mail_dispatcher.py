@@ -0,0 +1,209 @@
+# quiz_backend/app/utils/mail_dispatcher.py
+#
+# Background mail dispatch queue:
+# - one personalized message per recipient (no shared recipient lists)
+# - a small pool of long-lived SMTP connections, each sending a bounded batch
+#   of messages before reconnecting
+# - global rate limit and per-message retry with exponential backoff
+# - callers get a job id back immediately and can poll its progress
+#
+# Messages are plain email.message.EmailMessage objects sent over aiosmtplib;
+# only the SMTP settings come from fastapi_mail's ConnectionConfig (app/email.py).
+
+import asyncio
+import os
+import random
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.message import EmailMessage
+from email.utils import formataddr
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+# fastapi_mail and aiosmtplib are imported when a job first runs (see app/email.py)
+if TYPE_CHECKING:
+    from aiosmtplib import SMTP
+    from fastapi_mail import ConnectionConfig
+
+MAIL_MAX_CONNECTIONS = int(os.getenv("MAIL_MAX_CONNECTIONS", 3))
+MAIL_BATCH_SIZE = int(os.getenv("MAIL_BATCH_SIZE", 50))          # messages per SMTP session
+MAIL_RATE_PER_SECOND = float(os.getenv("MAIL_RATE_PER_SECOND", 10))
+MAIL_MAX_ATTEMPTS = int(os.getenv("MAIL_MAX_ATTEMPTS", 3))
+MAIL_RETRY_BASE_DELAY = 1.0
+MAIL_JOBS_KEPT = 200
+
+
+def html_message(subject: str, recipient: str, body: str) -> EmailMessage:
+    """One HTML message for the dispatcher; the sender is filled in from the mail config."""
+    message = EmailMessage()
+    message["Subject"] = subject
+    message["To"] = recipient
+    message.set_content(body, subtype="html")
+    return message
+
+
+@dataclass
+class MailJob:
+    id: str
+    description: str
+    total: int
+    sent: int = 0
+    failed: int = 0
+    status: str = "queued"
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    finished_at: Optional[datetime] = None
+    errors: List[Dict[str, str]] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "description": self.description,
+            "status": self.status,
+            "total": self.total,
+            "sent": self.sent,
+            "failed": self.failed,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "errors": self.errors,
+        }
+
+
+class RateLimiter:
+    """Spaces out acquisitions to at most `rate` per second."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class MailDispatcher:
+    def __init__(self, config_provider):
+        # config_provider is a callable so the mail config is only built when first needed
+        self._config_provider = config_provider
+        self._jobs: "OrderedDict[str, MailJob]" = OrderedDict()
+        self._tasks: set = set()
+        self._rate_limiter: Optional[RateLimiter] = None
+
+    def get_job(self, job_id: str) -> Optional[MailJob]:
+        return self._jobs.get(job_id)
+
+    def submit(self, messages: List[EmailMessage], description: str = "") -> MailJob:
+        """Queues messages for background delivery and returns the job immediately."""
+        job = MailJob(id=uuid.uuid4().hex, description=description, total=len(messages))
+        self._jobs[job.id] = job
+        while len(self._jobs) > MAIL_JOBS_KEPT:
+            self._jobs.popitem(last=False)
+
+        task = asyncio.create_task(self._run(job, messages))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def _run(self, job: MailJob, messages: List[EmailMessage]):
+        job.status = "running"
+        if self._rate_limiter is None:
+            self._rate_limiter = RateLimiter(MAIL_RATE_PER_SECOND)
+        queue: asyncio.Queue = asyncio.Queue()
+        for message in messages:
+            queue.put_nowait(message)
+
+        config = self._config_provider()
+        workers = min(MAIL_MAX_CONNECTIONS, len(messages)) or 1
+        try:
+            await asyncio.gather(*(self._worker(job, config, queue) for _ in range(workers)))
+            job.status = "completed" if not job.failed else "completed_with_errors"
+        except Exception as e:
+            job.status = "failed"
+            job.errors.append({"recipient": "*", "error": repr(e)})
+        job.finished_at = datetime.now(timezone.utc)
+
+    async def _worker(self, job: MailJob, config: "ConnectionConfig", queue: asyncio.Queue):
+        connection: Optional["SMTP"] = None
+        sent_on_connection = 0
+        sender = formataddr((config.MAIL_FROM_NAME, config.MAIL_FROM)) if config.MAIL_FROM_NAME else config.MAIL_FROM
+
+        try:
+            while not queue.empty():
+                message = queue.get_nowait()
+                recipient = message["To"]
+                if "From" not in message:
+                    message["From"] = sender
+
+                for attempt in range(1, MAIL_MAX_ATTEMPTS + 1):
+                    try:
+                        # Reconnect after a full batch or a failed send
+                        if not config.SUPPRESS_SEND and (connection is None or sent_on_connection >= MAIL_BATCH_SIZE):
+                            await self._close(connection)
+                            connection = None
+                            connection = await self._connect(config)
+                            sent_on_connection = 0
+
+                        await self._rate_limiter.acquire()
+                        if not config.SUPPRESS_SEND:
+                            await connection.send_message(message)
+                        sent_on_connection += 1
+                        job.sent += 1
+                        break
+                    except Exception as e:
+                        await self._close(connection)
+                        connection = None
+                        if attempt == MAIL_MAX_ATTEMPTS:
+                            job.failed += 1
+                            job.errors.append({"recipient": recipient, "error": repr(e)})
+                        else:
+                            delay = MAIL_RETRY_BASE_DELAY * 2 ** (attempt - 1)
+                            await asyncio.sleep(delay + random.uniform(0, delay / 2))
+        finally:
+            await self._close(connection)
+
+    @staticmethod
+    async def _connect(config: "ConnectionConfig") -> "SMTP":
+        import aiosmtplib
+
+        credentials = {}
+        if config.USE_CREDENTIALS:
+            credentials = {"username": config.MAIL_USERNAME, "password": config.MAIL_PASSWORD.get_secret_value()}
+        connection = aiosmtplib.SMTP(
+            hostname=config.MAIL_SERVER,
+            port=config.MAIL_PORT,
+            use_tls=config.MAIL_SSL_TLS,
+            start_tls=config.MAIL_STARTTLS,
+            validate_certs=config.VALIDATE_CERTS,
+            local_hostname=config.LOCAL_HOSTNAME,
+            timeout=config.TIMEOUT,
+            **credentials,
+        )
+        # connect() also runs STARTTLS and login; on failure it leaves the socket closed
+        await connection.connect()
+        return connection
+
+    @staticmethod
+    async def _close(connection: Optional["SMTP"]):
+        if connection is None or not connection.is_connected:
+            return
+        try:
+            await connection.quit()
+        except Exception:
+            connection.close()
+
+
+def _mail_config() -> "ConnectionConfig":
+    from ..email import get_mail_config
+    return get_mail_config()
+
+
+# shared dispatcher instance for the routers
+dispatcher = MailDispatcher(_mail_config)
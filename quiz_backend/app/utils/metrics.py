@@ -0,0 +1,236 @@
+# quiz_backend/app/utils/metrics.py
+#
+# Prometheus text-format metrics.
+#
+# Request metrics are recorded by MetricsMiddleware on the event loop thread,
+# so series are plain dicts, lists and ints updated without locks (an observe() is a
+# bisect plus two increments). Gauges for the DB pool, WebSockets, caches and
+# admission control are read from their owners only when /metrics is scraped.
+
+import math
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from .sql_instrumentation import route_template
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+LOOP_LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+class Gauge:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) - amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge"]
+        for labels, value in self._values.items():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class CallbackMetric:
+    """Gauge or counter whose samples are read at scrape time: fn() -> [(label values, value)]."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str], fn: Callable[[], Iterable[Tuple[tuple, float]]], metric_type: str = "gauge"):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.fn = fn
+        self.metric_type = metric_type
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+        for labels, value in self.fn():
+            if value is not None:
+                lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (last is +Inf), sum, count]
+        self._series: Dict[tuple, list] = {}
+
+    def observe(self, value: float, *labels):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        names = self.labelnames + ("le",)
+        for labels, (counts, total, count) in list(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_format_labels(names, labels + (_format_value(bound),))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route", "status_class"),
+))
+http_requests_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served.", ("method",),
+))
+db_pool_checkout_wait = registry.register(Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled DB connection.", ("pool",), POOL_WAIT_BUCKETS,
+))
+event_loop_lag = registry.register(Histogram(
+    "event_loop_lag_seconds", "How late the event loop ran the watchdog heartbeat.", (), LOOP_LAG_BUCKETS,
+))
+
+
+def _status_class(status_code: int) -> str:
+    return f"{status_code // 100}xx"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording per-route latency and in-flight requests."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc(method)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_flight.dec(method)
+            http_request_duration.observe(time.perf_counter() - started, method, route_template(scope), _status_class(status_code))
+
+
+def _pool_samples():
+    from ..database import engine, read_engine
+
+    engines = [("primary", engine)] + ([("replica", read_engine)] if read_engine is not engine else [])
+    for role, eng in engines:
+        pool = eng.pool
+        if not hasattr(pool, "checkedout"):
+            continue
+        capacity = pool.size() + max(getattr(pool, "_max_overflow", 0), 0)
+        yield (role, "size"), pool.size()
+        yield (role, "checked_out"), pool.checkedout()
+        yield (role, "overflow"), max(pool.overflow(), 0)
+        yield (role, "utilization"), round(pool.checkedout() / capacity, 4) if capacity else None
+
+
+def _websocket_samples():
+    from .websocket_manager import manager
+
+    yield ("connections",), len(manager.active_connections)
+    yield ("send_queue_depth",), manager.pending_sends
+
+
+def _cache_counts():
+    from .principal_cache import principal_cache
+    from .response_cache import response_cache
+    from ..analytics import item_analysis
+
+    return {
+        "principal": (principal_cache.hits, principal_cache.misses),
+        "item_analysis": (item_analysis.cache_hits, item_analysis.cache_misses),
+        "response": (response_cache.hits, response_cache.misses),
+    }
+
+
+def _cache_request_samples():
+    for name, (hits, misses) in _cache_counts().items():
+        yield (name, "hit"), hits
+        yield (name, "miss"), misses
+
+
+def _cache_ratio_samples():
+    for name, (hits, misses) in _cache_counts().items():
+        yield (name,), round(hits / (hits + misses), 4) if hits + misses else None
+
+
+def _log_queue_samples():
+    from .structured_logging import queue_handler
+
+    yield ("queued",), queue_handler.queue.qsize()
+    yield ("dropped",), queue_handler.dropped
+
+
+def _admission_samples():
+    from .admission import admission_controller
+
+    for route_class, in_flight in admission_controller.in_flight_by_class.items():
+        yield (route_class,), in_flight
+
+
+registry.register(CallbackMetric("db_pool", "DB connection pool state (size, checked_out, overflow, utilization).", ("pool", "stat"), _pool_samples))
+registry.register(CallbackMetric("websocket", "WebSocket connections and messages waiting to be sent.", ("stat",), _websocket_samples))
+registry.register(CallbackMetric("cache_requests_total", "In-process cache lookups by result.", ("cache", "result"), _cache_request_samples, "counter"))
+registry.register(CallbackMetric("cache_hit_ratio", "In-process cache hit ratio since startup.", ("cache",), _cache_ratio_samples))
+registry.register(CallbackMetric("log_records", "Structured log queue: records waiting and records dropped on a full queue.", ("stat",), _log_queue_samples))
+registry.register(CallbackMetric("admission_in_flight", "Admitted requests in flight by route class.", ("route_class",), _admission_samples))
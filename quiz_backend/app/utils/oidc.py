@@ -0,0 +1,145 @@
+# quiz_backend/app/utils/oidc.py
+#
+# Cached OpenID Connect provider metadata.
+#
+# The discovery document and JWKS are fetched once, kept for OIDC_CACHE_TTL_SECONDS
+# and refreshed in the background before they expire; if a refresh fails the
+# last good copy keeps being served. The cached documents are pushed into the
+# Authlib client so it never fetches them lazily on the login path, and ID tokens
+# are verified locally against the cached keys instead of calling userinfo.
+
+import asyncio
+import os
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+from authlib.jose import JsonWebKey, JsonWebToken
+from authlib.jose.errors import JoseError
+
+OIDC_DISCOVERY_URL = os.getenv("OIDC_DISCOVERY_URL", "https://accounts.google.com/.well-known/openid-configuration")
+OIDC_CACHE_TTL_SECONDS = float(os.getenv("OIDC_CACHE_TTL_SECONDS", 3600))
+OIDC_REFRESH_RETRY_SECONDS = 30.0
+OIDC_FORCED_REFRESH_MIN_INTERVAL = 60.0  # limits JWKS refetches on unknown key ids
+ID_TOKEN_LEEWAY_SECONDS = 120
+
+
+class IDTokenError(Exception):
+    pass
+
+
+class OIDCProviderCache:
+    def __init__(self, discovery_url: str, ttl: float = OIDC_CACHE_TTL_SECONDS, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.discovery_url = discovery_url
+        self.ttl = ttl
+        self.transport = transport  # e.g. httpx.ASGITransport for an in-process stand-in provider
+        self.metadata: Dict[str, Any] = {}
+        self.jwks: Dict[str, Any] = {}
+        self._key_set = None
+        self._fetched_at = 0.0
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.refreshes = 0
+        self.refresh_failures = 0
+
+    @property
+    def is_fresh(self) -> bool:
+        return bool(self.metadata) and time.monotonic() - self._fetched_at < self.ttl
+
+    async def refresh(self):
+        async with httpx.AsyncClient(timeout=10, transport=self.transport) as client:
+            response = await client.get(self.discovery_url)
+            response.raise_for_status()
+            metadata = response.json()
+            response = await client.get(metadata["jwks_uri"])
+            response.raise_for_status()
+            jwks = response.json()
+
+        self._key_set = JsonWebKey.import_key_set(jwks)
+        self.metadata, self.jwks = metadata, jwks
+        self._fetched_at = time.monotonic()
+        self.refreshes += 1
+
+    async def ensure_loaded(self, force: bool = False):
+        if self.is_fresh and not force:
+            return
+        async with self._lock:
+            if force and time.monotonic() - self._fetched_at < OIDC_FORCED_REFRESH_MIN_INTERVAL:
+                return
+            if self.is_fresh and not force:
+                return
+            try:
+                await self.refresh()
+            except Exception:
+                self.refresh_failures += 1
+                if not self.metadata:
+                    raise  # nothing cached to fall back to
+
+    async def _refresh_loop(self):
+        while True:
+            delay = max(self.ttl * 0.8 - (time.monotonic() - self._fetched_at), 0) if self.metadata else 0
+            await asyncio.sleep(delay)
+            try:
+                await self.refresh()
+            except Exception:
+                self.refresh_failures += 1
+                await asyncio.sleep(OIDC_REFRESH_RETRY_SECONDS)
+
+    def start(self):
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+    async def sync_client(self, client):
+        """Loads the cached documents into an Authlib OAuth client registration."""
+        await self.ensure_loaded()
+        client.server_metadata.update(self.metadata)
+        client.server_metadata["jwks"] = self.jwks
+        client.server_metadata["_loaded_at"] = time.time()
+
+    async def verify_id_token(self, id_token: str, client_id: str, nonce: Optional[str] = None) -> Dict[str, Any]:
+        """Verifies an ID token's signature and claims against the cached JWKS."""
+        await self.ensure_loaded()
+        alg_values = self.metadata.get("id_token_signing_alg_values_supported") or ["RS256"]
+        claims_options = {
+            "iss": {"essential": True, "values": [self.metadata.get("issuer")]},
+            "aud": {"essential": True, "values": [client_id]},
+            "exp": {"essential": True},
+        }
+        if nonce is not None:
+            claims_options["nonce"] = {"essential": True, "value": nonce}
+
+        jwt = JsonWebToken(alg_values)
+        try:
+            try:
+                claims = jwt.decode(id_token, key=self._key_set, claims_options=claims_options)
+            except ValueError:
+                # Unknown key id: the provider may have rotated its keys
+                await self.ensure_loaded(force=True)
+                claims = jwt.decode(id_token, key=self._key_set, claims_options=claims_options)
+            claims.validate(leeway=ID_TOKEN_LEEWAY_SECONDS)
+        except (JoseError, ValueError) as e:
+            raise IDTokenError(f"Invalid ID token: {e}")
+        return dict(claims)
+
+    def stats(self) -> dict:
+        return {
+            "discovery_url": self.discovery_url,
+            "loaded": bool(self.metadata),
+            "age_seconds": round(time.monotonic() - self._fetched_at, 1) if self.metadata else None,
+            "ttl_seconds": self.ttl,
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+        }
+
+
+# shared provider cache for the Google login flow
+oidc_provider = OIDCProviderCache(OIDC_DISCOVERY_URL)
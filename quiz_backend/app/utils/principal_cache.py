@@ -0,0 +1,125 @@
+# quiz_backend/app/utils/principal_cache.py
+#
+# Bounded TTL + LRU cache of authenticated principals, keyed by the JWT subject
+# (the user's email). get_current_user consults it before touching the database.
+# Entries are invalidated whenever a User row is updated or deleted through the ORM.
+
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from ..models.user import User
+
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", 60))
+PRINCIPAL_CACHE_MAX_ENTRIES = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", 10000))
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Read-only snapshot of the authenticated user (no password hash)."""
+    id: int
+    employee_id: str
+    full_name: str
+    email: str
+    is_admin: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            employee_id=user.employee_id,
+            full_name=user.full_name,
+            email=user.email,
+            is_admin=bool(user.is_admin),
+        )
+
+
+class PrincipalCache:
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, subject: str) -> Optional[Principal]:
+        entry = self._entries.get(subject)
+        if entry is None:
+            self.misses += 1
+            return None
+        principal, expires_at = entry
+        if expires_at < time.monotonic():
+            del self._entries[subject]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(subject)
+        self.hits += 1
+        return principal
+
+    def set(self, subject: str, principal: Principal):
+        self._entries[subject] = (principal, time.monotonic() + self.ttl)
+        self._entries.move_to_end(subject)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, subject: str):
+        if self._entries.pop(subject, None) is not None:
+            self.invalidations += 1
+
+    def clear(self):
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+principal_cache = PrincipalCache(PRINCIPAL_CACHE_TTL_SECONDS, PRINCIPAL_CACHE_MAX_ENTRIES)
+
+
+def _changed_user_emails(session: Session):
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User):
+            history = inspect(obj).attrs.email.history
+            yield from (history.deleted or ())
+            if obj.email:
+                yield obj.email
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_changed_users(session, flush_context):
+    # Remember the changed users so they are dropped again once the transaction commits,
+    # in case another request re-cached the old row in between
+    changed = session.info.setdefault("principal_cache_invalidate", set())
+    for email in _changed_user_emails(session):
+        changed.add(email)
+        principal_cache.invalidate(email)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    for email in session.info.pop("principal_cache_invalidate", ()):
+        principal_cache.invalidate(email)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_after_rollback(session):
+    session.info.pop("principal_cache_invalidate", None)
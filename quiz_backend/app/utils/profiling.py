@@ -0,0 +1,237 @@
+# quiz_backend/app/utils/profiling.py
+#
+# On-demand request profiling.
+#
+# A request is profiled when it carries a valid X-Profile-Token header (a
+# short-lived JWT issued by POST /admin/profiles/token) or is picked by
+# PROFILE_SAMPLE_RATE. While any profile is active, a sampler thread reads the
+# event loop thread's stack every PROFILE_INTERVAL_MS:
+# - if the stack runs through the profiled request's middleware frame, the
+#   request is on CPU and the stack is counted;
+# - otherwise the request is awaiting (database, network, thread pool or other
+#   tasks holding the loop) and the sample is counted under an "<awaiting ...>" frame.
+#
+# Samples are weighted by the time since the previous one. Stacks are written
+# to PROFILE_DIR in folded format ("a;b;c microseconds"), which
+# flamegraph.pl, inferno and speedscope read directly, next to a JSON summary.
+
+import asyncio
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from jose import JWTError, jwt
+
+from ..config import ALGORITHM, SECRET_KEY
+from .sql_instrumentation import route_template
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", 2))
+PROFILE_MAX_CONCURRENT = int(os.getenv("PROFILE_MAX_CONCURRENT", 4))
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", 200))
+PROFILE_TOKEN_TYPE = "profile"
+PROFILE_ID_PATTERN = re.compile(r"^[0-9]{8}T[0-9]{6}_[0-9a-f]{12}$")
+
+AWAITING_IDLE = "<awaiting: event loop idle>"
+AWAITING_OTHER = "<awaiting: loop busy with other tasks>"
+
+
+def issue_profile_token(admin_email: str, minutes: int = 10) -> str:
+    expire = datetime.now(timezone.utc) + timedelta(minutes=minutes)
+    return jwt.encode({"sub": admin_email, "type": PROFILE_TOKEN_TYPE, "exp": expire}, SECRET_KEY, algorithm=ALGORITHM)
+
+
+def _valid_profile_token(token: str) -> bool:
+    try:
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("type") == PROFILE_TOKEN_TYPE
+    except JWTError:
+        return False
+
+
+def _frame_label(code) -> str:
+    parts = code.co_filename.replace("\\", "/").split("/")
+    return f"{code.co_name} ({'/'.join(parts[-2:])}:{code.co_firstlineno})".replace(";", ",")
+
+
+def _is_idle(frame) -> bool:
+    # The loop thread blocked in the selector means nothing was runnable
+    return frame is not None and frame.f_code.co_name == "select" and frame.f_code.co_filename.endswith("selectors.py")
+
+
+class RequestProfile:
+    def __init__(self, profile_id: str, method: str, path: str):
+        self.profile_id = profile_id
+        self.marker_frame = None
+        self.method = method
+        self.path = path
+        self.stacks: Counter = Counter()  # folded stack -> microseconds
+        self.on_cpu_seconds = 0.0
+        self.awaiting_seconds = 0.0
+        self.samples = 0
+        self.last_sample_at = time.perf_counter()
+
+    def add_sample(self, frames: List, idle: bool, now: float):
+        if self.marker_frame is None:
+            return
+        # Weight by time since the previous sample: while the loop thread holds
+        # the GIL the sampler wakes up late, so plain sample counts undercount CPU
+        elapsed = now - self.last_sample_at
+        self.last_sample_at = now
+        self.samples += 1
+        for index, frame in enumerate(frames):
+            if frame is self.marker_frame:
+                self.on_cpu_seconds += elapsed
+                self.stacks[";".join(_frame_label(f.f_code) for f in frames[index:])] += int(elapsed * 1e6)
+                return
+        self.awaiting_seconds += elapsed
+        self.stacks[AWAITING_IDLE if idle else AWAITING_OTHER] += int(elapsed * 1e6)
+
+
+class Sampler:
+    """One sampler thread shared by all active profiles; it exits when none are left."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.profiles: Dict[str, RequestProfile] = {}
+        self.target_thread: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def add(self, profile: RequestProfile, thread_id: int):
+        with self._lock:
+            self.target_thread = thread_id
+            self.profiles[profile.profile_id] = profile
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self._thread.start()
+
+    def remove(self, profile: RequestProfile):
+        with self._lock:
+            self.profiles.pop(profile.profile_id, None)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                profiles = list(self.profiles.values())
+                if not profiles:
+                    self._thread = None
+                    return
+            now = time.perf_counter()
+            frame = sys._current_frames().get(self.target_thread)
+            frames = []
+            while frame is not None:
+                frames.append(frame)
+                frame = frame.f_back
+            frames.reverse()  # root first
+            idle = _is_idle(frames[-1] if frames else None)
+            for profile in profiles:
+                profile.add_sample(frames, idle, now)
+            del frames
+
+
+sampler = Sampler(PROFILE_INTERVAL_MS / 1000)
+
+
+def _write_profile(profile: RequestProfile, summary: dict):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    base = os.path.join(PROFILE_DIR, profile.profile_id)
+    with open(base + ".folded", "w") as f:
+        for stack, count in profile.stacks.most_common():
+            f.write(f"{stack} {count}\n")
+    with open(base + ".json", "w") as f:
+        json.dump(summary, f)
+
+    summaries = sorted(name for name in os.listdir(PROFILE_DIR) if name.endswith(".json"))
+    for name in summaries[:-PROFILE_MAX_FILES] if len(summaries) > PROFILE_MAX_FILES else []:
+        for suffix in (".json", ".folded"):
+            try:
+                os.remove(os.path.join(PROFILE_DIR, name[:-5] + suffix))
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles() -> List[dict]:
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    profiles = []
+    for name in sorted(os.listdir(PROFILE_DIR), reverse=True):
+        if name.endswith(".json"):
+            with open(os.path.join(PROFILE_DIR, name)) as f:
+                profiles.append(json.load(f))
+    return profiles
+
+
+def profile_path(profile_id: str) -> Optional[str]:
+    if not PROFILE_ID_PATTERN.match(profile_id):
+        return None
+    path = os.path.join(PROFILE_DIR, profile_id + ".folded")
+    return path if os.path.isfile(path) else None
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware that profiles token-carrying or sampled requests."""
+
+    def __init__(self, app):
+        self.app = app
+
+    def _should_profile(self, scope) -> bool:
+        if len(sampler.profiles) >= PROFILE_MAX_CONCURRENT:
+            return False
+        for key, value in scope.get("headers", ()):
+            if key == b"x-profile-token":
+                return _valid_profile_token(value.decode("latin-1"))
+        return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+        await self._profiled(scope, receive, send)
+
+    async def _profiled(self, scope, receive, send):
+        profile_id = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}_{uuid.uuid4().hex[:12]}"
+        profile = RequestProfile(profile_id, scope["method"], scope["path"])
+        profile.marker_frame = sys._getframe()
+        status_code = 500
+
+        async def send_with_profile_id(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message = dict(message)
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        wall_started = profile.last_sample_at = time.perf_counter()
+        sampler.add(profile, threading.get_ident())
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            sampler.remove(profile)
+            profile.marker_frame = None
+            wall = time.perf_counter() - wall_started
+            summary = {
+                "profile_id": profile_id,
+                "method": profile.method,
+                "path": profile.path,
+                "route": route_template(scope),
+                "status": status_code,
+                "captured_at": datetime.now(timezone.utc).isoformat(),
+                "wall_ms": round(wall * 1000, 1),
+                "on_cpu_ms": round(profile.on_cpu_seconds * 1000, 1),
+                "awaiting_ms": round(profile.awaiting_seconds * 1000, 1),
+                "samples": profile.samples,
+                "interval_ms": PROFILE_INTERVAL_MS,
+                "stack_weight_unit": "microseconds",
+            }
+            await asyncio.to_thread(_write_profile, profile, summary)
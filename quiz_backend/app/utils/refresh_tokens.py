@@ -0,0 +1,150 @@
+# quiz_backend/app/utils/refresh_tokens.py
+#
+# Rotating refresh tokens.
+#
+# A refresh token is an HMAC-signed JWT (type="refresh") carrying the user's
+# email, a unique jti and a rotation family id. Renewing is a signature check
+# plus a revocation lookup -- no password hashing. Each token is single use:
+# rotation revokes its jti, and presenting an already-used token revokes the
+# whole family (a stolen token can then only be replayed once).
+#
+# Only revocations are stored (revoked_tokens), and rows can be purged once the
+# token would have expired anyway. Lookups hit an in-memory hot set first and
+# fall back to the table, so revocations made by other workers are still seen.
+
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional
+
+from jose import JWTError, jwt
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import ALGORITHM, REFRESH_TOKEN_EXPIRE_DAYS, SECRET_KEY
+from ..models.revoked_token import RevokedToken
+
+REFRESH_TOKEN_TYPE = "refresh"
+HOT_SET_MAX_ENTRIES = 100_000
+
+
+class InvalidRefreshToken(Exception):
+    pass
+
+
+def _family_key(family: str) -> str:
+    return f"family:{family}"
+
+
+def _family_expiry() -> datetime:
+    # Each rotation issues a fresh expiry, so a family stays revoked for a full token lifetime
+    return datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+
+
+class RevocationStore:
+    def __init__(self, max_entries: int = HOT_SET_MAX_ENTRIES):
+        self.max_entries = max_entries
+        # revoked key -> unix expiry; entries past expiry are irrelevant (the JWT is expired too)
+        self._hot: "OrderedDict[str, float]" = OrderedDict()
+
+    def _remember(self, key: str, expires_at: float):
+        self._hot[key] = expires_at
+        self._hot.move_to_end(key)
+        while len(self._hot) > self.max_entries:
+            self._hot.popitem(last=False)
+
+    def _in_hot_set(self, keys: Iterable[str]) -> bool:
+        now = time.time()
+        for key in keys:
+            expires_at = self._hot.get(key)
+            if expires_at is not None:
+                if expires_at > now:
+                    return True
+                del self._hot[key]
+        return False
+
+    async def is_revoked(self, db: AsyncSession, *keys: str) -> bool:
+        if self._in_hot_set(keys):
+            return True
+        result = await db.execute(
+            select(RevokedToken.jti, RevokedToken.expires_at).where(RevokedToken.jti.in_(keys))
+        )
+        rows = result.all()
+        for key, expires_at in rows:
+            self._remember(key, expires_at.timestamp())
+        return bool(rows)
+
+    async def revoke(self, db: AsyncSession, key: str, user_id: Optional[int], expires_at: datetime) -> bool:
+        """Records a revocation. Returns False if the key was already revoked."""
+        result = await db.execute(
+            insert(RevokedToken)
+            .values(jti=key, user_id=user_id, expires_at=expires_at)
+            .on_conflict_do_nothing(index_elements=[RevokedToken.jti])
+            .returning(RevokedToken.jti)
+        )
+        inserted = result.first() is not None
+        self._remember(key, expires_at.timestamp())
+        return inserted
+
+    async def purge_expired(self, db: AsyncSession) -> int:
+        result = await db.execute(delete(RevokedToken).where(RevokedToken.expires_at < datetime.now(timezone.utc)))
+        now = time.time()
+        for key in [k for k, exp in self._hot.items() if exp <= now]:
+            del self._hot[key]
+        return result.rowcount or 0
+
+
+revocation_store = RevocationStore()
+
+
+def issue_refresh_token(email: str, user_id: int, family: Optional[str] = None) -> str:
+    expire = datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    claims = {
+        "sub": email,
+        "uid": user_id,
+        "jti": uuid.uuid4().hex,
+        "fam": family or uuid.uuid4().hex,
+        "type": REFRESH_TOKEN_TYPE,
+        "exp": expire,
+    }
+    return jwt.encode(claims, SECRET_KEY, algorithm=ALGORITHM)
+
+
+def decode_refresh_token(token: str) -> dict:
+    try:
+        claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        raise InvalidRefreshToken("Invalid refresh token")
+    if claims.get("type") != REFRESH_TOKEN_TYPE or not all(claims.get(k) for k in ("sub", "jti", "fam", "exp")):
+        raise InvalidRefreshToken("Invalid refresh token")
+    return claims
+
+
+async def rotate_refresh_token(db: AsyncSession, token: str) -> tuple:
+    """
+    Consumes a refresh token and returns (claims, new refresh token).
+    Raises InvalidRefreshToken if it is invalid, expired, revoked or reused.
+    """
+    claims = decode_refresh_token(token)
+    family_key = _family_key(claims["fam"])
+    expires_at = datetime.fromtimestamp(claims["exp"], tz=timezone.utc)
+
+    if await revocation_store.is_revoked(db, family_key):
+        raise InvalidRefreshToken("Refresh token revoked")
+
+    # Single use: the insert is atomic, so concurrent replays lose the race
+    if not await revocation_store.revoke(db, claims["jti"], claims.get("uid"), expires_at):
+        await revocation_store.revoke(db, family_key, claims.get("uid"), _family_expiry())
+        await db.commit()
+        raise InvalidRefreshToken("Refresh token reuse detected")
+
+    await db.commit()
+    return claims, issue_refresh_token(claims["sub"], claims.get("uid"), family=claims["fam"])
+
+
+async def revoke_refresh_token_family(db: AsyncSession, token: str):
+    claims = decode_refresh_token(token)
+    await revocation_store.revoke(db, _family_key(claims["fam"]), claims.get("uid"), _family_expiry())
+    await db.commit()
@@ -0,0 +1,245 @@
+# quiz_backend/app/utils/response_cache.py
+#
+# Tag-based response cache for read endpoints.
+#
+# A route opts in with the @cached decorator (under its @router.get):
+#
+#     @router.get("/{quiz_id}")
+#     @cached(ttl=60, tags=("quiz:{quiz_id}",))
+#     async def get_quiz(quiz_id: int, db=Depends(get_read_db)): ...
+#
+# - The key is the route plus its path/query parameters (dependencies are not
+#   part of it); vary_on adds the .id of dependency values such as the user.
+# - Tags are format strings over the same parameters ("quiz:{quiz_id}",
+#   "leaderboard:{quiz_id}", "user:{user.id}", "group:{group_id}", "quizzes").
+# - Writes call invalidate_on_commit(db, *tags) before committing; the entries
+#   carrying any of those tags are dropped once the transaction commits (the
+#   same after_commit hook the principal cache uses).
+# - Concurrent misses on one key share a single computation, and a result whose
+#   tags were invalidated while it was being computed is not stored.
+# - Entries live in this process only (LRU, capped by count and bytes), so other
+#   workers see a write at the latest when their entry's TTL runs out.
+#
+# Only 200 responses are cached; dependencies (auth included) still run on hits.
+
+import asyncio
+import functools
+import inspect
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from fastapi import params
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from .fast_json import FastJSONResponse
+
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() in ("true", "1", "yes")
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 5000))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_MB", 128)) * 1024 * 1024
+RESPONSE_CACHE_MAX_ENTRY_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRY_MB", 8)) * 1024 * 1024
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    media_type: Optional[str]
+    tags: Tuple[str, ...]
+    expires_at: float
+
+
+class _InFlight:
+    __slots__ = ("future", "tags", "stale")
+
+    def __init__(self, tags: Tuple[str, ...]):
+        self.future = asyncio.get_running_loop().create_future()
+        self.tags = tags
+        self.stale = False
+
+
+class ResponseCache:
+    """In-process LRU of rendered response bodies with a tag -> keys index."""
+
+    def __init__(self, max_entries: int, max_bytes: int, max_entry_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._tag_index: Dict[str, Set[str]] = {}
+        self._in_flight: Dict[str, _InFlight] = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at < time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, entry: CachedResponse):
+        if len(entry.body) > self.max_entry_bytes:
+            return
+        self._remove(key)
+        self._entries[key] = entry
+        self.bytes += len(entry.body)
+        for tag in entry.tags:
+            self._tag_index.setdefault(tag, set()).add(key)
+        while self._entries and (len(self._entries) > self.max_entries or self.bytes > self.max_bytes):
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self.bytes -= len(entry.body)
+        for tag in entry.tags:
+            keys = self._tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_index[tag]
+
+    def invalidate(self, *tags: str):
+        for tag in tags:
+            for key in list(self._tag_index.get(tag, ())):
+                self._remove(key)
+                self.invalidations += 1
+        # Results being computed right now may have read the old data
+        wanted = set(tags)
+        for in_flight in self._in_flight.values():
+            if wanted.intersection(in_flight.tags):
+                in_flight.stale = True
+
+    def clear(self):
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+        self._tag_index.clear()
+        self.bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "bytes": self.bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "tags": len(self._tag_index),
+            "in_flight": len(self._in_flight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+response_cache = ResponseCache(RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_MAX_BYTES, RESPONSE_CACHE_MAX_ENTRY_BYTES)
+
+
+def invalidate_on_commit(db, *tags: str):
+    """Drops cached responses with any of `tags` once `db`'s transaction commits."""
+    db.info.setdefault("response_cache_invalidate", set()).update(tags)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    tags = session.info.pop("response_cache_invalidate", None)
+    if tags:
+        response_cache.invalidate(*tags)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session):
+    session.info.pop("response_cache_invalidate", None)
+
+
+def _render(result: Any) -> Optional[Response]:
+    if isinstance(result, StreamingResponse):
+        return None
+    if isinstance(result, Response):
+        return result
+    return FastJSONResponse(jsonable_encoder(result))
+
+
+def _hit(entry: CachedResponse) -> Response:
+    return Response(entry.body, media_type=entry.media_type, headers={"X-Cache": "HIT"})
+
+
+def cached(ttl: float, tags: Iterable[str] = (), vary_on: Iterable[str] = ()):
+    """
+    Caches a GET endpoint's 200 response for `ttl` seconds.
+    `tags` are format strings over the endpoint's parameters; `vary_on` names
+    dependency parameters whose .id becomes part of the key (e.g. the current user).
+    """
+    tags = tuple(tags)
+    vary_on = tuple(vary_on)
+
+    def decorator(func):
+        signature = inspect.signature(func)
+        key_params = [
+            name for name, param in signature.parameters.items()
+            if not isinstance(param.default, params.Depends)
+        ]
+        route_key = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if not RESPONSE_CACHE_ENABLED:
+                return await func(*args, **kwargs)
+
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            values = bound.arguments
+            parts = [f"{name}={values.get(name)!r}" for name in key_params]
+            parts += [f"{name}.id={getattr(values.get(name), 'id', None)!r}" for name in vary_on]
+            key = f"{route_key}?{'&'.join(parts)}"
+
+            entry = response_cache.get(key)
+            if entry is not None:
+                response_cache.hits += 1
+                return _hit(entry)
+
+            # Someone is already computing this key: wait for their result
+            in_flight = response_cache._in_flight.get(key)
+            if in_flight is not None:
+                entry = await asyncio.shield(in_flight.future)
+                if entry is not None:
+                    response_cache.hits += 1
+                    return _hit(entry)
+                response_cache.misses += 1
+                return await func(*args, **kwargs)
+            response_cache.misses += 1
+
+            entry_tags = tuple(tag.format(**values) for tag in tags)
+            in_flight = response_cache._in_flight[key] = _InFlight(entry_tags)
+            entry = None
+            try:
+                result = await func(*args, **kwargs)
+                response = _render(result)
+                if response is None or response.status_code != 200:
+                    return result
+                response.headers["X-Cache"] = "MISS"
+                if not in_flight.stale:
+                    entry = CachedResponse(response.body, response.media_type, entry_tags, time.monotonic() + ttl)
+                    response_cache.set(key, entry)
+                return response
+            finally:
+                del response_cache._in_flight[key]
+                in_flight.future.set_result(entry)
+
+        return wrapper
+
+    return decorator
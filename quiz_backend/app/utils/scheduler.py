@@ -0,0 +1,295 @@
+# quiz_backend/app/utils/scheduler.py
+#
+# In-process scheduler for time-based jobs, persisted in the scheduled_jobs table.
+#
+# - Router modules register handlers at import:
+#       @scheduler.recurring("purge_expired_tokens", every=3600)
+#       async def purge(db, payload): ...
+#       @scheduler.handler("quiz_deadline_reminder")
+#       async def remind(db, payload): ...
+#   and queue one-shot runs with `await scheduler.schedule_once(db, name, handler, run_at, payload)`
+#   (written in the caller's transaction).
+# - Every worker keeps the enabled jobs in a heap ordered by next_run_at and sleeps
+#   until the earliest one is due. The heap is reloaded every SCHEDULER_REFRESH_SECONDS
+#   to pick up jobs scheduled by other workers.
+# - A due job runs in a transaction holding pg_try_advisory_xact_lock on the job's
+#   name, and only if its row is still due: whichever worker gets there first runs
+#   it and moves next_run_at; the others skip it and re-read the new time.
+# - Handlers get the session and the payload; their writes commit together with
+#   the job's bookkeeping. A failing run is retried after SCHEDULER_RETRY_SECONDS
+#   (or its interval, if shorter).
+
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import async_session
+from ..models.scheduled_job import ScheduledJob
+from .structured_logging import bind_log_context, log_event
+
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "true").lower() in ("true", "1", "yes")
+SCHEDULER_REFRESH_SECONDS = float(os.getenv("SCHEDULER_REFRESH_SECONDS", 30))
+SCHEDULER_RETRY_SECONDS = float(os.getenv("SCHEDULER_RETRY_SECONDS", 300))
+# First key of the two-key advisory lock, so job locks can't collide with other advisory locks
+ADVISORY_LOCK_NAMESPACE = 0x5C4ED
+
+Handler = Callable[[AsyncSession, dict], Awaitable[Optional[dict]]]
+
+logger = logging.getLogger("app.scheduler")
+
+
+class JobScheduler:
+    def __init__(self):
+        self.handlers: Dict[str, Handler] = {}
+        self.recurring_jobs: Dict[str, Tuple[str, int]] = {}  # job name -> (handler, interval seconds)
+        self._heap: List[Tuple[float, int, str]] = []       # (run at, tiebreak, job name)
+        self._due_at: Dict[str, float] = {}                 # job name -> current heap time (older entries are stale)
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.skipped = 0
+        self.failures = 0
+
+    # Registration (at import time)
+
+    def handler(self, name: str):
+        def decorator(fn: Handler) -> Handler:
+            self.handlers[name] = fn
+            return fn
+        return decorator
+
+    def recurring(self, name: str, every: float):
+        """Registers `fn` as the handler of a job that runs every `every` seconds."""
+        def decorator(fn: Handler) -> Handler:
+            self.handlers[name] = fn
+            self.recurring_jobs[name] = (name, int(every))
+            return fn
+        return decorator
+
+    async def schedule_once(self, db: AsyncSession, name: str, handler: str, run_at: datetime, payload: Optional[dict] = None):
+        """Creates or reschedules a one-shot job; it is written in (and commits with) `db`'s transaction."""
+        if handler not in self.handlers:
+            raise KeyError(f"Unknown job handler: {handler}")
+        await db.execute(
+            insert(ScheduledJob)
+            .values(name=name, handler=handler, payload=payload or {}, interval_seconds=None,
+                    next_run_at=run_at, enabled=True, run_count=0)
+            .on_conflict_do_update(
+                index_elements=[ScheduledJob.name],
+                set_={"handler": handler, "payload": payload or {}, "next_run_at": run_at, "enabled": True},
+            )
+        )
+        # If the transaction rolls back, the run finds no due row and is skipped
+        self._push(name, run_at.timestamp())
+
+    async def cancel(self, db: AsyncSession, name: str):
+        await db.execute(update(ScheduledJob).where(ScheduledJob.name == name).values(enabled=False))
+        self._due_at.pop(name, None)
+
+    async def run_now(self, db: AsyncSession, name: str) -> bool:
+        result = await db.execute(
+            update(ScheduledJob).where(ScheduledJob.name == name)
+            .values(next_run_at=func.now(), enabled=True)
+            .returning(ScheduledJob.name)
+        )
+        if result.first() is None:
+            return False
+        self._push(name, time.time())
+        return True
+
+    # Heap
+
+    def _push(self, name: str, run_at: float):
+        self._due_at[name] = run_at
+        heapq.heappush(self._heap, (run_at, next(self._seq), name))
+        self._wakeup.set()
+
+    def _pop_due(self, now: float) -> List[str]:
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            run_at, _, name = heapq.heappop(self._heap)
+            if self._due_at.get(name) == run_at:
+                del self._due_at[name]
+                due.append(name)
+        return due
+
+    # Lifecycle
+
+    def start(self):
+        if self._task is not None or not SCHEDULER_ENABLED:
+            return
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _sync_recurring(self):
+        # Recurring jobs are declared in code: create their rows, keep their schedule
+        if not self.recurring_jobs:
+            return
+        async with async_session() as db:
+            for name, (handler, interval) in self.recurring_jobs.items():
+                await db.execute(
+                    insert(ScheduledJob)
+                    .values(name=name, handler=handler, payload={}, interval_seconds=interval,
+                            next_run_at=func.now(), enabled=True, run_count=0)
+                    .on_conflict_do_update(
+                        index_elements=[ScheduledJob.name],
+                        set_={"handler": handler, "interval_seconds": interval, "enabled": True},
+                    )
+                )
+            await db.commit()
+
+    async def _reload(self):
+        async with async_session() as db:
+            result = await db.execute(
+                select(ScheduledJob.name, ScheduledJob.next_run_at).where(ScheduledJob.enabled == True)
+            )
+            rows = result.all()
+        self._heap = []
+        self._due_at = {}
+        for name, next_run_at in rows:
+            self._push(name, next_run_at.timestamp())
+
+    async def _loop(self):
+        synced = False
+        last_reload = float("-inf")
+        while True:
+            try:
+                if not synced:
+                    await self._sync_recurring()
+                    synced = True
+                if time.monotonic() - last_reload >= SCHEDULER_REFRESH_SECONDS:
+                    await self._reload()
+                    last_reload = time.monotonic()
+                for name in self._pop_due(time.time()):
+                    await self._fire(name)
+
+                delay = SCHEDULER_REFRESH_SECONDS - (time.monotonic() - last_reload)
+                if self._heap:
+                    delay = min(delay, self._heap[0][0] - time.time())
+                self._wakeup.clear()
+                if delay > 0:
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                    except asyncio.TimeoutError:
+                        pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Database unreachable and the like: keep the loop alive and try again later
+                log_event(logger, "scheduler.error", logging.ERROR, exc_info=e)
+                await asyncio.sleep(SCHEDULER_RETRY_SECONDS / 10)
+
+    async def _fire(self, name: str):
+        bind_log_context(job=name)
+        async with async_session() as db:
+            locked = await db.scalar(select(func.pg_try_advisory_xact_lock(ADVISORY_LOCK_NAMESPACE, func.hashtext(name))))
+            if not locked:
+                self.skipped += 1
+                return  # another worker is running it; its new next_run_at arrives with the next reload
+
+            job = await db.scalar(select(ScheduledJob).where(ScheduledJob.name == name))
+            now = datetime.now(timezone.utc)
+            if job is None or not job.enabled or job.next_run_at > now:
+                self.skipped += 1
+                if job is not None and job.enabled:
+                    self._push(name, job.next_run_at.timestamp())
+                return
+
+            # Copied out: the rollback after a failed run expires `job`, and reloading
+            # an expired attribute outside a greenlet raises on an AsyncSession
+            handler, interval, payload = job.handler, job.interval_seconds, dict(job.payload or {})
+            fn = self.handlers.get(handler)
+            started = time.perf_counter()
+            try:
+                if fn is None:
+                    raise LookupError(f"No handler registered for {handler!r}")
+                result = await fn(db, payload)
+            except Exception as e:
+                await db.rollback()
+                self.failures += 1
+                log_event(logger, "job.failed", logging.ERROR, exc_info=e, handler=handler)
+                await self._finish(name, interval, "error", repr(e))
+                return
+
+            self.runs += 1
+            await self._finish(name, interval, "ok", None, db)
+            log_event(logger, "job.completed", handler=handler,
+                      duration_ms=round((time.perf_counter() - started) * 1000, 1), result=result)
+
+    async def _finish(self, name: str, interval: Optional[int], status: str, error: Optional[str], db: Optional[AsyncSession] = None):
+        now = datetime.now(timezone.utc)
+        if status == "ok":
+            next_run_at = now + timedelta(seconds=interval) if interval else None
+        else:
+            retry = min(SCHEDULER_RETRY_SECONDS, interval) if interval else SCHEDULER_RETRY_SECONDS
+            next_run_at = now + timedelta(seconds=retry)
+        values = {
+            "last_run_at": now,
+            "last_status": status,
+            "last_error": error,
+            "run_count": ScheduledJob.run_count + 1,
+            # One-shot jobs are done once they succeed
+            "enabled": next_run_at is not None,
+            "next_run_at": next_run_at or now,
+        }
+        if db is None:
+            async with async_session() as session:
+                await session.execute(update(ScheduledJob).where(ScheduledJob.name == name).values(**values))
+                await session.commit()
+        else:
+            # Same transaction as the handler's writes; committing releases the advisory lock
+            await db.execute(update(ScheduledJob).where(ScheduledJob.name == name).values(**values))
+            await db.commit()
+        if next_run_at is not None:
+            self._push(name, next_run_at.timestamp())
+
+    async def list_jobs(self, db: AsyncSession) -> List[dict]:
+        result = await db.execute(select(ScheduledJob).order_by(ScheduledJob.next_run_at))
+        return [
+            {
+                "name": job.name,
+                "handler": job.handler,
+                "payload": job.payload,
+                "interval_seconds": job.interval_seconds,
+                "enabled": job.enabled,
+                "next_run_at": job.next_run_at,
+                "last_run_at": job.last_run_at,
+                "last_status": job.last_status,
+                "last_error": job.last_error,
+                "run_count": job.run_count,
+                "queued_here": job.name in self._due_at,
+            }
+            for job in result.scalars().all()
+        ]
+
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None,
+            "queued": len(self._due_at),
+            "next_due_in_seconds": round(self._heap[0][0] - time.time(), 1) if self._heap else None,
+            "runs": self.runs,
+            "skipped": self.skipped,
+            "failures": self.failures,
+        }
+
+
+scheduler = JobScheduler()
@@ -0,0 +1,152 @@
+# quiz_backend/app/utils/sql_instrumentation.py
+#
+# Per-request SQL instrumentation.
+#
+# Engine cursor events add each statement's count, DB time and rows to the
+# RequestQueryStats of the request being served (tracked in a contextvar;
+# SQLAlchemy's async greenlets share the caller's context). The middleware
+# emits the totals as a Server-Timing header and a structured log line, and
+# flags routes that run the same statement SQL_NPLUSONE_THRESHOLD or more
+# times in one request (the usual N+1 pattern of a query inside a loop).
+
+import logging
+import os
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from sqlalchemy import event
+
+from .structured_logging import log_event
+
+SQL_INSTRUMENTATION_ENABLED = os.getenv("SQL_INSTRUMENTATION_ENABLED", "true").lower() in ("true", "1", "yes")
+SQL_NPLUSONE_THRESHOLD = int(os.getenv("SQL_NPLUSONE_THRESHOLD", 5))
+
+logger = logging.getLogger("app.requests")
+
+
+class RequestQueryStats:
+    __slots__ = ("queries", "db_seconds", "rows", "statements")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.rows = 0
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, elapsed: float, rows: int):
+        self.queries += 1
+        self.db_seconds += elapsed
+        self.rows += rows
+        self.statements[statement] += 1
+
+    def most_repeated(self):
+        if not self.statements:
+            return None, 0
+        return self.statements.most_common(1)[0]
+
+
+_current_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+
+def current_query_stats() -> Optional[RequestQueryStats]:
+    return _current_stats.get()
+
+
+def install_query_instrumentation(engine):
+    """Attaches the per-request cursor listeners to an AsyncEngine."""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        context._instrumented_at = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        stats = _current_stats.get()
+        if stats is not None:
+            # asyncpg reports rows returned for SELECT and rows affected for DML
+            stats.record(statement, time.perf_counter() - context._instrumented_at, max(cursor.rowcount, 0))
+
+
+def route_template(scope) -> str:
+    # FastAPI stores the matched route in the scope, e.g. /quizzes/{quiz_id}/leaderboard
+    route = scope.get("route")
+    return getattr(route, "path", None) or "<unmatched>"
+
+
+class NPlusOneRegistry:
+    """Routes that issued repeated identical statements, with their worst request."""
+
+    def __init__(self, threshold: int = SQL_NPLUSONE_THRESHOLD):
+        self.threshold = threshold
+        self.routes: Dict[str, dict] = {}
+
+    def check(self, route: str, stats: RequestQueryStats) -> bool:
+        statement, repeats = stats.most_repeated()
+        if repeats < self.threshold:
+            return False
+        entry = self.routes.setdefault(route, {"requests_flagged": 0, "max_repeats": 0, "statement": None})
+        entry["requests_flagged"] += 1
+        if repeats > entry["max_repeats"]:
+            entry["max_repeats"] = repeats
+            entry["statement"] = statement
+        return True
+
+    def stats(self) -> dict:
+        return {"threshold": self.threshold, "routes": dict(self.routes)}
+
+
+n_plus_one = NPlusOneRegistry()
+
+
+class QueryInstrumentationMiddleware:
+    """Pure ASGI middleware: Server-Timing header, per-request log line and N+1 flagging."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not SQL_INSTRUMENTATION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats()
+        token = _current_stats.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                app_ms = (time.perf_counter() - started) * 1000
+                timing = (
+                    f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.queries} queries, {stats.rows} rows", '
+                    f"app;dur={app_ms:.1f}"
+                )
+                message = dict(message)
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", timing.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+            route = route_template(scope)
+            record = {
+                "method": scope["method"],
+                "route": route,
+                "status": status_code,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+                "db_queries": stats.queries,
+                "db_ms": round(stats.db_seconds * 1000, 1),
+                "db_rows": stats.rows,
+            }
+            if n_plus_one.check(route, stats):
+                statement, repeats = stats.most_repeated()
+                record.update(n_plus_one=True, repeated_statement=statement, repeats=repeats)
+                log_event(logger, "http.request", logging.WARNING, **record)
+            else:
+                log_event(logger, "http.request", **record)
@@ -0,0 +1,183 @@
+# quiz_backend/app/utils/structured_logging.py
+#
+# Non-blocking structured logging.
+#
+# - Log calls never write to stdout on the event loop: the record is put on a
+#   bounded queue and a QueueListener thread formats and writes it. When the
+#   queue is full the record is dropped and counted (exported in /metrics)
+#   instead of making the request wait.
+# - Records carry the per-request context (request_id, user_id, quiz_id, ...).
+#   LogContextMiddleware starts a fresh context for each request and echoes the
+#   id in X-Request-ID; handlers and dependencies add to it with bind_log_context().
+# - log_event(logger, "event.name", **fields) logs a structured event. High
+#   volume events are sampled per name with LOG_SAMPLE_RATES, e.g.
+#   "http.request=0.1,ws.connect=0.01"; WARNING and above are never sampled.
+# - LOG_LEVEL sets the root level and LOG_LEVELS overrides single loggers, e.g.
+#   "app.sql=WARNING,uvicorn.access=WARNING". LOG_FORMAT is json (default) or text.
+
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))
+
+
+def _parse_pairs(value: str) -> Dict[str, str]:
+    pairs = {}
+    for item in value.split(","):
+        name, sep, setting = item.partition("=")
+        if sep and name.strip():
+            pairs[name.strip()] = setting.strip()
+    return pairs
+
+
+LOG_LEVELS = {name: level.upper() for name, level in _parse_pairs(os.getenv("LOG_LEVELS", "")).items()}
+LOG_SAMPLE_RATES = {name: float(rate) for name, rate in _parse_pairs(os.getenv("LOG_SAMPLE_RATES", "")).items()}
+
+_log_context: ContextVar[Dict[str, Any]] = ContextVar("log_context", default={})
+
+
+def bind_log_context(**fields):
+    """Adds fields to the current request's log context (None values are skipped)."""
+    _log_context.set({**_log_context.get(), **{k: v for k, v in fields.items() if v is not None}})
+
+
+def log_event(logger: logging.Logger, event: str, level: int = logging.INFO, exc_info=None, **fields):
+    """Logs a structured event, applying the per-event sample rate below WARNING."""
+    rate = LOG_SAMPLE_RATES.get(event, 1.0) if level < logging.WARNING else 1.0
+    if rate < 1.0:
+        if random.random() >= rate:
+            return
+        fields["sample_rate"] = rate
+    if logger.isEnabledFor(level):
+        logger.log(level, event, exc_info=exc_info, extra={"fields": fields})
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler that drops (and counts) records instead of blocking when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve everything that depends on the caller (message args, traceback,
+        # request context) here; formatting happens on the listener thread
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        record.context = _log_context.get()
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class StructuredFormatter(logging.Formatter):
+    def __init__(self, output: str = "json"):
+        super().__init__()
+        self.output = output
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        entry.update(getattr(record, "context", None) or {})
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+
+        if self.output == "json":
+            return json.dumps(entry, default=str)
+        extras = " ".join(f"{k}={v}" for k, v in entry.items() if k not in ("ts", "level", "logger", "msg", "exc"))
+        line = f"{entry['ts']} {entry['level']:<8} {entry['logger']}: {entry['msg']} {extras}".rstrip()
+        return f"{line}\n{record.exc_text}" if record.exc_text else line
+
+
+# shared handler instance; its queue is drained by the listener thread
+queue_handler = NonBlockingQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+_listener: Optional[QueueListener] = None
+
+
+def configure_logging():
+    """Routes the root and uvicorn loggers through the queue and applies the level settings."""
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(StructuredFormatter(LOG_FORMAT))
+    _listener = QueueListener(queue_handler.queue, stream_handler)
+    _listener.start()
+    atexit.register(stop_logging)
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(LOG_LEVEL)
+    # uvicorn installs its own stdout handlers (and doesn't propagate); send its
+    # error and access logs through the queue as well
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers = []
+        uvicorn_logger.propagate = True
+    for name, level in LOG_LEVELS.items():
+        logging.getLogger(name).setLevel(level)
+
+
+def stop_logging():
+    """Flushes queued records and stops the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+class LogContextMiddleware:
+    """Pure ASGI middleware: starts a fresh log context per request and sets X-Request-ID."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for key, value in scope.get("headers", ()):
+            if key == b"x-request-id":
+                request_id = value.decode("latin-1")[:64]
+                break
+        request_id = request_id or uuid.uuid4().hex
+        # No reset afterwards: each request runs in its own task (and context),
+        # and the exception handlers run after the middleware stack unwinds
+        _log_context.set({"request_id": request_id})
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                message = dict(message)
+                message["headers"] = list(message.get("headers", [])) + [(b"x-request-id", request_id.encode())]
+            await send(message)
+
+        await self.app(scope, receive, send_with_request_id)
@@ -0,0 +1,113 @@
+# quiz_backend/app/utils/timer_wheel.py
+#
+# Hierarchical timing wheel (one timer per key).
+#
+# - Time is counted in ticks. Level 0 has SLOTS buckets of one tick each, level 1
+#   SLOTS buckets of SLOTS ticks, and so on; with 64 slots, 4 levels and 100ms
+#   ticks it covers about 19 days, and later deadlines wait in an overflow bucket.
+# - A timer is placed on the lowest level whose bucket still lies ahead of the
+#   current tick. When the current tick enters a higher-level bucket, its timers
+#   are redistributed to the lower levels ("cascade"), so each timer moves at most
+#   LEVELS times before it fires.
+# - schedule(), cancel() and rescheduling are O(1) dict operations; advance()
+#   touches only the buckets the clock passes, not every pending timer, and
+#   jumps straight over spans where the lower levels are empty.
+#
+# The wheel has no clock or task of its own: the owner calls advance(now) on
+# its own schedule and gets back the keys that came due.
+
+import math
+from typing import Dict, Hashable, List, Tuple
+
+SLOT_BITS = 6
+SLOTS = 1 << SLOT_BITS
+SLOT_MASK = SLOTS - 1
+LEVELS = 4
+
+
+class TimerWheel:
+    def __init__(self, tick: float, now: float):
+        self.tick = tick
+        self._current = int(now / tick)
+        # bucket: key -> due tick
+        self._levels: List[List[Dict[Hashable, int]]] = [[{} for _ in range(SLOTS)] for _ in range(LEVELS)]
+        self._overflow: Dict[Hashable, int] = {}
+        self._counts = [0] * (LEVELS + 1)  # timers per level, overflow last
+        self._bucket_of: Dict[Hashable, Tuple[int, Dict[Hashable, int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._bucket_of)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._bucket_of
+
+    def schedule(self, key: Hashable, when: float):
+        """(Re)schedules `key` to come due at time `when` (same clock as advance)."""
+        self.cancel(key)
+        due = max(math.ceil(when / self.tick), self._current + 1)
+        self._place(key, due)
+
+    def cancel(self, key: Hashable):
+        placed = self._bucket_of.pop(key, None)
+        if placed is not None:
+            level, bucket = placed
+            del bucket[key]
+            self._counts[level] -= 1
+
+    def _place(self, key: Hashable, due: int):
+        # Lowest level whose higher digits match the current tick's
+        for level in range(LEVELS):
+            shift = SLOT_BITS * (level + 1)
+            if due >> shift == self._current >> shift:
+                bucket = self._levels[level][(due >> (SLOT_BITS * level)) & SLOT_MASK]
+                break
+        else:
+            level, bucket = LEVELS, self._overflow
+        bucket[key] = due
+        self._counts[level] += 1
+        self._bucket_of[key] = (level, bucket)
+
+    def _cascade(self, level: int, bucket: Dict[Hashable, int]):
+        entries = list(bucket.items())
+        bucket.clear()
+        self._counts[level] -= len(entries)
+        for key, due in entries:
+            self._place(key, due)
+
+    def advance(self, now: float) -> List[Hashable]:
+        """Moves the clock to `now` and returns the keys that came due, in due order."""
+        target = int(now / self.tick)
+        expired: List[Hashable] = []
+        if not self._bucket_of:
+            self._current = max(self._current, target)
+            return expired
+        while self._current < target:
+            # Nothing can happen before the next bucket boundary of the lowest occupied level
+            lowest = next(level for level, count in enumerate(self._counts) if count)
+            if lowest:
+                shift = SLOT_BITS * lowest
+                boundary = ((self._current >> shift) + 1) << shift
+                if boundary > target:
+                    self._current = target
+                    break
+                self._current = boundary
+            else:
+                self._current += 1
+            current = self._current
+            if current & ((1 << (SLOT_BITS * LEVELS)) - 1) == 0 and self._overflow:
+                self._cascade(LEVELS, self._overflow)
+            # Top-down, so timers cascaded from level 2 can move on from level 1 this tick
+            for level in range(LEVELS - 1, 0, -1):
+                if current & ((1 << (SLOT_BITS * level)) - 1) == 0:
+                    self._cascade(level, self._levels[level][(current >> (SLOT_BITS * level)) & SLOT_MASK])
+            bucket = self._levels[0][current & SLOT_MASK]
+            if bucket:
+                for key in bucket:
+                    del self._bucket_of[key]
+                self._counts[0] -= len(bucket)
+                expired.extend(bucket)
+                bucket.clear()
+            if not self._bucket_of:
+                self._current = target
+                break
+        return expired
@@ -1,26 +1,44 @@
 
 from fastapi import WebSocket
 from typing import List
+import logging
+
+from .structured_logging import log_event
+
+logger = logging.getLogger("app.websocket")
 
 class ConnectionManager:
     def __init__(self):
         self.active_connections: List[WebSocket] = []
+        self.pending_sends = 0  # messages handed to send_text but not yet written (exported in /metrics)
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
         self.active_connections.append(websocket)
-        print(f"New connection: {len(self.active_connections)} total clients")
+        log_event(logger, "ws.connect", clients=len(self.active_connections))
 
     def disconnect(self, websocket: WebSocket):
         self.active_connections.remove(websocket)
-        print(f"Disconnected: {len(self.active_connections)} clients left")
+        log_event(logger, "ws.disconnect", clients=len(self.active_connections))
 
     async def send_personal_message(self, message: str, websocket: WebSocket):
-        await websocket.send_text(message)
+        self.pending_sends += 1
+        try:
+            await websocket.send_text(message)
+        finally:
+            self.pending_sends -= 1
 
     async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            await connection.send_text(message)
+        connections = list(self.active_connections)
+        remaining = len(connections)
+        self.pending_sends += remaining
+        try:
+            for connection in connections:
+                await connection.send_text(message)
+                remaining -= 1
+                self.pending_sends -= 1
+        finally:
+            self.pending_sends -= remaining
 
 # you can create a single manager instance to share in your routers:
 manager = ConnectionManager()
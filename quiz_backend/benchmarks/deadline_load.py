@@ -0,0 +1,313 @@
+# quiz_backend/benchmarks/deadline_load.py
+#
+# Quiz-deadline load test.
+#
+# Reproduces the deadline spike with scripted user journeys:
+# - takers log in, start an attempt (POST /submissions/start/{id}), fetch the
+#   quiz, and submit at a random moment inside the submit window;
+# - watchers log in and poll the leaderboard until every taker has finished.
+#
+# The app is driven in-process through httpx.ASGITransport (it uses the
+# DATABASE_URL from the environment), or over a socket with --base-url.
+# Latency p50/p95/p99, throughput and errors are reported per endpoint and
+# written as JSON; --compare prints the change against an earlier run.
+#
+# Users are <prefix><i>@<domain> with a shared password; --signup creates the
+# missing ones first (or seed them with the dataset generator).
+#
+# Usage (from quiz_backend/):
+#   python -m benchmarks.deadline_load --quiz-id 1 --takers 200 --watchers 20 --signup
+#   python -m benchmarks.deadline_load --quiz-id 1 --base-url http://localhost:8000 \
+#       --compare benchmarks/results/deadline-20261019T120000.json
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+MAX_THROTTLE_RETRIES = 3
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        self.throttled: Dict[str, int] = defaultdict(int)
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+
+    async def request(self, client: httpx.AsyncClient, endpoint: str, method: str, url: str, **kwargs) -> httpx.Response:
+        """Sends a request timed under `endpoint`, retrying 429s after Retry-After like a real client."""
+        for attempt in range(MAX_THROTTLE_RETRIES + 1):
+            started = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            self.latencies[endpoint].append(time.perf_counter() - started)
+            self.statuses[endpoint][response.status_code] += 1
+            if response.status_code != 429 or attempt == MAX_THROTTLE_RETRIES:
+                return response
+            self.throttled[endpoint] += 1
+            await asyncio.sleep(float(response.headers.get("retry-after", 1)))
+        return response
+
+    def report(self) -> dict:
+        duration = (self.finished or time.perf_counter()) - self.started
+        endpoints = {}
+        for endpoint, samples in sorted(self.latencies.items()):
+            ordered = sorted(samples)
+            statuses = self.statuses[endpoint]
+            endpoints[endpoint] = {
+                "requests": len(ordered),
+                "throughput_rps": round(len(ordered) / duration, 2) if duration else None,
+                "p50_ms": _percentile_ms(ordered, 50),
+                "p95_ms": _percentile_ms(ordered, 95),
+                "p99_ms": _percentile_ms(ordered, 99),
+                "max_ms": round(ordered[-1] * 1000, 2),
+                "errors": sum(count for status, count in statuses.items() if status >= 400),
+                "throttled": self.throttled[endpoint],
+                "statuses": {str(status): count for status, count in sorted(statuses.items())},
+            }
+        return {"duration_seconds": round(duration, 2), "endpoints": endpoints}
+
+
+def _percentile_ms(ordered: List[float], pct: float) -> float:
+    # nearest-rank percentile
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return round(ordered[index] * 1000, 2)
+
+
+@dataclass
+class VirtualUser:
+    index: int
+    email: str
+    client: httpx.AsyncClient
+    recorder: Recorder
+    token: Optional[str] = None
+    state: dict = field(default_factory=dict)
+
+    @property
+    def headers(self) -> dict:
+        return {"Authorization": f"Bearer {self.token}"}
+
+
+@dataclass
+class Scenario:
+    args: argparse.Namespace
+    takers_done: asyncio.Event = field(default_factory=asyncio.Event)
+    takers_remaining: int = 0
+
+
+# Journey steps -------------------------------------------------------------
+
+async def signup(user: VirtualUser, scenario: Scenario):
+    await user.recorder.request(user.client, "POST /auth/signup", "POST", "/auth/signup", json={
+        "email": user.email,
+        "full_name": f"Load Test {user.index}",
+        "employee_id": f"{scenario.args.user_prefix.upper()}{user.index:06d}",
+        "password": scenario.args.password,
+    })
+
+
+async def login(user: VirtualUser, scenario: Scenario):
+    response = await user.recorder.request(
+        user.client, "POST /auth/login", "POST", "/auth/login",
+        data={"username": user.email, "password": scenario.args.password},
+    )
+    if response.status_code == 200:
+        user.token = response.json()["access_token"]
+
+
+async def start_attempt(user: VirtualUser, scenario: Scenario):
+    await asyncio.sleep(random.uniform(0, scenario.args.start_window))
+    response = await user.recorder.request(
+        user.client, "POST /submissions/start/{quiz_id}", "POST",
+        f"/submissions/start/{scenario.args.quiz_id}", headers=user.headers,
+    )
+    if response.status_code == 201:
+        body = response.json()
+        user.state.update(submission_id=body["submission_id"], started_at=body["started_at"])
+
+
+async def fetch_quiz(user: VirtualUser, scenario: Scenario):
+    response = await user.recorder.request(
+        user.client, "GET /quizzes/{quiz_id}", "GET", f"/quizzes/{scenario.args.quiz_id}", headers=user.headers,
+    )
+    if response.status_code == 200:
+        user.state["questions"] = response.json().get("questions", [])
+
+
+async def submit(user: VirtualUser, scenario: Scenario):
+    # Everyone submits inside the window that ends at the deadline
+    await asyncio.sleep(random.uniform(0, scenario.args.submit_window))
+    questions = user.state.get("questions", [])
+    answers, correct = {}, 0
+    for index, question in enumerate(questions):
+        if random.random() < 0.9:
+            choice = random.randint(1, max(len(question.get("options") or []), 1))
+            answers[str(index)] = choice
+            correct += int(choice == question.get("correct"))
+    await user.recorder.request(
+        user.client, "POST /quizzes/{quiz_id}/submit", "POST", f"/quizzes/{scenario.args.quiz_id}/submit",
+        headers=user.headers,
+        json={
+            "submission_id": user.state["submission_id"],
+            "answers": answers,
+            "score": int(correct * 100 / len(questions) + 0.5) if questions else 0,  # percentage, as the app stores it
+            "correct_count": correct,
+            "incorrect_count": len(answers) - correct,
+            "not_attempted_count": len(questions) - len(answers),
+            "time_taken": scenario.args.submit_window,
+            "started_at": user.state["started_at"],
+        },
+    )
+
+
+async def poll_leaderboard(user: VirtualUser, scenario: Scenario):
+    while not scenario.takers_done.is_set():
+        await user.recorder.request(
+            user.client, "GET /quizzes/{quiz_id}/leaderboard", "GET",
+            f"/quizzes/{scenario.args.quiz_id}/leaderboard", headers=user.headers,
+        )
+        try:
+            await asyncio.wait_for(scenario.takers_done.wait(), timeout=scenario.args.poll_interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+Step = Callable[[VirtualUser, Scenario], Awaitable[None]]
+
+# Scripted journeys: each step runs only if the previous ones left the user able to continue
+JOURNEYS: Dict[str, List[Step]] = {
+    "taker": [login, start_attempt, fetch_quiz, submit],
+    "watcher": [login, poll_leaderboard],
+}
+
+STEP_REQUIREMENTS = {
+    start_attempt: lambda user: user.token,
+    fetch_quiz: lambda user: user.token,
+    submit: lambda user: user.state.get("submission_id"),
+    poll_leaderboard: lambda user: user.token,
+}
+
+
+async def run_journey(name: str, user: VirtualUser, scenario: Scenario):
+    try:
+        for step in JOURNEYS[name]:
+            requirement = STEP_REQUIREMENTS.get(step)
+            if requirement and not requirement(user):
+                break
+            await step(user, scenario)
+    finally:
+        if name == "taker":
+            scenario.takers_remaining -= 1
+            if scenario.takers_remaining == 0:
+                scenario.takers_done.set()
+
+
+def _make_client(args) -> httpx.AsyncClient:
+    limits = httpx.Limits(max_connections=args.max_connections, max_keepalive_connections=args.max_connections)
+    if args.base_url:
+        return httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits)
+    from app.main import app
+    transport = httpx.ASGITransport(app=app)
+    return httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=args.timeout, limits=limits)
+
+
+async def run(args) -> dict:
+    recorder = Recorder()
+    scenario = Scenario(args=args, takers_remaining=args.takers)
+    if args.takers == 0:
+        scenario.takers_done.set()
+
+    async with _make_client(args) as client:
+        users = [
+            VirtualUser(i, f"{args.user_prefix}{i}@{args.user_domain}", client, recorder)
+            for i in range(args.takers + args.watchers)
+        ]
+        if args.signup:
+            setup = Recorder()
+            for i in range(0, len(users), 50):
+                await asyncio.gather(*(signup(VirtualUser(u.index, u.email, client, setup), scenario) for u in users[i:i + 50]))
+
+        recorder.started = time.perf_counter()
+        await asyncio.gather(*(
+            run_journey("taker" if user.index < args.takers else "watcher", user, scenario)
+            for user in users
+        ))
+        recorder.finished = time.perf_counter()
+
+    return {
+        "scenario": "quiz-deadline",
+        "captured_at": datetime.now(timezone.utc).isoformat(),
+        "target": args.base_url or "in-process (httpx.ASGITransport)",
+        "config": {
+            key: getattr(args, key)
+            for key in ("quiz_id", "takers", "watchers", "start_window", "submit_window", "poll_interval", "max_connections")
+        },
+        **recorder.report(),
+    }
+
+
+def print_report(result: dict, baseline: Optional[dict] = None):
+    print(f"{result['scenario']} against {result['target']}: {result['duration_seconds']}s")
+    header = f"{'endpoint':42} {'reqs':>6} {'rps':>8} {'p50':>9} {'p95':>9} {'p99':>9} {'errors':>7} {'429s':>5}"
+    print(header)
+    for endpoint, stats in result["endpoints"].items():
+        line = (
+            f"{endpoint:42} {stats['requests']:>6} {stats['throughput_rps']:>8} {stats['p50_ms']:>9} "
+            f"{stats['p95_ms']:>9} {stats['p99_ms']:>9} {stats['errors']:>7} {stats['throttled']:>5}"
+        )
+        previous = (baseline or {}).get("endpoints", {}).get(endpoint)
+        if previous:
+            deltas = [
+                f"{key[:3]} {100 * (stats[key] - previous[key]) / previous[key]:+.0f}%"
+                for key in ("p50_ms", "p95_ms", "p99_ms") if previous[key]
+            ]
+            line += "   vs baseline: " + ", ".join(deltas)
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quiz-deadline load test")
+    parser.add_argument("--quiz-id", type=int, required=True)
+    parser.add_argument("--takers", type=int, default=100, help="users who start and submit the quiz")
+    parser.add_argument("--watchers", type=int, default=10, help="users polling the leaderboard")
+    parser.add_argument("--start-window", type=float, default=10.0, help="seconds over which attempts are started")
+    parser.add_argument("--submit-window", type=float, default=60.0, help="seconds before the deadline in which everyone submits")
+    parser.add_argument("--poll-interval", type=float, default=2.0, help="leaderboard poll interval for watchers")
+    parser.add_argument("--user-prefix", default="loadtest")
+    parser.add_argument("--user-domain", default="example.com")
+    parser.add_argument("--password", default="loadtest-password")
+    parser.add_argument("--signup", action="store_true", help="create the users via /auth/signup first")
+    parser.add_argument("--base-url", default=None, help="run over a socket against a running server instead of in-process")
+    parser.add_argument("--max-connections", type=int, default=100)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--out", default=None, help="result JSON path (default: benchmarks/results/deadline-<timestamp>.json)")
+    parser.add_argument("--compare", default=None, help="earlier result JSON to compare against")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+
+    out = args.out or os.path.join(RESULTS_DIR, f"deadline-{datetime.now(timezone.utc):%Y%m%dT%H%M%S}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(result, f, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(result, baseline)
+    print(f"results written to {out}")
+
+
+if __name__ == "__main__":
+    main()
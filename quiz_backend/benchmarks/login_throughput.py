@@ -0,0 +1,82 @@
+# quiz_backend/benchmarks/login_throughput.py
+#
+# Login throughput benchmark for password verification.
+#
+# Simulates a burst of concurrent logins and compares verifying bcrypt hashes
+# inline on the event loop (the old behaviour) with the off-loop hashing pool
+# in app.utils.auth. A heartbeat coroutine measures event-loop lag meanwhile,
+# i.e. how long every other request (e.g. submissions) would be stalled.
+#
+# Usage (from quiz_backend/):
+#   python -m benchmarks.login_throughput --logins 64 --rounds 10
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+
+async def _heartbeat(stop: asyncio.Event, lags: list, interval: float = 0.005):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, loop.time() - expected))
+
+
+async def _run(mode: str, logins: int, password: str, hashed: str) -> dict:
+    from app.utils import auth
+
+    async def login_inline():
+        return auth.pwd_context.verify_and_update(password, hashed)
+
+    async def login_offloop():
+        return await auth.verify_and_update_password_async(password, hashed)
+
+    login = login_inline if mode == "inline" else login_offloop
+    stop = asyncio.Event()
+    lags: list = []
+    heartbeat = asyncio.create_task(_heartbeat(stop, lags))
+    await asyncio.sleep(0.02)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await heartbeat
+    assert all(valid for valid, _ in results)
+    lags_ms = sorted(1000 * lag for lag in lags) or [0.0]
+    return {
+        "mode": mode,
+        "logins": logins,
+        "seconds": round(elapsed, 3),
+        "logins_per_second": round(logins / elapsed, 1),
+        "loop_lag_p50_ms": round(statistics.median(lags_ms), 2),
+        "loop_lag_max_ms": round(lags_ms[-1], 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Login throughput: inline bcrypt vs. the off-loop hashing pool")
+    parser.add_argument("--logins", type=int, default=64, help="concurrent logins in the burst")
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost factor")
+    parser.add_argument("--workers", type=int, default=None, help="HASH_MAX_CONCURRENCY override")
+    args = parser.parse_args()
+
+    os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+    if args.workers:
+        os.environ["HASH_MAX_CONCURRENCY"] = str(args.workers)
+
+    from app.utils import auth
+    password = "correct horse battery staple"
+    hashed = auth.pwd_context.hash(password)
+
+    for mode in ("inline", "offloop"):
+        result = asyncio.run(_run(mode, args.logins, password, hashed))
+        print(" ".join(f"{key}={value}" for key, value in result.items()))
+
+
+if __name__ == "__main__":
+    main()
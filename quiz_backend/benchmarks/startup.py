@@ -0,0 +1,119 @@
+# quiz_backend/benchmarks/startup.py
+#
+# Cold-start benchmark: how long a fresh worker takes to import app.main.
+#
+# Every run is a new interpreter, so nothing is warm except the OS file cache.
+# Reported:
+#   - median / min / max wall time of `import app.main` over --runs processes
+#   - the slowest imports by cumulative time (one extra run under -X importtime),
+#     for app modules and for third-party top-level packages
+#   - heavy modules that must not be loaded at startup (--forbid)
+#
+# Exits 1 when the median is over the budget (--budget-ms, STARTUP_BUDGET_MS)
+# or a forbidden module was imported, so it can gate CI.
+#
+# Usage (from quiz_backend/, with the app's environment variables set):
+#   python -m benchmarks.startup
+#   python -m benchmarks.startup --runs 10 --budget-ms 1200 --top 25
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+APP_MODULE = "app.main"
+DEFAULT_FORBIDDEN = ("pandas", "numpy", "fastapi_mail", "openpyxl", "xlsxwriter")
+
+# Child process: time the import and report which forbidden modules got loaded
+TIMING_SNIPPET = """
+import sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+loaded = [name for name in {forbidden!r} if name in sys.modules]
+print(f"{{elapsed * 1000:.1f}}|{{','.join(loaded)}}")
+"""
+
+
+def time_import(module: str, forbidden) -> tuple:
+    snippet = TIMING_SNIPPET.format(module=module, forbidden=tuple(forbidden))
+    out = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", snippet],
+        capture_output=True, text=True, check=True,
+    ).stdout.strip().splitlines()[-1]
+    elapsed, loaded = out.split("|")
+    return float(elapsed), [name for name in loaded.split(",") if name]
+
+
+def import_profile(module: str) -> list:
+    """(cumulative_ms, self_ms, module) for every import, from -X importtime."""
+    stderr = subprocess.run(
+        [sys.executable, "-W", "ignore", "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True,
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        if not self_us.isdigit():
+            continue  # header line
+        rows.append((int(cumulative_us) / 1000, int(self_us) / 1000, name))
+    return rows
+
+
+def top_imports(rows: list, top: int) -> tuple:
+    # An import nested under another one is already counted in its parent's
+    # cumulative time; keep the largest entry per top-level package
+    packages = {}
+    for cumulative, _, name in rows:
+        package = name.split(".")[0]
+        if package != "app" and cumulative > packages.get(package, 0):
+            packages[package] = cumulative
+    app_modules = sorted({n: (c, s, n) for c, s, n in sorted(rows) if n.startswith("app.")}.values(), reverse=True)
+    return (
+        sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top],
+        app_modules[:top],
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start import benchmark")
+    parser.add_argument("--module", default=APP_MODULE)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("STARTUP_BUDGET_MS", 1500)))
+    parser.add_argument("--forbid", nargs="*", default=list(DEFAULT_FORBIDDEN),
+                        help="modules that must not be imported at startup")
+    args = parser.parse_args()
+
+    timings, loaded = [], set()
+    for _ in range(args.runs):
+        elapsed, forbidden_loaded = time_import(args.module, args.forbid)
+        timings.append(elapsed)
+        loaded.update(forbidden_loaded)
+
+    packages, app_modules = top_imports(import_profile(args.module), args.top)
+
+    print(f"import {args.module}: median {statistics.median(timings):.0f} ms "
+          f"(min {min(timings):.0f}, max {max(timings):.0f}, {args.runs} runs)")
+    print("\nslowest third-party packages (cumulative ms, under -X importtime):")
+    for package, cumulative in packages:
+        print(f"  {cumulative:8.1f}  {package}")
+    print("\nslowest app modules (cumulative / self ms):")
+    for cumulative, self_ms, name in app_modules:
+        print(f"  {cumulative:8.1f} {self_ms:8.1f}  {name}")
+
+    failed = False
+    if statistics.median(timings) > args.budget_ms:
+        print(f"\nFAIL: median import time is over the {args.budget_ms:.0f} ms budget")
+        failed = True
+    if loaded:
+        print(f"\nFAIL: loaded at startup, should be imported on first use: {', '.join(sorted(loaded))}")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
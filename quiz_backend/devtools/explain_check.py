@@ -0,0 +1,155 @@
+# quiz_backend/devtools/explain_check.py
+#
+# Query-plan regression check for the hot queries.
+#
+# Runs EXPLAIN (FORMAT JSON) for each query against DATABASE_URL and fails if
+# the expected index is not used or a listed table is read with a Seq Scan.
+# Sequential scans are disabled for the check (SET LOCAL enable_seqscan = off)
+# so small dev/CI tables give the same answer as production: a Seq Scan then
+# means no usable index exists. Nothing is written; the transaction is rolled back.
+#
+# Usage (from quiz_backend/, after `alembic upgrade head`):
+#   python -m devtools.explain_check            # exit code 1 on regressions
+#   python -m devtools.explain_check --verbose  # also print the plans
+
+import asyncio
+import json
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import List
+
+from sqlalchemy import delete, exists, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+
+@dataclass
+class HotQuery:
+    name: str
+    statement: object
+    expected_index: str
+    no_seq_scan_on: List[str] = field(default_factory=list)
+
+
+def hot_queries() -> List[HotQuery]:
+    from app.models import QuizAccess, Quiz, RevokedToken, Submission, User
+
+    quiz_id, user_id = 1, 1
+    has_submission = (
+        exists()
+        .where(Submission.quiz_id == QuizAccess.quiz_id)
+        .where(Submission.user_id == QuizAccess.user_id)
+    )
+    return [
+        HotQuery(
+            "leaderboard",
+            select(Submission, User)
+            .join(User, Submission.user_id == User.id)
+            .where(Submission.quiz_id == quiz_id)
+            .order_by(Submission.score.desc(), Submission.time_taken.asc())
+            .limit(50),
+            "ix_submissions_quiz_leaderboard",
+            ["submissions", "users"],
+        ),
+        HotQuery(
+            "attempt_lookup",
+            select(Submission).where(Submission.quiz_id == quiz_id, Submission.user_id == user_id),
+            "ix_submissions_user_quiz",
+            ["submissions"],
+        ),
+        HotQuery(
+            "my_submissions",
+            select(Submission).where(Submission.user_id == user_id),
+            "ix_submissions_user_quiz",
+            ["submissions"],
+        ),
+        HotQuery(
+            "assigned_quizzes",
+            select(Quiz)
+            .join(QuizAccess, QuizAccess.quiz_id == Quiz.id)
+            .where(Quiz.is_active == True)
+            .where(QuizAccess.user_id == user_id),
+            "uq_quiz_access_user_quiz",
+            ["quiz_access"],
+        ),
+        HotQuery(
+            "quiz_status_pending",
+            select(User.id, User.full_name, User.email)
+            .join(QuizAccess, QuizAccess.user_id == User.id)
+            .where(QuizAccess.quiz_id == quiz_id)
+            .where(~has_submission)
+            .order_by(User.full_name)
+            .limit(100),
+            "ix_quiz_access_quiz_user",
+            ["quiz_access", "submissions"],
+        ),
+        HotQuery(
+            "login_by_email",
+            select(User).where(User.email == "someone@example.com"),
+            "users_email_key",
+            ["users"],
+        ),
+        HotQuery(
+            "revocation_lookup",
+            select(RevokedToken.jti, RevokedToken.expires_at).where(RevokedToken.jti.in_(["a", "family:b"])),
+            "revoked_tokens_pkey",
+            ["revoked_tokens"],
+        ),
+        HotQuery(
+            "revocation_purge",
+            delete(RevokedToken).where(RevokedToken.expires_at < datetime.now(timezone.utc)),
+            "ix_revoked_tokens_expires_at",
+            ["revoked_tokens"],
+        ),
+    ]
+
+
+def _plan_nodes(node: dict):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+def check_plan(query: HotQuery, plan: dict) -> List[str]:
+    nodes = list(_plan_nodes(plan["Plan"]))
+    problems = []
+    if not any(n.get("Index Name") == query.expected_index for n in nodes):
+        problems.append(f"expected index {query.expected_index} is not used")
+    for n in nodes:
+        if n["Node Type"] == "Seq Scan" and n.get("Relation Name") in query.no_seq_scan_on:
+            problems.append(f"Seq Scan on {n['Relation Name']}")
+    return problems
+
+
+async def run(verbose: bool = False) -> int:
+    from app.config import DATABASE_URL
+
+    engine = create_async_engine(DATABASE_URL, poolclass=NullPool)
+    failures = 0
+    try:
+        async with engine.connect() as conn:
+            for query in hot_queries():
+                sql = query.statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+                transaction = await conn.begin()
+                try:
+                    await conn.execute(text("SET LOCAL enable_seqscan = off"))
+                    result = await conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+                    plan = result.scalar()
+                finally:
+                    await transaction.rollback()
+                plan = (json.loads(plan) if isinstance(plan, str) else plan)[0]
+
+                problems = check_plan(query, plan)
+                failures += bool(problems)
+                print(f"{'FAIL' if problems else 'ok  '} {query.name}" + (f": {'; '.join(problems)}" if problems else ""))
+                if verbose or problems:
+                    print(json.dumps(plan["Plan"], indent=2))
+    finally:
+        await engine.dispose()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(run(verbose="--verbose" in sys.argv)))
@@ -0,0 +1,295 @@
+# quiz_backend/devtools/generate_dataset.py
+#
+# Deterministic synthetic dataset generator with bulk loading.
+#
+# Generates users, groups and memberships, quizzes with 50-300 questions,
+# group assignments, quiz_access rows, submissions with answer maps and some
+# feedback, matching app.models, and loads them with asyncpg COPY. The same
+# --seed and --scale always produce the same rows; each table (and each quiz's
+# answers) has its own random stream, so changing one size does not reshuffle
+# the others.
+#
+# Answers follow a simple ability/difficulty model (P(correct) =
+# sigmoid(ability - difficulty)), so item statistics and leaderboards look
+# like real data rather than uniform noise.
+#
+# Scale 1.0 is roughly 50k users, 500 quizzes, 1.5M quiz_access rows and
+# 1M submissions. Every user's password is --password; the first --admins
+# users are admins. Emails are <prefix><i>@example.com, which the
+# deadline load test can log in as (--user-prefix user).
+#
+# Usage (from quiz_backend/, against DATABASE_URL with the schema created):
+#   python -m devtools.generate_dataset --scale 0.1 --truncate
+#   python -m devtools.generate_dataset --scale 1 --seed 7 --truncate
+
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Iterator, List, Sequence
+
+import numpy as np
+
+COPY_BATCH_SIZE = 20_000
+BASE_TIME = datetime(2026, 1, 5, 9, 0, tzinfo=timezone.utc)
+
+# table -> columns loaded, in load order (children after parents)
+TABLES = {
+    "users": ["id", "employee_id", "full_name", "email", "password_hash", "is_admin"],
+    "groups": ["id", "name", "created_at"],
+    "group_members": ["id", "group_id", "user_id"],
+    "quizzes": ["id", "title", "description", "time_limit", "is_active", "active_till", "created_at",
+                "questions_json", "manual_override_quiz_active"],
+    "quiz_groups": ["id", "quiz_id", "group_id"],
+    "quiz_access": ["id", "user_id", "quiz_id"],
+    "submissions": ["id", "user_id", "quiz_id", "score", "correct_count", "incorrect_count",
+                    "not_attempted_count", "time_taken", "submitted_at", "started_at", "answers"],
+    "feedbacks": ["id", "quiz_id", "user_id", "feedback_text"],
+}
+
+TOPICS = ["Security", "Compliance", "Product", "Onboarding", "Safety", "Finance", "Privacy", "Engineering"]
+
+
+class Dataset:
+    def __init__(self, scale: float, seed: int, password_hash: str, admins: int, email_prefix: str,
+                 attempt_rate: float, feedback_rate: float):
+        self.seed = seed
+        self.password_hash = password_hash
+        self.admins = admins
+        self.email_prefix = email_prefix
+        self.attempt_rate = attempt_rate
+        self.feedback_rate = feedback_rate
+
+        self.n_users = max(1, round(50_000 * scale))
+        self.n_groups = max(1, round(200 * scale))
+        self.n_quizzes = max(1, round(500 * scale))
+
+        self.abilities = self.rng("abilities").normal(0.0, 1.0, self.n_users)
+        self.group_members = self._assign_group_members()
+        self.quiz_questions = self.rng("question_counts").integers(50, 301, self.n_quizzes)
+        self.quiz_groups = self._assign_quiz_groups()
+
+    def rng(self, *stream) -> np.random.Generator:
+        # independent, reproducible stream per table / per quiz
+        return np.random.default_rng([self.seed] + [hash_name(s) for s in stream])
+
+    def _assign_group_members(self) -> List[np.ndarray]:
+        rng = self.rng("group_members")
+        per_user = rng.integers(1, 4, self.n_users)  # 1-3 groups each
+        user_ids = np.repeat(np.arange(1, self.n_users + 1), per_user)
+        group_ids = rng.integers(0, self.n_groups, user_ids.size)
+        members = [np.unique(user_ids[group_ids == g]) for g in range(self.n_groups)]
+        return members
+
+    def _assign_quiz_groups(self) -> List[np.ndarray]:
+        rng = self.rng("quiz_groups")
+        groups_per_quiz = min(self.n_groups, 10)
+        return [
+            rng.choice(self.n_groups, size=rng.integers(min(2, groups_per_quiz), groups_per_quiz + 1), replace=False)
+            for _ in range(self.n_quizzes)
+        ]
+
+    # table generators ------------------------------------------------------
+
+    def users(self) -> Iterator[tuple]:
+        for i in range(1, self.n_users + 1):
+            yield (i, f"EMP{i:07d}", f"Synthetic User {i}", f"{self.email_prefix}{i}@example.com",
+                   self.password_hash, i <= self.admins)
+
+    def groups(self) -> Iterator[tuple]:
+        for g in range(self.n_groups):
+            yield (g + 1, f"{TOPICS[g % len(TOPICS)]} cohort {g + 1}", BASE_TIME - timedelta(days=30))
+
+    def group_members_rows(self) -> Iterator[tuple]:
+        row_id = 0
+        for g, members in enumerate(self.group_members):
+            for user_id in members.tolist():
+                row_id += 1
+                yield (row_id, g + 1, user_id)
+
+    def questions(self, quiz_index: int) -> List[dict]:
+        rng = self.rng("questions", quiz_index)
+        n = int(self.quiz_questions[quiz_index])
+        correct = rng.integers(1, 5, n)
+        time_limits = rng.choice([20, 30, 45, 60], n)
+        return [
+            {
+                "question": f"Q{q + 1}. Which statement about {TOPICS[(quiz_index + q) % len(TOPICS)].lower()} item {q + 1} is correct?",
+                "options": [f"Statement {chr(65 + k)}" for k in range(4)],
+                "correct": int(correct[q]),
+                "time_limit": int(time_limits[q]),
+            }
+            for q in range(n)
+        ]
+
+    def quizzes(self) -> Iterator[tuple]:
+        for k in range(self.n_quizzes):
+            created = BASE_TIME + timedelta(days=k % 90)
+            active_till = (created + timedelta(days=30)).replace(tzinfo=None)  # column is timezone-naive
+            yield (k + 1, f"{TOPICS[k % len(TOPICS)]} quiz {k + 1}", "Synthetic benchmark quiz", 30, True,
+                   active_till, created, json.dumps(self.questions(k)), False)
+
+    def quiz_groups_rows(self) -> Iterator[tuple]:
+        row_id = 0
+        for k, groups in enumerate(self.quiz_groups):
+            for g in sorted(groups.tolist()):
+                row_id += 1
+                yield (row_id, k + 1, g + 1)
+
+    def assigned_users(self, quiz_index: int) -> np.ndarray:
+        return np.unique(np.concatenate([self.group_members[g] for g in self.quiz_groups[quiz_index]]))
+
+    def quiz_access_rows(self) -> Iterator[tuple]:
+        row_id = 0
+        for k in range(self.n_quizzes):
+            for user_id in self.assigned_users(k).tolist():
+                row_id += 1
+                yield (row_id, user_id, k + 1)
+
+    def submissions_rows(self) -> Iterator[tuple]:
+        row_id = 0
+        for k in range(self.n_quizzes):
+            rng = self.rng("submissions", k)
+            questions = self.questions(k)
+            n_q = len(questions)
+            assigned = self.assigned_users(k)
+            takers = assigned[rng.random(assigned.size) < self.attempt_rate]
+            if not takers.size:
+                continue
+
+            correct = np.array([q["correct"] for q in questions], dtype=np.int8)
+            difficulty = rng.normal(0.0, 1.0, n_q)
+            p_correct = 1.0 / (1.0 + np.exp(-(self.abilities[takers - 1][:, None] - difficulty[None, :])))
+            is_correct = rng.random((takers.size, n_q)) < p_correct
+            # wrong answers pick one of the three other options
+            wrong = (correct[None, :] - 1 + rng.integers(1, 4, (takers.size, n_q))) % 4 + 1
+            responses = np.where(is_correct, correct[None, :], wrong).astype(np.int8)
+            responses[rng.random((takers.size, n_q)) < 0.05] = 0  # not answered
+
+            correct_counts = (responses == correct[None, :]).sum(axis=1)
+            answered_counts = (responses != 0).sum(axis=1)
+            durations = rng.uniform(0.3, 1.0, takers.size) * n_q * 30
+            offsets = rng.uniform(0, 7 * 86400, takers.size)
+            keys = [f'"{q}":' for q in range(n_q)]
+
+            for t, user_id in enumerate(takers.tolist()):
+                row = responses[t].tolist()
+                answers = "{" + ",".join([key + str(v) for key, v in zip(keys, row) if v]) + "}"
+                started = BASE_TIME + timedelta(days=k % 90, seconds=float(offsets[t]))
+                n_correct = int(correct_counts[t])
+                # Stored like the app does: percentage rounded half up (Math.round)
+                score = int(n_correct * 100 / n_q + 0.5)
+                row_id += 1
+                yield (row_id, user_id, k + 1, score, n_correct, int(answered_counts[t]) - n_correct,
+                       n_q - int(answered_counts[t]), float(durations[t]),
+                       started + timedelta(seconds=float(durations[t])), started, answers)
+
+    def feedbacks_rows(self) -> Iterator[tuple]:
+        rng = self.rng("feedbacks")
+        row_id = 0
+        for k in range(self.n_quizzes):
+            assigned = self.assigned_users(k)
+            for user_id in assigned[rng.random(assigned.size) < self.feedback_rate].tolist():
+                row_id += 1
+                yield (row_id, k + 1, user_id, f"Synthetic feedback {row_id}: the quiz was {'clear' if row_id % 3 else 'too long'}.")
+
+    def rows(self, table: str) -> Iterator[tuple]:
+        return {
+            "users": self.users,
+            "groups": self.groups,
+            "group_members": self.group_members_rows,
+            "quizzes": self.quizzes,
+            "quiz_groups": self.quiz_groups_rows,
+            "quiz_access": self.quiz_access_rows,
+            "submissions": self.submissions_rows,
+            "feedbacks": self.feedbacks_rows,
+        }[table]()
+
+
+def hash_name(value) -> int:
+    # stable across processes (built-in hash() of str is salted)
+    if isinstance(value, int):
+        return value
+    return int.from_bytes(hashlib.sha1(str(value).encode()).digest()[:8], "little")
+
+
+def _batches(rows: Iterable[tuple], size: int) -> Iterator[List[tuple]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _asyncpg_dsn(url: str) -> str:
+    return url.replace("postgresql+asyncpg://", "postgresql://", 1)
+
+
+async def load(dataset: Dataset, dsn: str, tables: Sequence[str], truncate: bool):
+    import asyncpg
+
+    conn = await asyncpg.connect(dsn)
+    try:
+        async with conn.transaction():
+            if truncate:
+                await conn.execute(f"TRUNCATE {', '.join(reversed(tables))} RESTART IDENTITY CASCADE")
+            else:
+                for table in tables:
+                    if await conn.fetchval(f"SELECT EXISTS (SELECT 1 FROM {table})"):
+                        raise SystemExit(f"{table} is not empty; rerun with --truncate to replace its contents")
+
+            for table in tables:
+                started = time.perf_counter()
+                loaded = 0
+                for batch in _batches(dataset.rows(table), COPY_BATCH_SIZE):
+                    await conn.copy_records_to_table(table, records=batch, columns=TABLES[table])
+                    loaded += len(batch)
+                # keep SERIAL sequences ahead of the explicit ids
+                await conn.execute(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), GREATEST((SELECT MAX(id) FROM {table}), 1))"
+                )
+                elapsed = time.perf_counter() - started
+                print(f"{table:14} {loaded:>10} rows  {elapsed:7.1f}s  {loaded / elapsed if elapsed else 0:>10.0f} rows/s")
+
+        for table in tables:
+            await conn.execute(f"ANALYZE {table}")
+    finally:
+        await conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate and bulk-load a synthetic dataset")
+    parser.add_argument("--scale", type=float, default=0.1, help="1.0 = ~50k users, 500 quizzes, ~1M submissions")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--password", default="loadtest-password", help="password for every generated user")
+    parser.add_argument("--admins", type=int, default=5, help="the first N users are admins")
+    parser.add_argument("--email-prefix", default="user")
+    parser.add_argument("--attempt-rate", type=float, default=0.7, help="share of assigned users who submitted")
+    parser.add_argument("--feedback-rate", type=float, default=0.05)
+    parser.add_argument("--tables", default=",".join(TABLES), help="comma-separated subset of tables to load")
+    parser.add_argument("--truncate", action="store_true", help="empty the tables first (RESTART IDENTITY CASCADE)")
+    parser.add_argument("--database-url", default=None, help="defaults to DATABASE_URL")
+    args = parser.parse_args()
+
+    from app.config import DATABASE_URL
+    from app.utils.auth import hash_password
+
+    tables = [t for t in TABLES if t in args.tables.split(",")]
+    dataset = Dataset(args.scale, args.seed, hash_password(args.password), args.admins, args.email_prefix,
+                      args.attempt_rate, args.feedback_rate)
+    print(f"seed={args.seed} scale={args.scale}: {dataset.n_users} users, {dataset.n_groups} groups, "
+          f"{dataset.n_quizzes} quizzes (~{math.ceil(dataset.quiz_questions.mean())} questions each)")
+
+    started = time.perf_counter()
+    asyncio.run(load(dataset, _asyncpg_dsn(args.database_url or DATABASE_URL), tables, args.truncate))
+    print(f"done in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+# quiz_backend/devtools/oidc_stub.py
+#
+# Local stand-in OpenID Connect provider for exercising the Google login flow
+# without Google. It auto-approves every authorization request and issues
+# RS256-signed ID tokens from a key generated at startup.
+#
+# How to run it and the self-check: see USAGE below (printed by `python -m devtools.oidc_stub`).
+
+import asyncio
+import os
+import secrets
+import sys
+import time
+from urllib.parse import urlencode
+
+from authlib.jose import JsonWebKey, jwt
+from fastapi import FastAPI, Form, HTTPException, Request
+from fastapi.responses import RedirectResponse
+
+ISSUER = os.getenv("STUB_OIDC_ISSUER", "http://localhost:9000")
+DEFAULT_EMAIL = os.getenv("STUB_OIDC_EMAIL", "user@example.com")
+
+USAGE = """Stand-in OpenID Connect provider for the Google login flow.
+
+Run it and point the backend at it:
+  uvicorn devtools.oidc_stub:app --port 9000
+  OIDC_DISCOVERY_URL=http://localhost:9000/.well-known/openid-configuration
+  STUB_OIDC_EMAIL=<an existing user's email>   (or pass login_hint=...)
+
+Self-check of the backend's cached discovery/JWKS and local ID token verification:
+  python -m devtools.oidc_stub --self-check"""
+
+app = FastAPI(title="Stand-in OIDC provider")
+
+_signing_key = JsonWebKey.generate_key("RSA", 2048, is_private=True, options={"kid": secrets.token_hex(8)})
+_codes: dict = {}
+stats = {"discovery": 0, "jwks": 0, "token": 0, "userinfo": 0}
+
+
+def issue_id_token(client_id: str, email: str, nonce: str = None, lifetime: int = 300) -> str:
+    now = int(time.time())
+    claims = {
+        "iss": ISSUER,
+        "sub": email,
+        "aud": client_id,
+        "iat": now,
+        "exp": now + lifetime,
+        "email": email,
+        "email_verified": True,
+        "name": email.split("@")[0],
+    }
+    if nonce:
+        claims["nonce"] = nonce
+    header = {"alg": "RS256", "kid": _signing_key.kid}
+    return jwt.encode(header, claims, _signing_key).decode()
+
+
+@app.get("/.well-known/openid-configuration")
+async def discovery():
+    stats["discovery"] += 1
+    return {
+        "issuer": ISSUER,
+        "authorization_endpoint": f"{ISSUER}/authorize",
+        "token_endpoint": f"{ISSUER}/token",
+        "userinfo_endpoint": f"{ISSUER}/userinfo",
+        "jwks_uri": f"{ISSUER}/jwks",
+        "response_types_supported": ["code"],
+        "subject_types_supported": ["public"],
+        "id_token_signing_alg_values_supported": ["RS256"],
+    }
+
+
+@app.get("/jwks")
+async def jwks():
+    stats["jwks"] += 1
+    return {"keys": [_signing_key.as_dict(is_private=False)]}
+
+
+@app.get("/authorize")
+async def authorize(request: Request):
+    params = request.query_params
+    code = secrets.token_urlsafe(16)
+    _codes[code] = {
+        "client_id": params.get("client_id"),
+        "nonce": params.get("nonce"),
+        "email": params.get("login_hint") or DEFAULT_EMAIL,
+    }
+    query = urlencode({"code": code, "state": params.get("state", "")})
+    return RedirectResponse(f"{params['redirect_uri']}?{query}")
+
+
+@app.post("/token")
+async def token(code: str = Form(...), client_id: str = Form(None)):
+    stats["token"] += 1
+    grant = _codes.pop(code, None)
+    if not grant:
+        raise HTTPException(status_code=400, detail="invalid_grant")
+    return {
+        "access_token": secrets.token_urlsafe(24),
+        "token_type": "Bearer",
+        "expires_in": 3600,
+        "scope": "openid email profile",
+        "id_token": issue_id_token(client_id or grant["client_id"], grant["email"], grant["nonce"]),
+    }
+
+
+@app.get("/userinfo")
+async def userinfo():
+    stats["userinfo"] += 1
+    return {"sub": DEFAULT_EMAIL, "email": DEFAULT_EMAIL, "email_verified": True}
+
+
+async def _self_check() -> int:
+    import httpx
+    from app.utils.oidc import OIDCProviderCache, IDTokenError
+
+    provider = OIDCProviderCache(f"{ISSUER}/.well-known/openid-configuration", transport=httpx.ASGITransport(app=app))
+    id_token = issue_id_token("quiz-app", "alice@example.com", nonce="n-1")
+
+    for _ in range(100):
+        claims = await provider.verify_id_token(id_token, "quiz-app", nonce="n-1")
+    assert claims["email"] == "alice@example.com"
+    assert stats["discovery"] == 1 and stats["jwks"] == 1, stats
+
+    try:
+        await provider.verify_id_token(id_token, "other-client")
+    except IDTokenError:
+        pass
+    else:
+        print("FAIL: token accepted for the wrong audience")
+        return 1
+
+    print(f"OK: 100 verifications, provider fetches {stats}")
+    return 0
+
+
+if __name__ == "__main__":
+    if "--self-check" in sys.argv:
+        sys.exit(asyncio.run(_self_check()))
+    print(USAGE)
@@ -0,0 +1,64 @@
+"""hot path indexes for leaderboards, attempts and quiz assignments
+
+Revision ID: 0002_hot_path_indexes
+Revises: 0001_revoked_tokens
+Create Date: 2026-10-19 00:00:00
+
+Indexes are built with CREATE INDEX CONCURRENTLY so the tables stay writable
+during the build. That cannot run inside a transaction, hence autocommit_block.
+IF NOT EXISTS keeps this safe on databases created by init_db.py, which already
+gets the indexes from the model definitions.
+
+If a concurrent build fails it leaves an INVALID index behind; drop it and
+re-run the upgrade.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_hot_path_indexes"
+down_revision: Union[str, Sequence[str], None] = "0001_revoked_tokens"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    # leaderboard / exports: WHERE quiz_id = ? ORDER BY score DESC, time_taken ASC
+    ("ix_submissions_quiz_leaderboard", "submissions", "(quiz_id, score DESC, time_taken ASC)", False),
+    # attempt lookups: WHERE user_id = ? [AND quiz_id = ?]
+    ("ix_submissions_user_quiz", "submissions", "(user_id, quiz_id)", False),
+    # one assignment per user and quiz; also serves WHERE user_id = ?
+    ("uq_quiz_access_user_quiz", "quiz_access", "(user_id, quiz_id)", True),
+    # admin quiz status: WHERE quiz_id = ? joined to users
+    ("ix_quiz_access_quiz_user", "quiz_access", "(quiz_id, user_id)", False),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The unique index cannot be built over duplicate assignments; keep the oldest row
+    op.execute(
+        """
+        DELETE FROM quiz_access a
+        USING quiz_access b
+        WHERE a.user_id = b.user_id AND a.quiz_id = b.quiz_id AND a.id > b.id
+        """
+    )
+
+    with op.get_context().autocommit_block():
+        for name, table, columns, unique in INDEXES:
+            op.execute(
+                f"CREATE {'UNIQUE ' if unique else ''}INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} {columns}"
+            )
+        # users.email lookups use the unique constraint's index (users_email_key)
+        op.execute("ANALYZE submissions")
+        op.execute("ANALYZE quiz_access")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, _, _, _ in reversed(INDEXES):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
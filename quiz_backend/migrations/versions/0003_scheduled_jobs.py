@@ -0,0 +1,47 @@
+"""scheduled_jobs table for the in-process job scheduler
+
+Revision ID: 0003_scheduled_jobs
+Revises: 0002_hot_path_indexes
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_scheduled_jobs"
+down_revision: Union[str, Sequence[str], None] = "0002_hot_path_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Databases created by init_db.py after the table was added already have it
+    if not context.is_offline_mode() and sa.inspect(op.get_bind()).has_table("scheduled_jobs"):
+        return
+    op.create_table(
+        "scheduled_jobs",
+        sa.Column("name", sa.String(), primary_key=True),
+        sa.Column("handler", sa.String(), nullable=False),
+        sa.Column("payload", postgresql.JSONB(), nullable=False, server_default=sa.text("'{}'::jsonb")),
+        sa.Column("interval_seconds", sa.Integer(), nullable=True),
+        sa.Column("next_run_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("enabled", sa.Boolean(), nullable=False, server_default=sa.true()),
+        sa.Column("run_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_run_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_status", sa.String(), nullable=True),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_scheduled_jobs_next_run_at", "scheduled_jobs", ["next_run_at"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_scheduled_jobs_next_run_at", table_name="scheduled_jobs")
+    op.drop_table("scheduled_jobs")
@@ -0,0 +1,58 @@
+"""server-side attempt deadlines on submissions
+
+Revision ID: 0004_attempt_deadlines
+Revises: 0003_scheduled_jobs
+Create Date: 2026-10-19 00:00:00
+
+The new columns are nullable (auto_finalized has a constant default), so adding
+them does not rewrite the table. A running attempt is a row whose score is still
+NULL, so score loses its NOT NULL (a catalog-only change, and a no-op where the
+column was created nullable). The partial index only covers running attempts
+and is built CONCURRENTLY, like the indexes in 0002.
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_attempt_deadlines"
+down_revision: Union[str, Sequence[str], None] = "0003_scheduled_jobs"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = [
+    sa.Column("time_limits", sa.JSON(), nullable=True),
+    sa.Column("question_index", sa.Integer(), nullable=True),
+    sa.Column("question_deadline_at", sa.DateTime(timezone=True), nullable=True),
+    sa.Column("deadline_at", sa.DateTime(timezone=True), nullable=True),
+    sa.Column("auto_finalized", sa.Boolean(), nullable=False, server_default=sa.false()),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Databases created by init_db.py after the columns were added already have them
+    existing = set()
+    if not context.is_offline_mode():
+        existing = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("submissions")}
+    for column in COLUMNS:
+        if column.name not in existing:
+            op.add_column("submissions", column)
+    op.alter_column("submissions", "score", existing_type=sa.Integer(), nullable=True)
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_submissions_open_deadline "
+            "ON submissions (deadline_at) WHERE score IS NULL"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_submissions_open_deadline")
+    for column in reversed(COLUMNS):
+        op.drop_column("submissions", column.name)
+    # score stays nullable: attempts still running at downgrade time have no score
@@ -0,0 +1,77 @@
+# quiz_backend/tests/test_mail_dispatcher.py
+
+import asyncio
+from types import SimpleNamespace
+
+import aiosmtplib
+from pydantic import SecretStr
+
+from app.utils import mail_dispatcher
+from app.utils.mail_dispatcher import MailDispatcher, html_message
+
+CONFIG = SimpleNamespace(
+    MAIL_SERVER="smtp.example.com", MAIL_PORT=587, MAIL_SSL_TLS=False, MAIL_STARTTLS=True,
+    VALIDATE_CERTS=True, LOCAL_HOSTNAME=None, TIMEOUT=60, USE_CREDENTIALS=True,
+    MAIL_USERNAME="quiz", MAIL_PASSWORD=SecretStr("secret"),
+    MAIL_FROM="quiz@example.com", MAIL_FROM_NAME="Quiz Team", SUPPRESS_SEND=0,
+)
+
+
+class StubSMTP:
+    """Records what the dispatcher does with each SMTP session."""
+
+    sessions = []
+    fail_sends = 0
+
+    def __init__(self, **options):
+        self.options = options
+        self.sent = []
+        self.is_connected = False
+        self.quit_called = False
+        StubSMTP.sessions.append(self)
+
+    async def connect(self):
+        self.is_connected = True
+
+    async def send_message(self, message):
+        if StubSMTP.fail_sends:
+            StubSMTP.fail_sends -= 1
+            raise aiosmtplib.SMTPServerDisconnected("connection lost")
+        self.sent.append(message)
+
+    async def quit(self):
+        self.quit_called = True
+        self.is_connected = False
+
+    def close(self):
+        self.is_connected = False
+
+
+async def _deliver(count):
+    dispatcher = MailDispatcher(lambda: CONFIG)
+    job = dispatcher.submit(
+        [html_message("Reminder", f"user{i}@example.com", "<p>Hi</p>") for i in range(count)], "test"
+    )
+    await asyncio.gather(*dispatcher._tasks)
+    return job
+
+
+def test_sends_batches_and_closes_every_session(monkeypatch):
+    StubSMTP.sessions, StubSMTP.fail_sends = [], 1
+    monkeypatch.setattr(aiosmtplib, "SMTP", StubSMTP)
+    monkeypatch.setattr(mail_dispatcher, "MAIL_MAX_CONNECTIONS", 1)
+    monkeypatch.setattr(mail_dispatcher, "MAIL_BATCH_SIZE", 2)
+    monkeypatch.setattr(mail_dispatcher, "MAIL_RATE_PER_SECOND", 0)
+    monkeypatch.setattr(mail_dispatcher, "MAIL_RETRY_BASE_DELAY", 0)
+
+    job = asyncio.run(_deliver(3))
+
+    assert (job.status, job.sent, job.failed) == ("completed", 3, 0)
+    sent = [message for session in StubSMTP.sessions for message in session.sent]
+    assert [message["To"] for message in sent] == [f"user{i}@example.com" for i in range(3)]
+    assert all(message["From"] == "Quiz Team <quiz@example.com>" for message in sent)
+    assert sent[0].get_content_type() == "text/html"
+    # The failed send reconnects; every session ends disconnected
+    assert len(StubSMTP.sessions) == 3
+    assert not any(session.is_connected for session in StubSMTP.sessions)
+    assert StubSMTP.sessions[0].options["password"] == "secret"
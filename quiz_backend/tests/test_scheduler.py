@@ -0,0 +1,76 @@
+# quiz_backend/tests/test_scheduler.py
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.exc import MissingGreenlet
+
+from app.utils import scheduler as scheduler_module
+from app.utils.scheduler import SCHEDULER_RETRY_SECONDS, JobScheduler
+
+
+class ExpiringJob:
+    """Stands in for a loaded ScheduledJob: after a rollback its attributes need a refresh,
+    which an AsyncSession can't do on plain attribute access."""
+
+    def __init__(self, **values):
+        self.__dict__["_values"] = values
+        self.__dict__["expired"] = False
+
+    def __getattr__(self, name):
+        if self.expired:
+            raise MissingGreenlet(f"lazy refresh of {name!r}")
+        return self._values[name]
+
+
+class FakeSession:
+    def __init__(self, job, updates):
+        self.job = job
+        self.updates = updates
+        self._scalars = [True, job]  # advisory lock taken, then the job row
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def scalar(self, statement):
+        return self._scalars.pop(0)
+
+    async def execute(self, statement):
+        self.updates.append(statement.compile().params)
+
+    async def rollback(self):
+        self.job.expired = True
+
+    async def commit(self):
+        pass
+
+
+def test_failing_handler_records_error_and_backs_off(monkeypatch):
+    scheduler = JobScheduler()
+
+    @scheduler.recurring("flaky", every=3600)
+    async def flaky(db, payload):
+        raise RuntimeError("boom")
+
+    job = ExpiringJob(
+        name="flaky", handler="flaky", payload={}, interval_seconds=3600, enabled=True,
+        next_run_at=datetime.now(timezone.utc) - timedelta(seconds=1),
+    )
+    updates = []
+    monkeypatch.setattr(scheduler_module, "async_session", lambda: FakeSession(job, updates))
+
+    before = datetime.now(timezone.utc)
+    asyncio.run(scheduler._fire("flaky"))
+    after = datetime.now(timezone.utc)
+
+    assert scheduler.failures == 1
+    assert len(updates) == 1
+    values = updates[0]
+    assert values["last_status"] == "error"
+    assert "boom" in values["last_error"]
+    retry = timedelta(seconds=min(SCHEDULER_RETRY_SECONDS, 3600))
+    assert before + retry <= values["next_run_at"] <= after + retry
+    assert scheduler._due_at["flaky"] == values["next_run_at"].timestamp()